@@ -0,0 +1,255 @@
+"""
+Endpoint benchmark suite
+Times every GET endpoint under /api/dashboard/, /api/income and
+/api/retirement-accounts with app.test_client() against synthetic households
+(generate_test_data.py) of 1k, 10k, 100k and 1M transactions. Each size runs in its
+own process on a fresh data directory. For every endpoint it records:
+
+    first_ms        the first call (loads partitions, builds columns/aggregates)
+    min_ms/median_ms  `repeats` more calls with the response cache cleared first
+    peak_kb         tracemalloc peak of one more call
+    retained_kb     memory still allocated after that call
+    bytes           response size
+
+Results are written as JSON. With a baseline (a results file from an earlier
+run, --save-baseline writes one) an endpoint is reported as a regression
+when its median is more than --threshold times the baseline's, or when it
+grows with the dataset more than --threshold times faster than it did in the
+baseline: the second check compares timings within one run, so it catches an
+O(n) endpoint turning O(n * months) even on a different machine.
+
+    python benchmarks/endpoints.py [--sizes 1000,10000] [--repeats 5] [--out results.json]
+                                   [--baseline benchmarks/baseline.json] [--save-baseline]
+
+Exits with status 1 when a regression is found.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCHMARK_DIR)
+SERVER_DIR = os.path.join(ROOT_DIR, 'server')
+DEFAULT_SIZES = '1000,10000,100000,1000000'
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+PREFIXES = ('/api/dashboard/', '/api/income', '/api/retirement-accounts')
+NOISE_FLOOR_MS = 1.0  # differences below this are timer noise, not regressions
+
+
+# ----- one dataset size (runs in a child process) -----
+
+def _endpoint_paths(flask_app, data):
+    """Concrete paths of every GET route under PREFIXES, path parameters filled from the data"""
+    variable = next((i for i in data['income_sources'] if i.get('is_variable')), data['income_sources'][0])
+    values = {'income_id': variable['id'], 'account_id': data['retirement_accounts'][0]['id']}
+    paths = []
+    for rule in sorted(flask_app.url_map.iter_rules(), key=lambda rule: rule.rule):
+        if rule.rule.startswith(PREFIXES) and 'GET' in rule.methods:
+            if all(argument in values for argument in rule.arguments):
+                paths.append(rule.build({argument: values[argument] for argument in rule.arguments})[1])
+    return paths
+
+
+def run_size(transactions, repeats, seed, years):
+    sys.path.insert(0, ROOT_DIR)
+    from generate_test_data import write_dataset
+
+    data_dir = tempfile.mkdtemp(prefix=f'budget-bench-{transactions}-')
+    try:
+        started = time.perf_counter()
+        write_dataset(data_dir, seed=seed, years=years, total=transactions)
+        generate_s = time.perf_counter() - started
+
+        os.environ['BUDGET_APP_DATA_DIR'] = data_dir
+        os.environ.setdefault('BUDGET_APP_SAMPLE_HZ', '0')
+        sys.path.insert(0, SERVER_DIR)
+        started = time.perf_counter()
+        import app as budget_app
+        load_s = time.perf_counter() - started
+
+        endpoints = {}
+        with budget_app.app.test_client() as client:
+            for path in _endpoint_paths(budget_app.app, budget_app.budget_data):
+                budget_app.response_cache.clear()
+                started = time.perf_counter()
+                response = client.get(path)
+                first_ms = (time.perf_counter() - started) * 1000
+
+                timings = []
+                for _ in range(repeats):
+                    budget_app.response_cache.clear()
+                    started = time.perf_counter()
+                    client.get(path)
+                    timings.append((time.perf_counter() - started) * 1000)
+
+                budget_app.response_cache.clear()
+                tracemalloc.start()
+                client.get(path)
+                retained, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                endpoints[path] = {
+                    'status': response.status_code,
+                    'first_ms': round(first_ms, 3),
+                    'min_ms': round(min(timings), 3),
+                    'median_ms': round(statistics.median(timings), 3),
+                    'peak_kb': round(peak / 1024, 1),
+                    'retained_kb': round(retained / 1024, 1),
+                    'bytes': len(response.get_data())
+                }
+        return {
+            'transactions': transactions,
+            'generate_s': round(generate_s, 3),
+            'load_s': round(load_s, 3),
+            'endpoints': endpoints
+        }
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+# ----- driver -----
+
+def _run_in_child(transactions, args):
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+        out = f.name
+    command = [sys.executable, os.path.abspath(__file__), '--worker', str(transactions), '--out', out,
+               '--repeats', str(args.repeats), '--seed', str(args.seed), '--years', str(args.years)]
+    completed = subprocess.run(command, stdout=subprocess.DEVNULL if not args.verbose else None)
+    if completed.returncode != 0:
+        raise SystemExit(f'Benchmark for {transactions:,} transactions failed (exit {completed.returncode})')
+    with open(out) as f:
+        result = json.load(f)
+    os.unlink(out)
+    return result
+
+
+def _growth(results, path):
+    """[(size, next size, median ratio)] of an endpoint across consecutive sizes"""
+    sizes = sorted(results, key=int)
+    return [
+        (small, large, results[large]['endpoints'][path]['median_ms'] / results[small]['endpoints'][path]['median_ms'])
+        for small, large in zip(sizes, sizes[1:])
+        if path in results[small]['endpoints'] and path in results[large]['endpoints']
+        and results[small]['endpoints'][path]['median_ms'] > 0
+    ]
+
+
+def compare(results, baseline, threshold):
+    """Regression messages for results against a baseline results dict"""
+    regressions = []
+    base_results = baseline.get('results', {})
+    for size, result in results.items():
+        base = base_results.get(size)
+        if base is None:
+            continue
+        for path, timing in result['endpoints'].items():
+            before = base['endpoints'].get(path)
+            if before is None:
+                continue
+            now, then = timing['median_ms'], before['median_ms']
+            if now > then * threshold and now - then > NOISE_FLOOR_MS:
+                regressions.append(f'{path} at {int(size):,}: {then:.2f} -> {now:.2f} ms ({now / then:.1f}x)')
+
+    paths = {path for result in results.values() for path in result['endpoints']}
+    for path in sorted(paths):
+        base_growth = {(small, large): ratio for small, large, ratio in _growth(base_results, path)}
+        for small, large, ratio in _growth(results, path):
+            before = base_growth.get((small, large))
+            if not before:
+                continue
+            # What the larger size would take had it grown as in the baseline
+            expected_ms = results[small]['endpoints'][path]['median_ms'] * before
+            large_ms = results[large]['endpoints'][path]['median_ms']
+            if ratio > before * threshold and large_ms - expected_ms > NOISE_FLOOR_MS:
+                regressions.append(f'{path} scaling {int(small):,} -> {int(large):,}: '
+                                   f'{before:.1f}x in the baseline, now {ratio:.1f}x')
+    return regressions
+
+
+def print_table(results):
+    sizes = sorted(results, key=int)
+    paths = sorted({path for result in results.values() for path in result['endpoints']})
+    width = max(len(path) for path in paths) if paths else 10
+    print(f"{'median ms':<{width}}  " + '  '.join(f'{int(size):>10,}' for size in sizes) + '   peak kb (largest)')
+    for path in paths:
+        cells = []
+        for size in sizes:
+            timing = results[size]['endpoints'].get(path)
+            cells.append(f"{timing['median_ms']:>10.2f}" if timing else f"{'-':>10}")
+        largest = results[sizes[-1]]['endpoints'].get(path)
+        print(f'{path:<{width}}  ' + '  '.join(cells) + f"   {largest['peak_kb'] if largest else '-':>10}")
+    print('\n' + '  '.join(f"{int(size):,}: generated in {results[size]['generate_s']}s, "
+                           f"loaded in {results[size]['load_s']}s" for size in sizes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the dashboard, income and retirement endpoints')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='transaction counts, comma separated')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--years', type=int, default=3, help='years of history in each dataset')
+    parser.add_argument('--out', help='write results JSON here')
+    parser.add_argument('--baseline', help=f'results to compare against (default {DEFAULT_BASELINE} if it exists)')
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--threshold', type=float, default=1.5, help='slowdown factor reported as a regression')
+    parser.add_argument('--verbose', action='store_true', help="show the server's output")
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        result = run_size(args.worker, args.repeats, args.seed, args.years)
+        with open(args.out, 'w') as f:
+            json.dump(result, f, indent=2)
+        return 0
+
+    results = {}
+    for size in (int(size) for size in args.sizes.split(',')):
+        print(f'Benchmarking {size:,} transactions...', flush=True)
+        results[str(size)] = _run_in_child(size, args)
+
+    output = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeats': args.repeats,
+        'seed': args.seed,
+        'years': args.years,
+        'results': results
+    }
+    print()
+    print_table(results)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(output, f, indent=2)
+        print(f'\nResults written to {args.out}')
+
+    baseline_path = args.baseline or (DEFAULT_BASELINE if os.path.exists(DEFAULT_BASELINE) else None)
+    status = 0
+    if baseline_path and not args.save_baseline:
+        with open(baseline_path) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s) against {baseline_path}:')
+            for regression in regressions:
+                print(f'  {regression}')
+            status = 1
+        else:
+            print(f'\nNo regressions against {baseline_path}')
+    if args.save_baseline:
+        with open(args.baseline or DEFAULT_BASELINE, 'w') as f:
+            json.dump(output, f, indent=2)
+        print(f'\nBaseline saved to {args.baseline or DEFAULT_BASELINE}')
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
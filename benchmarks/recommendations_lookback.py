@@ -0,0 +1,68 @@
+"""
+Smart recommendations: cost vs. lookback window
+Loads three years of synthetic transactions into a throwaway data directory
+and times /api/dashboard/smart-recommendations for ?months=6, 12 and 24 with
+the response cache cleared before every call. History comes from the month
+aggregates, so the timings should stay flat as the window grows.
+    
+    python benchmarks/recommendations_lookback.py [transactions_per_month] [repeats]
+"""
+import atexit
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+DATA_DIR = tempfile.mkdtemp(prefix='budget-bench-')
+os.environ['BUDGET_APP_DATA_DIR'] = DATA_DIR
+# Registered before importing app, so it runs after the app's own exit handlers have flushed
+atexit.register(shutil.rmtree, DATA_DIR, ignore_errors=True)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server'))
+
+import app as budget_app
+
+PER_MONTH = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+REPEATS = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+CATEGORIES = ['Groceries', 'Gas', 'Dining Out', 'Shopping', 'Utilities', 'Entertainment', 'Healthcare']
+
+
+def synthetic_transactions(months):
+    random.seed(12)
+    today = date.today()
+    transactions = []
+    for i in range(months * PER_MONTH):
+        transactions.append({
+            'id': i + 1,
+            'date': (today - timedelta(days=random.randint(0, months * 30))).isoformat(),
+            'amount': round(random.uniform(2, 250), 2),
+            'category': random.choice(CATEGORIES),
+            'description': 'Benchmark purchase'
+        })
+    return transactions
+
+
+with budget_app.app.test_client() as client:
+    data = client.get('/api/budget').get_json()
+    data['transactions'] = synthetic_transactions(36)
+    client.post('/api/budget', json=data)
+    client.get('/api/dashboard/smart-recommendations')  # build columns and aggregates
+    
+    print(f"{len(data['transactions']):,} transactions, best of {REPEATS}\n")
+    print(f"{'months':>6}  {'ms':>8}")
+    timings = {}
+    for months in (6, 12, 24):
+        best = None
+        for _ in range(REPEATS):
+            budget_app.response_cache.clear()
+            start = time.perf_counter()
+            response = client.get(f'/api/dashboard/smart-recommendations?months={months}')
+            elapsed = (time.perf_counter() - start) * 1000
+            assert response.status_code == 200, response.get_json()
+            best = elapsed if best is None else min(best, elapsed)
+        timings[months] = best
+        print(f"{months:>6}  {best:>8.2f}")
+    
+    print(f"\n24 vs 6 months: {timings[24] / timings[6]:.2f}x")
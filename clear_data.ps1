@@ -8,4 +8,14 @@ if (Test-Path $dataFile) {
     Write-Host "ℹ️  No existing budget_data.json found"
 }
 
+# Journal and monthly transaction files live next to budget_data.json
+$dataDir = Split-Path $dataFile
+foreach ($extra in @("budget_data.journal", "budget_data.transactions")) {
+    $extraPath = Join-Path $dataDir $extra
+    if (Test-Path $extraPath) {
+        Remove-Item $extraPath -Recurse -Force
+        Write-Host "✅ Deleted existing $extra"
+    }
+}
+
 Write-Host "✅ Ready to load test data. Restart the server to see new variable income examples!"
@@ -1,5 +1,6 @@
 const { app, BrowserWindow, ipcMain, dialog, Menu } = require('electron');
 const path = require('path');
+const http = require('http');
 const { autoUpdater } = require('electron-updater');
 const { spawn } = require('child_process');
 
@@ -96,11 +97,38 @@ function startServer() {
 }
 
 // Stop the Express server
-function stopServer() {
-  if (serverProcess) {
-    serverProcess.kill();
-    serverProcess = null;
+// Asks Flask to flush its write-behind queue first, since kill() on Windows
+// terminates the process without giving Python a chance to run exit handlers
+function stopServer(callback) {
+  if (!serverProcess) {
+    if (callback) callback();
+    return;
   }
+  
+  const proc = serverProcess;
+  serverProcess = null;
+  
+  let finished = false;
+  const finish = () => {
+    if (finished) return;
+    finished = true;
+    proc.kill();
+    if (callback) callback();
+  };
+  
+  const request = http.request({
+    host: 'localhost',
+    port: 5000,
+    path: '/api/admin/flush',
+    method: 'POST',
+    timeout: 3000
+  }, (response) => {
+    response.resume();
+    response.on('end', finish);
+  });
+  request.on('timeout', () => request.destroy());
+  request.on('error', finish);
+  request.end();
 }
 
 function createWindow() {
@@ -491,10 +519,11 @@ app.on('ready', () => {
 });
 
 app.on('window-all-closed', () => {
-  stopServer();
-  if (process.platform !== 'darwin') {
-    app.quit();
-  }
+  stopServer(() => {
+    if (process.platform !== 'darwin') {
+      app.quit();
+    }
+  });
 });
 
 app.on('activate', () => {
@@ -503,6 +532,10 @@ app.on('activate', () => {
   }
 });
 
-app.on('before-quit', () => {
-  stopServer();
+app.on('before-quit', (event) => {
+  // Hold the quit until the server has flushed its pending writes
+  if (serverProcess) {
+    event.preventDefault();
+    stopServer(() => app.quit());
+  }
 });
@@ -133,6 +133,17 @@ export async function getTaxEstimate(filingStatus = 'married-joint', useActual =
     return apiRequest(`/income/tax-estimate?filing_status=${filingStatus}&use_actual=${useActual}`);
 }
 
+export async function getTaxEstimateBatch(incomes, filingStatuses = null) {
+    return apiRequest('/income/tax-estimate/batch', {
+        method: 'POST',
+        body: JSON.stringify({ incomes, filing_statuses: filingStatuses })
+    });
+}
+
+export async function getTaxRateCurve(filingStatus = 'married-joint', min = 0, max = 500000, points = 101) {
+    return apiRequest(`/income/tax-estimate/curve?filing_status=${filingStatus}&min=${min}&max=${max}&points=${points}`);
+}
+
 // Expense APIs
 export async function getExpenses() {
     return apiRequest('/expenses');
@@ -215,13 +226,31 @@ export async function getProjectedBalance() {
     return apiRequest('/dashboard/projected-balance');
 }
 
+// Every overview card in one request (accounts, summary, availableSpending, mtdSpending, ...)
+export async function getDashboardSnapshot() {
+    return apiRequest('/dashboard/snapshot');
+}
+
+// Forecast APIs
+export async function getCashflowForecast(days = 90) {
+    return apiRequest(`/forecast/cashflow?days=${days}`);
+}
+
+export async function getOverdraftRisk(days = 90, paths = 2000) {
+    return apiRequest(`/forecast/overdraft-risk?days=${days}&paths=${paths}`);
+}
+
 // Retirement APIs
-export async function getRetirementAccounts() {
-    return apiRequest('/retirement-accounts');
+export async function getRetirementAccounts(year = null) {
+    return apiRequest(year ? `/retirement-accounts?year=${year}` : '/retirement-accounts');
+}
+
+export async function getRetirementSummary(year = null) {
+    return apiRequest(year ? `/retirement-accounts/summary?year=${year}` : '/retirement-accounts/summary');
 }
 
-export async function getRetirementSummary() {
-    return apiRequest('/retirement-accounts/summary');
+export async function getRetirementProjection(currentAge = 35, retirementAge = 65) {
+    return apiRequest(`/retirement/projection?current_age=${currentAge}&retirement_age=${retirementAge}`);
 }
 
 export async function addRetirementAccount(accountData) {
@@ -167,24 +167,11 @@ async function loadOverview() {
     showLoading('summary-cards', 'Loading dashboard metrics...');
     
     try {
-        // Load all data including overdraft warning, month comparison, and projected balance
-        const [accounts, summary, availableSpending, mtdSpending, nextPaycheck, healthScore, totalIncome, totalExpenses, moneyPerDay, overdraft, monthComparison, projectedBalance] = await Promise.all([
-            API.getAccounts(),
-            API.getAccountSummary(),
-            API.getAvailableSpending(),
-            API.getMonthToDateSpending(),
-            API.getNextPaycheckCountdown(),
-            API.getBudgetHealthScore(),
-            API.getTotalIncome(),
-            API.getTotalExpenses(),
-            API.getMoneyLeftPerDay(),
-            API.getOverdraftWarning(),
-            API.getMonthComparison(),
-            API.getProjectedBalance()
-        ]);
+        // One request returns every card, computed from a single shared context on the server
+        const snapshot = await API.getDashboardSnapshot();
         
         // Render the overview cards
-        renderOverviewCards({ accounts, summary, availableSpending, mtdSpending, nextPaycheck, healthScore, totalIncome, totalExpenses, moneyPerDay, overdraft, monthComparison, projectedBalance });
+        renderOverviewCards(snapshot);
     } catch (error) {
         console.error('Error loading overview:', error);
         showError('summary-cards', 'Failed to load dashboard overview');
@@ -1,870 +1,406 @@
 """
 Generate test data for the Budget App
-This script creates sample income data spanning multiple years to test the year-over-year comparison feature
-"""
+Builds a seeded synthetic household (earners, income sources with their
+payment history, bank accounts, bills, retirement accounts with contributions)
+and any number of card transactions over the last few years, and writes it
+straight into a storage backend:
+    
+    python generate_test_data.py                                 # server/budget_data.json, 3 years
+    python generate_test_data.py --years 5 --transactions-per-month 20000 --backend sqlite
+    python generate_test_data.py --transactions 1000000 --data-dir /tmp/budget --workers 4
 
-import json
+Transactions are generated one month at a time (months are spread over
+--workers processes) and streamed into the backend as they are produced, so a
+multi-million-transaction dataset never has to fit in memory. Every month
+draws from its own random stream seeded by --seed and the month, so the same
+arguments give the same data whatever the number of workers.
+"""
+import argparse
 import os
-from datetime import datetime, timedelta
 import random
+import sys
+import time
+from calendar import monthrange
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
 
 # Path to the data file
-DATA_FILE = os.path.join(os.path.dirname(__file__), 'server', 'budget_data.json')
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server')
+DATA_FILE = os.path.join(SERVER_DIR, 'budget_data.json')
 
-def generate_test_data():
-    """Generate comprehensive test data with income from multiple years"""
-    
-    # Initialize base data structure
-    # Realistic accounts for a family making ~$60k/year
-    budget_data = {
-        'categories': [],
-        'transactions': [],
-        'total_budget': 0,
-        'accounts': [
-            {
-                'id': int(datetime.now().timestamp() * 1000),
-                'type': 'checking',
-                'name': 'Family Checking',
-                'balance': 185.50,  # Low balance to trigger WARNING
-                'institution': 'Wells Fargo',
-                'notes': 'Main household checking account',
-                'created_at': (datetime.now() - timedelta(days=730)).isoformat(),
-                'updated_at': datetime.now().isoformat()
-            },
-            {
-                'id': int(datetime.now().timestamp() * 1000) + 1,
-                'type': 'savings',
-                'name': 'Emergency Fund',
-                'balance': 3200.00,
-                'institution': 'Ally Bank',
-                'notes': 'Working towards 6 months expenses',
-                'created_at': (datetime.now() - timedelta(days=365)).isoformat(),
-                'updated_at': datetime.now().isoformat()
-            },
-            {
-                'id': int(datetime.now().timestamp() * 1000) + 2,
-                'type': 'savings',
-                'name': 'Vacation Fund',
-                'balance': 875.50,
-                'institution': 'Ally Bank',
-                'notes': 'Saving for summer vacation',
-                'created_at': (datetime.now() - timedelta(days=180)).isoformat(),
-                'updated_at': datetime.now().isoformat()
-            },
-            {
-                'id': int(datetime.now().timestamp() * 1000) + 3,
-                'type': 'credit',
-                'name': 'Chase Freedom Card',
-                'balance': 892.35,
-                'institution': 'Chase',
-                'notes': 'Everyday expenses, pay off monthly',
-                'created_at': (datetime.now() - timedelta(days=900)).isoformat(),
-                'updated_at': datetime.now().isoformat()
-            },
-            {
-                'id': int(datetime.now().timestamp() * 1000) + 4,
-                'type': 'checking',
-                'name': 'Spouse Checking',
-                'balance': 95.75,  # Very low balance to increase urgency
-                'institution': 'Chase',
-                'notes': 'Side income account',
-                'created_at': (datetime.now() - timedelta(days=500)).isoformat(),
-                'updated_at': datetime.now().isoformat()
+CONTRIBUTION_FREQUENCIES = ['paycheck', 'monthly', 'quarterly', 'annual']
+FIRST_NAMES = ['John', 'Sarah', 'Alex', 'Maria', 'Sam', 'Priya', 'Chris', 'Dana']
+LAST_NAMES = ['Kuntz', 'Rivera', 'Nguyen', 'Patel', 'Miller', 'Okafor']
+
+# (name, source_name, frequency, yearly gross today) of each earner's job
+JOBS = [
+    ('Manufacturing Supervisor', 'Primary Job', 'monthly', 36000),
+    ('Retail Cashier', 'Part-time Job', 'bi-weekly', 26000),
+    ('Dental Hygienist', 'Clinic', 'bi-weekly', 52000),
+    ('Warehouse Associate', 'Distribution Center', 'weekly', 31000)
+]
+# (name, source_name, type, payments per year, typical payment, owner) of extra income sources
+SIDE_INCOME = [
+    ('Freelance Web Development', 'Side Projects', 'freelance', 12, 1200, 'earner'),
+    ('Dividend Income', 'Investment Portfolio', 'investment', 4, 150, 'Joint'),
+    ('Basement Apartment', 'Rental', 'rental', 12, 850, 'Joint'),
+    ('Weekend Rideshare', 'Gig Work', 'other', 52, 120, 'earner')
+]
+ACCOUNTS = [
+    ('checking', 'Family Checking', 'Wells Fargo', 185.50),
+    ('savings', 'Emergency Fund', 'Ally Bank', 3200.00),
+    ('credit', 'Chase Freedom Card', 'Chase', 892.35),
+    ('savings', 'Vacation Fund', 'Ally Bank', 875.50),
+    ('checking', 'Spouse Checking', 'Chase', 95.75),
+    ('investment', 'Brokerage', 'Fidelity', 4300.00)
+]
+# (name, account_type, contribution_type, annual_limit, employer match %, match limit %)
+RETIREMENT_ACCOUNTS = [
+    ('Company 401(k)', '401k', 'pre_tax', 23500, 50, 6),
+    ('Personal Roth IRA', 'roth_ira', 'post_tax', 7000, 0, 0),
+    ('Hospital 403(b)', '403b', 'pre_tax', 23500, 100, 4),
+    ('Traditional IRA', 'traditional_ira', 'pre_tax', 7000, 0, 0)
+]
+BILLS = [
+    ('Rent', 950, 1, 'Housing', True), ('Car Payment', 285, 8, 'Transportation', True),
+    ('Car Insurance', 125, 10, 'Insurance', True), ('Electric Bill', 85, 9, 'Utilities', False),
+    ('Internet', 60, 20, 'Utilities', True), ('Phone Plan', 75, 7, 'Utilities', True),
+    ('Netflix', 15.99, 12, 'Subscriptions', True), ('Gym Membership', 30, 11, 'Health', True),
+    ('Water/Sewer', 45, 15, 'Utilities', False), ('Student Loan', 180, 25, 'Debt', True)
+]
+
+# category: (visits per month, amount range, merchants, descriptions, payment methods, opening hours)
+SPENDING = {
+    'Groceries': (4, (60, 180), ['Walmart', 'Aldi', 'Target', 'Kroger', 'Costco'],
+                  ['Grocery shopping', 'Weekly groceries', 'Groceries'], ['debit', 'debit', 'credit'], (8, 20)),
+    'Gas/Transportation': (4.5, (35, 50), ['Shell', 'Kwik Trip', 'BP', 'Speedway', 'Auto Zone'],
+                           ['Gas fill-up', 'Gas', 'Gas and snacks'], ['credit', 'credit', 'debit'], (7, 20)),
+    'Dining Out': (10, (6, 65), ['McDonalds', 'Chipotle', 'Pizza Hut', 'Olive Garden', 'Applebees', 'Panera',
+                                 'Subway', 'Starbucks'],
+                   ['Quick lunch', 'Family dinner', 'Date night', 'Coffee', 'Dinner out'], ['debit', 'credit'], (7, 21)),
+    'Household': (4, (20, 70), ['Target', 'Walmart', 'Dollar General', 'Walgreens'],
+                  ['Household items', 'Cleaning supplies', 'Home goods', 'Toiletries'], ['debit', 'credit'], (9, 19)),
+    'Healthcare': (2, (15, 35), ['CVS', 'Walgreens', 'Rite Aid'],
+                   ['Prescriptions', 'Medicine', 'Pharmacy'], ['debit'], (9, 18)),
+    'Shopping': (3, (30, 120), ['Amazon', 'Target', 'Walmart', 'Best Buy'],
+                 ['Online shopping', 'Kids toys', 'Home decor'], ['credit'], (10, 20)),
+    'Clothing': (1, (40, 95), ['Target', 'Kohls', 'Old Navy', 'TJ Maxx'], ['Clothing'], ['credit'], (10, 19)),
+    'Pet Care': (1.2, (25, 55), ['PetSmart'], ['Pet supplies', 'Dog food', 'Cat litter'], ['debit'], (9, 19)),
+    'Personal Care': (0.9, (15, 40), ['CVS', 'Ulta', 'Target'], ['Personal care'], ['debit'], (9, 18)),
+    'Gifts': (0.6, (30, 150), ['Amazon', 'Target', 'Kohls', 'Best Buy'], ['Gift purchase', 'Birthday gift'],
+              ['credit'], (10, 19))
+}
+# month: {category: how much more often it shows up}
+SEASONAL = {
+    8: {'Shopping': 1.4, 'Clothing': 1.5},              # back to school
+    10: {'Shopping': 1.2},                              # Halloween
+    11: {'Groceries': 1.15, 'Shopping': 1.5},           # Thanksgiving, Black Friday
+    12: {'Gifts': 5.0, 'Dining Out': 1.2, 'Groceries': 1.1}
+}
+SALARY_GROWTH = 0.04  # yearly raise, so older paychecks are smaller
+
+
+# ----- calendar helpers -----
+
+def history_months(years, today):
+    """(year, month) of every month in the last `years` years, oldest first, ending with today's month"""
+    index = today.year * 12 + today.month - 1
+    return [(i // 12, i % 12 + 1) for i in range(index - years * 12 + 1, index + 1)]
+
+
+def _pay_dates(frequency, start, end, anchor_day):
+    """Pay dates between start and end for an income frequency"""
+    if frequency in ('weekly', 'bi-weekly'):
+        step = timedelta(days=7 if frequency == 'weekly' else 14)
+        when = start + timedelta(days=(4 - start.weekday()) % 7)  # Fridays
+        while when <= end:
+            yield when
+            when += step
+        return
+    months_apart = {'monthly': 1, 'quarterly': 3, 'annual': 12}[frequency]
+    for year, month in history_months(end.year - start.year + 1, end):
+        if month % months_apart == 0:
+            when = date(year, month, min(anchor_day, monthrange(year, month)[1]))
+            if start <= when <= end:
+                yield when
+
+
+def _grown(amount, when, today):
+    """What `amount` (today's rate) was worth on `when`, given yearly raises"""
+    return amount / (1 + SALARY_GROWTH) ** ((today - when).days / 365)
+
+
+# ----- household (everything but transactions) -----
+
+def generate_household(seed=0, years=3, earners=2, income_sources=3, accounts=4, retirement_accounts=2,
+                       contribution_frequency='paycheck', today=None):
+    """The budget data dict without transactions"""
+    rng = random.Random(f'{seed}-household')
+    today = today or date.today()
+    start = date(*history_months(years, today)[0], 1)
+    next_id = iter(range(1, 10 ** 9)).__next__
+    surname = rng.choice(LAST_NAMES)
+    names = [f'{FIRST_NAMES[i % len(FIRST_NAMES)]} {surname}' for i in range(max(earners, 1))]
+    
+    # Each earner's job first, then side income
+    sources = []
+    for i in range(income_sources):
+        if i < earners:
+            name, source_name, frequency, yearly = JOBS[i % len(JOBS)]
+            per_payment = yearly / {'weekly': 52, 'bi-weekly': 26, 'monthly': 12}[frequency]
+            income = {
+                'id': next_id(), 'name': name, 'source_name': source_name,
+                'type': 'salary' if i == 0 else 'secondary-salary',
+                'amount': round(per_payment, 2), 'frequency': frequency, 'earner_name': names[i],
+                'is_variable': False, 'federal_tax_percent': 12.0, 'state_tax_percent': 5.0,
+                'social_security_percent': 6.2, 'medicare_percent': 1.45,
+                'other_deductions': round(per_payment * 0.04, 2), 'notes': ''
             }
-        ],
-        'income_sources': [],
-        'fixed_expenses': [
-            {
-                'id': 1,
-                'name': 'Rent',
-                'amount': 950,
-                'frequency': 'monthly',
-                'due_day': 1,
-                'category': 'Housing',
-                'auto_pay': True,
-                'is_paid': True  # Already paid for December
-            },
-            {
-                'id': 2,
-                'name': 'Car Payment',
-                'amount': 285,
-                'frequency': 'monthly',
-                'due_day': 8,  # Due in 2 days - UPCOMING
-                'category': 'Transportation',
-                'auto_pay': True,
-                'is_paid': False
-            },
-            {
-                'id': 3,
-                'name': 'Car Insurance',
-                'amount': 125,
-                'frequency': 'monthly',
-                'due_day': 10,  # Due in 4 days - UPCOMING
-                'category': 'Insurance',
-                'auto_pay': True,
-                'is_paid': False
-            },
-            {
-                'id': 4,
-                'name': 'Electric Bill',
-                'amount': 85,
-                'frequency': 'monthly',
-                'due_day': 9,  # Due in 3 days - UPCOMING
-                'category': 'Utilities',
-                'auto_pay': False,
-                'is_paid': False
-            },
-            {
-                'id': 5,
-                'name': 'Internet',
-                'amount': 60,
-                'frequency': 'monthly',
-                'due_day': 20,
-                'category': 'Utilities',
-                'auto_pay': True,
-                'is_paid': False
-            },
-            {
-                'id': 6,
-                'name': 'Phone Plan',
-                'amount': 75,
-                'frequency': 'monthly',
-                'due_day': 7,  # Due TOMORROW - URGENT!
-                'category': 'Utilities',
-                'auto_pay': True,
-                'is_paid': False
-            },
-            {
-                'id': 7,
-                'name': 'Netflix',
-                'amount': 15.99,
-                'frequency': 'monthly',
-                'due_day': 12,
-                'category': 'Subscriptions',
-                'auto_pay': True,
-                'is_paid': False
-            },
-            {
-                'id': 8,
-                'name': 'Gym Membership',
-                'amount': 30,
-                'frequency': 'monthly',
-                'due_day': 11,  # Due in 5 days - UPCOMING
-                'category': 'Health',
-                'auto_pay': True,
-                'is_paid': False
-            },
-            {
-                'id': 9,
-                'name': 'Water/Sewer',
-                'amount': 45,
-                'frequency': 'monthly',
-                'due_day': 15,
-                'category': 'Utilities',
-                'auto_pay': False,
-                'is_paid': False
-            },
-            {
-                'id': 10,
-                'name': 'Student Loan',
-                'amount': 180,
-                'frequency': 'monthly',
-                'due_day': 25,
-                'category': 'Debt',
-                'auto_pay': True,
-                'is_paid': False
+            payments = [
+                (when, _grown(per_payment, when, today) + rng.uniform(-30, 30))
+                for when in _pay_dates(frequency, start, today, 15)
+            ]
+        else:
+            name, source_name, kind, per_year, typical, owner = SIDE_INCOME[(i - earners) % len(SIDE_INCOME)]
+            frequency = {52: 'weekly', 12: 'monthly'}.get(per_year, 'monthly')
+            variable = kind != 'rental'
+            income = {
+                'id': next_id(), 'name': name, 'source_name': source_name, 'type': kind,
+                'amount': typical, 'frequency': frequency,
+                'earner_name': names[(i - earners) % len(names)] if owner == 'earner' else owner,
+                'is_variable': variable, 'federal_tax_percent': 0, 'state_tax_percent': 0,
+                'social_security_percent': 0, 'medicare_percent': 0, 'other_deductions': 0, 'notes': ''
             }
+            dates = _pay_dates('quarterly' if per_year == 4 else frequency, start, today, rng.randint(1, 28))
+            payments = [
+                (when, max(0, rng.gauss(typical, typical * 0.35)) if variable else typical)
+                for when in dates
+            ]
+        income['next_pay_date'] = (today + timedelta(days=rng.randint(1, 14))).isoformat()
+        income['actual_payments'] = [
+            {'id': next_id(), 'date': when.isoformat(), 'amount': round(amount, 2), 'notes': ''}
+            for when, amount in payments
         ]
-    }
-    
-    # Generate income sources with payments spanning 2023, 2024, and 2025
-    income_sources = []
-    
-    # Primary Salary - steady growth (~$36k/year currently)
-    # Family making ~$60k combined, so primary earner makes ~$36k
-    primary_salary = {
-        'id': 1,
-        'name': 'Manufacturing Supervisor',
-        'source_name': 'Primary Job',
-        'type': 'primary-salary',  # Fixed: use 'primary-salary' to match backend expectations
-        'amount': 3000,  # $36k/year gross
-        'frequency': 'monthly',
-        'earner_name': 'John Kuntz',
-        'next_pay_date': '2025-12-15',
-        'is_variable': False,
-        'actual_payments': [],
-        'federal_tax_percent': 12.0,  # Federal withholding
-        'state_tax_percent': 5.0,     # State tax (varies by state)
-        'social_security_percent': 6.2,  # Standard FICA
-        'medicare_percent': 1.45,     # Standard Medicare
-        'other_deductions': 150,      # Health insurance: $150/month
-        'notes': 'Full-time job with benefits. Net income after taxes: ~$2,359/month. Combined household income ~$62k/year for tax bracket estimator testing.'
-    }
-    
-    # Generate payments for 2023 (lower salary)
-    for month in range(1, 13):
-        date = f"2023-{month:02d}-15"
-        amount = 2700 + random.randint(-30, 30)  # Base $2,700 in 2023 ($32.4k/year)
-        primary_salary['actual_payments'].append({
-            'date': date,
-            'amount': amount,
-            'note': f'Salary payment {month}/2023'
-        })
-    
-    # Generate payments for 2024 (mid salary after raise)
-    for month in range(1, 13):
-        date = f"2024-{month:02d}-15"
-        amount = 2850 + random.randint(-30, 30)  # Base $2,850 in 2024 ($34.2k/year)
-        primary_salary['actual_payments'].append({
-            'date': date,
-            'amount': amount,
-            'note': f'Salary payment {month}/2024'
-        })
-    
-    # Generate payments for 2025 (current salary)
-    for month in range(1, 13):
-        date = f"2025-{month:02d}-15"
-        amount = 3000 + random.randint(-30, 30)  # Base $3,000 in 2025 ($36k/year)
-        primary_salary['actual_payments'].append({
-            'date': date,
-            'amount': amount,
-            'note': f'Salary payment {month}/2025'
-        })
-    
-    income_sources.append(primary_salary)
-    
-    # Secondary Salary (spouse) - part-time retail (~$26k/year)
-    secondary_salary = {
-        'id': 2,
-        'name': 'Retail Cashier',
-        'source_name': 'Part-time Job',
-        'type': 'secondary-salary',
-        'amount': 1000,  # $1,000 bi-weekly = ~$26k/year gross
-        'frequency': 'bi-weekly',
-        'earner_name': 'Sarah Kuntz',
-        'next_pay_date': '2025-12-13',
-        'is_variable': False,
-        'actual_payments': [],
-        'federal_tax_percent': 10.0,  # Lower tax bracket
-        'state_tax_percent': 4.0,     # State tax
-        'social_security_percent': 6.2,  # Standard FICA
-        'medicare_percent': 1.45,     # Standard Medicare
-        'other_deductions': 35,       # Small 401k contribution: $35 bi-weekly
-        'notes': 'Part-time retail job, 25-30 hours/week. Net income after taxes: ~$783/paycheck, ~$1,566/month'
-    }
-    
-    # Generate bi-weekly payments starting June 2023
-    current_date = datetime(2023, 6, 1)
-    end_date = datetime(2025, 12, 31)
-    base_amount_2023 = 850   # ~$22k/year
-    base_amount_2024 = 925   # ~$24k/year  
-    base_amount_2025 = 1000  # ~$26k/year
-    
-    while current_date <= end_date:
-        if current_date.year == 2023:
-            amount = base_amount_2023 + random.randint(-30, 30)
-        elif current_date.year == 2024:
-            amount = base_amount_2024 + random.randint(-30, 30)
+        sources.append(income)
+    
+    salaries = [income for income in sources if income['type'] in ('salary', 'secondary-salary')]
+    retirement = []
+    for i in range(retirement_accounts):
+        name, account_type, tax_type, limit, match, match_limit = RETIREMENT_ACCOUNTS[i % len(RETIREMENT_ACCOUNTS)]
+        employer_plan = account_type in ('401k', '403b')
+        linked = salaries[i % len(salaries)] if salaries and employer_plan else None
+        yearly = limit * rng.uniform(0.2, 0.5)
+        if contribution_frequency == 'paycheck' and linked:
+            dates = [date.fromisoformat(payment['date']) for payment in linked['actual_payments']]
         else:
-            amount = base_amount_2025 + random.randint(-30, 30)
+            frequency = 'monthly' if contribution_frequency == 'paycheck' else contribution_frequency
+            dates = list(_pay_dates(frequency, start, today, 1))
+        per_contribution = yearly / max(1, len(dates) / years)
         
-        secondary_salary['actual_payments'].append({
-            'date': current_date.strftime('%Y-%m-%d'),
-            'amount': amount,
-            'note': f'Bi-weekly paycheck'
-        })
-        current_date += timedelta(days=14)
-    
-    income_sources.append(secondary_salary)
-    
-    # Freelance income - variable, growing over time (~$14-18k/year)
-    freelance = {
-        'id': 3,
-        'name': 'Freelance Web Development',
-        'source_name': 'Side Projects',
-        'type': 'freelance',
-        'amount': 1200,  # Varies significantly month to month
-        'frequency': 'monthly',
-        'earner_name': 'John Kuntz',
-        'is_variable': True,
-        'actual_payments': [],
-        'federal_tax_percent': 0,     # Self-employed, pays quarterly estimated taxes
-        'state_tax_percent': 0,       # Pays quarterly
-        'social_security_percent': 0,  # Pays self-employment tax separately (15.3%)
-        'medicare_percent': 0,        # Included in self-employment tax
-        'other_deductions': 0,        # No regular deductions
-        'notes': 'Variable side income from freelance projects. Income varies $500-$2,000/month. Must pay quarterly estimated taxes.'
-    }
-    
-    # 2023 - sporadic freelance
-    freelance_2023_months = [2, 4, 5, 7, 9, 11]
-    for month in freelance_2023_months:
-        amount = random.randint(500, 1000)
-        day = random.randint(1, 28)
-        freelance['actual_payments'].append({
-            'date': f"2023-{month:02d}-{day:02d}",
-            'amount': amount,
-            'note': 'Freelance project payment'
-        })
-    
-    # 2024 - more consistent freelance
-    freelance_2024_months = [1, 2, 3, 4, 6, 7, 8, 9, 10, 11, 12]
-    for month in freelance_2024_months:
-        amount = random.randint(800, 1500)
-        day = random.randint(1, 28)
-        freelance['actual_payments'].append({
-            'date': f"2024-{month:02d}-{day:02d}",
-            'amount': amount,
-            'note': 'Freelance project payment'
-        })
-    
-    # 2025 - even more consistent, higher rates
-    for month in range(1, 13):
-        amount = random.randint(1000, 2000)
-        day = random.randint(1, 28)
-        freelance['actual_payments'].append({
-            'date': f"2025-{month:02d}-{day:02d}",
-            'amount': amount,
-            'note': 'Freelance project payment'
+        contributions = []
+        for when in dates:
+            amount = round(_grown(per_contribution, when, today), 2)
+            stamp = f'{when.isoformat()}T12:00:00'
+            contributions.append({'id': next_id(), 'date': when.isoformat(), 'amount': amount,
+                                  'contribution_type': 'employee', 'note': '', 'created_at': stamp})
+            if match and linked:
+                contributions.append({'id': next_id(), 'date': when.isoformat(),
+                                      'amount': round(amount * match / 100, 2),
+                                      'contribution_type': 'employer_match', 'note': '', 'created_at': stamp})
+        retirement.append({
+            'id': next_id(), 'account_name': name, 'account_type': account_type, 'contribution_type': tax_type,
+            'annual_limit': limit, 'current_balance': round(sum(c['amount'] for c in contributions) * 1.15, 2),
+            'employer_match_percent': match if linked else 0, 'employer_match_limit': match_limit if linked else 0,
+            'linked_income_id': linked['id'] if linked else None,
+            'contribution_per_paycheck': round(per_contribution, 2) if linked else 0,
+            'notes': '', 'contributions': contributions, 'created_at': f'{start.isoformat()}T00:00:00'
         })
     
-    income_sources.append(freelance)
-    
-    # Investment income - started in 2024 (~$600-800/year)
-    investment = {
-        'id': 4,
-        'name': 'Dividend Income',
-        'source_name': 'Investment Portfolio',
-        'type': 'investment',
-        'amount': 150,  # Average quarterly payment, varies
-        'frequency': 'monthly',  # Treating as monthly for budgeting, though actually quarterly
-        'earner_name': 'Joint',
-        'is_variable': True,
-        'actual_payments': [],
-        'federal_tax_percent': 0,     # Qualified dividends, taxed at capital gains rate on annual return
-        'state_tax_percent': 0,       # Handled on annual return
-        'social_security_percent': 0,  # Not subject to FICA
-        'medicare_percent': 0,        # Not subject to Medicare tax
-        'other_deductions': 0,        # No deductions
-        'notes': 'Quarterly dividend payments from index fund investments. Qualified dividends taxed at 0-15% capital gains rate.'
-    }
-    
-    # Quarterly payments in 2024
-    quarters_2024 = [(3, 15), (6, 15), (9, 15), (12, 15)]
-    for month, day in quarters_2024:
-        amount = random.randint(120, 180)
-        investment['actual_payments'].append({
-            'date': f"2024-{month:02d}-{day:02d}",
-            'amount': amount,
-            'note': 'Quarterly dividend'
-        })
-    
-    # Quarterly payments in 2025
-    quarters_2025 = [(3, 15), (6, 15), (9, 15), (12, 15)]
-    for month, day in quarters_2025:
-        amount = random.randint(140, 200)
-        investment['actual_payments'].append({
-            'date': f"2025-{month:02d}-{day:02d}",
-            'amount': amount,
-            'note': 'Quarterly dividend'
-        })
-    
-    income_sources.append(investment)
-    
-    budget_data['income_sources'] = income_sources
-    
-    # Generate realistic transactions for multiple months (July-December 2025)
-    # This will help test spending pattern alerts and month comparison features
-    transactions = []
-    transaction_id = 1
-    
-    # Realistic spending categories for a family making ~$60k/year
-    # Available spending after fixed expenses: ~$4,000-$4,500/month
-    # Typical monthly spending patterns:
-    # - Groceries: $650-750/month (~$150-180/week)
-    # - Gas: $180-220/month (~$40-50/fill-up, 4-5 times/month)
-    # - Dining: $200-280/month
-    # - Household: $80-120/month
-    # - Healthcare: $30-60/month
-    # - Shopping: $100-200/month
-    # - Clothing: $50-100/month
-    # - Pet Care: $40-60/month
-    # - Personal Care: $30-50/month
-    
-    # Helper function to generate monthly transactions with realistic patterns
-    def generate_monthly_spending(year, month, groceries_multiplier=1.0, dining_multiplier=1.0, shopping_multiplier=1.0):
-        """Generate realistic monthly spending with adjustable category multipliers"""
-        base_transactions = []
-        
-        # Groceries (typically 4 shopping trips per month)
-        for week in range(1, 5):
-            day = week * 7 - random.randint(0, 3)
-            if day > 28:
-                day = 28
-            amount = random.uniform(140, 180) * groceries_multiplier
-            base_transactions.append({
-                'date': f'{year}-{month:02d}-{day:02d}T{random.randint(8,18):02d}:{random.randint(0,59):02d}:00',
-                'merchant': random.choice(['Walmart', 'Aldi', 'Target', 'Kroger']),
-                'description': 'Grocery shopping',
-                'amount': round(amount, 2),
-                'category': 'Groceries',
-                'payment_method': random.choice(['debit', 'debit', 'credit'])
-            })
-        
-        # Gas (4-5 fill-ups per month)
-        for i in range(random.randint(4, 5)):
-            day = random.randint(1, 28)
-            amount = random.uniform(38, 48)
-            base_transactions.append({
-                'date': f'{year}-{month:02d}-{day:02d}T{random.randint(7,19):02d}:{random.randint(0,59):02d}:00',
-                'merchant': random.choice(['Shell', 'Kwik Trip', 'BP', 'Speedway']),
-                'description': 'Gas fill-up',
-                'amount': round(amount, 2),
-                'category': 'Gas/Transportation',
-                'payment_method': random.choice(['credit', 'credit', 'debit'])
-            })
-        
-        # Dining Out (8-12 times per month)
-        for i in range(random.randint(8, 12)):
-            day = random.randint(1, 28)
-            amount = random.uniform(15, 65) * dining_multiplier
-            base_transactions.append({
-                'date': f'{year}-{month:02d}-{day:02d}T{random.randint(11,20):02d}:{random.randint(0,59):02d}:00',
-                'merchant': random.choice(['McDonalds', 'Chipotle', 'Pizza Hut', 'Olive Garden', 'Applebees', 'Panera', 'Subway', 'Starbucks']),
-                'description': random.choice(['Quick lunch', 'Family dinner', 'Date night', 'Coffee', 'Dinner out']),
-                'amount': round(amount, 2),
-                'category': 'Dining Out',
-                'payment_method': random.choice(['debit', 'credit'])
-            })
-        
-        # Household items (3-5 times per month)
-        for i in range(random.randint(3, 5)):
-            day = random.randint(1, 28)
-            amount = random.uniform(20, 70)
-            base_transactions.append({
-                'date': f'{year}-{month:02d}-{day:02d}T{random.randint(9,18):02d}:{random.randint(0,59):02d}:00',
-                'merchant': random.choice(['Target', 'Walmart', 'Dollar General', 'Walgreens']),
-                'description': random.choice(['Household items', 'Cleaning supplies', 'Home goods', 'Toiletries']),
-                'amount': round(amount, 2),
-                'category': 'Household',
-                'payment_method': random.choice(['debit', 'credit'])
-            })
-        
-        # Healthcare (1-3 times per month)
-        for i in range(random.randint(1, 3)):
-            day = random.randint(1, 28)
-            amount = random.uniform(15, 35)
-            base_transactions.append({
-                'date': f'{year}-{month:02d}-{day:02d}T{random.randint(9,17):02d}:{random.randint(0,59):02d}:00',
-                'merchant': random.choice(['CVS', 'Walgreens', 'Rite Aid']),
-                'description': random.choice(['Prescriptions', 'Medicine', 'Pharmacy']),
-                'amount': round(amount, 2),
-                'category': 'Healthcare',
-                'payment_method': 'debit'
-            })
-        
-        # Shopping (2-4 times per month)
-        for i in range(random.randint(2, 4)):
-            day = random.randint(1, 28)
-            amount = random.uniform(30, 120) * shopping_multiplier
-            base_transactions.append({
-                'date': f'{year}-{month:02d}-{day:02d}T{random.randint(10,19):02d}:{random.randint(0,59):02d}:00',
-                'merchant': random.choice(['Amazon', 'Target', 'Walmart', 'Best Buy']),
-                'description': 'Online shopping',
-                'amount': round(amount, 2),
-                'category': 'Shopping',
-                'payment_method': 'credit'
-            })
-        
-        # Clothing (1-2 times per month)
-        if random.random() > 0.3:  # Not every month
-            for i in range(random.randint(1, 2)):
-                day = random.randint(1, 28)
-                amount = random.uniform(40, 95)
-                base_transactions.append({
-                    'date': f'{year}-{month:02d}-{day:02d}T{random.randint(10,18):02d}:{random.randint(0,59):02d}:00',
-                    'merchant': random.choice(['Target', 'Kohls', 'Old Navy', 'TJ Maxx']),
-                    'description': 'Clothing',
-                    'amount': round(amount, 2),
-                    'category': 'Clothing',
-                    'payment_method': 'credit'
-                })
-        
-        # Pet Care (1-2 times per month)
-        if random.random() > 0.2:  # Most months
-            for i in range(random.randint(1, 2)):
-                day = random.randint(1, 28)
-                amount = random.uniform(25, 55)
-                base_transactions.append({
-                    'date': f'{year}-{month:02d}-{day:02d}T{random.randint(9,18):02d}:{random.randint(0,59):02d}:00',
-                    'merchant': 'PetSmart',
-                    'description': random.choice(['Pet supplies', 'Dog food', 'Cat litter']),
-                    'amount': round(amount, 2),
-                    'category': 'Pet Care',
-                    'payment_method': 'debit'
-                })
-        
-        # Personal Care (1-2 times per month)
-        if random.random() > 0.4:
-            for i in range(random.randint(1, 2)):
-                day = random.randint(1, 28)
-                amount = random.uniform(15, 40)
-                base_transactions.append({
-                    'date': f'{year}-{month:02d}-{day:02d}T{random.randint(9,17):02d}:{random.randint(0,59):02d}:00',
-                    'merchant': random.choice(['CVS', 'Ulta', 'Target']),
-                    'description': 'Personal care',
-                    'amount': round(amount, 2),
-                    'category': 'Personal Care',
-                    'payment_method': 'debit'
-                })
-        
-        # Gifts (occasional, more in certain months)
-        # Base gift spending for birthdays/occasions (not December)
-        if random.random() > 0.6:  # Some months have gifts
-            for i in range(random.randint(1, 2)):
-                day = random.randint(1, 28)
-                amount = random.uniform(30, 80)
-                base_transactions.append({
-                    'date': f'{year}-{month:02d}-{day:02d}T{random.randint(10,18):02d}:{random.randint(0,59):02d}:00',
-                    'merchant': random.choice(['Amazon', 'Target', 'Walmart']),
-                    'description': 'Gift purchase',
-                    'amount': round(amount, 2),
-                    'category': 'Gifts',
-                    'payment_method': 'credit'
-                })
-        
-        # Sort by date
-        base_transactions.sort(key=lambda x: x['date'])
-        return base_transactions
-    
-    # Generate historical transactions (July - October 2025)
-    historical_months = []
-    
-    # July 2025 - Typical summer spending
-    historical_months.extend(generate_monthly_spending(2025, 7, groceries_multiplier=1.0, dining_multiplier=1.1, shopping_multiplier=0.9))
-    
-    # August 2025 - Back to school, higher shopping
-    historical_months.extend(generate_monthly_spending(2025, 8, groceries_multiplier=1.05, dining_multiplier=0.95, shopping_multiplier=1.4))
-    
-    # September 2025 - Normal spending
-    historical_months.extend(generate_monthly_spending(2025, 9, groceries_multiplier=1.0, dining_multiplier=1.0, shopping_multiplier=1.0))
-    
-    # October 2025 - Halloween, slightly higher shopping
-    historical_months.extend(generate_monthly_spending(2025, 10, groceries_multiplier=1.0, dining_multiplier=1.05, shopping_multiplier=1.2))
-    
-    # November 2025 transactions (for comparison)
-    november_transactions = [
-        # Week 1 (Nov 1-7)
-        {'date': '2025-11-01T09:00:00', 'merchant': 'Walmart', 'description': 'Grocery shopping', 'amount': 135.20, 'category': 'Groceries', 'payment_method': 'debit'},
-        {'date': '2025-11-01T15:30:00', 'merchant': 'Shell', 'description': 'Gas fill-up', 'amount': 45.00, 'category': 'Gas/Transportation', 'payment_method': 'credit'},
-        {'date': '2025-11-02T12:00:00', 'merchant': 'Subway', 'description': 'Lunch', 'amount': 18.50, 'category': 'Dining Out', 'payment_method': 'debit'},
-        {'date': '2025-11-03T10:30:00', 'merchant': 'Target', 'description': 'Household items', 'amount': 52.75, 'category': 'Household', 'payment_method': 'credit'},
-        {'date': '2025-11-03T18:00:00', 'merchant': 'Pizza Hut', 'description': 'Family dinner', 'amount': 38.90, 'category': 'Dining Out', 'payment_method': 'credit'},
-        {'date': '2025-11-04T11:15:00', 'merchant': 'CVS', 'description': 'Medicine', 'amount': 22.00, 'category': 'Healthcare', 'payment_method': 'debit'},
-        {'date': '2025-11-05T14:45:00', 'merchant': 'Aldi', 'description': 'Weekly groceries', 'amount': 88.40, 'category': 'Groceries', 'payment_method': 'debit'},
-        {'date': '2025-11-06T16:20:00', 'merchant': 'Kwik Trip', 'description': 'Gas', 'amount': 40.25, 'category': 'Gas/Transportation', 'payment_method': 'credit'},
-        {'date': '2025-11-07T19:30:00', 'merchant': 'Chipotle', 'description': 'Dinner', 'amount': 32.60, 'category': 'Dining Out', 'payment_method': 'debit'},
-        
-        # Week 2 (Nov 8-14)
-        {'date': '2025-11-08T09:30:00', 'merchant': 'Walmart', 'description': 'Groceries', 'amount': 118.65, 'category': 'Groceries', 'payment_method': 'debit'},
-        {'date': '2025-11-09T13:00:00', 'merchant': 'Amazon', 'description': 'Online shopping', 'amount': 54.99, 'category': 'Shopping', 'payment_method': 'credit'},
-        {'date': '2025-11-10T10:00:00', 'merchant': 'Shell', 'description': 'Gas', 'amount': 43.50, 'category': 'Gas/Transportation', 'payment_method': 'credit'},
-        {'date': '2025-11-11T12:30:00', 'merchant': 'Olive Garden', 'description': 'Lunch date', 'amount': 48.75, 'category': 'Dining Out', 'payment_method': 'credit'},
-        {'date': '2025-11-12T11:00:00', 'merchant': 'Target', 'description': 'Clothing', 'amount': 72.30, 'category': 'Clothing', 'payment_method': 'credit'},
-        {'date': '2025-11-13T15:30:00', 'merchant': 'PetSmart', 'description': 'Pet supplies', 'amount': 38.50, 'category': 'Pet Care', 'payment_method': 'debit'},
-        {'date': '2025-11-14T09:45:00', 'merchant': 'Aldi', 'description': 'Groceries', 'amount': 92.15, 'category': 'Groceries', 'payment_method': 'debit'},
-        
-        # Week 3 (Nov 15-21)
-        {'date': '2025-11-15T10:30:00', 'merchant': 'Walmart', 'description': 'Weekly shopping', 'amount': 145.80, 'category': 'Groceries', 'payment_method': 'debit'},
-        {'date': '2025-11-16T14:00:00', 'merchant': 'Shell', 'description': 'Gas', 'amount': 41.75, 'category': 'Gas/Transportation', 'payment_method': 'credit'},
-        {'date': '2025-11-17T18:30:00', 'merchant': 'Applebees', 'description': 'Dinner out', 'amount': 58.90, 'category': 'Dining Out', 'payment_method': 'credit'},
-        {'date': '2025-11-18T11:15:00', 'merchant': 'Walgreens', 'description': 'Pharmacy', 'amount': 16.25, 'category': 'Healthcare', 'payment_method': 'debit'},
-        {'date': '2025-11-19T13:45:00', 'merchant': 'Target', 'description': 'Home goods', 'amount': 67.40, 'category': 'Household', 'payment_method': 'credit'},
-        {'date': '2025-11-20T09:00:00', 'merchant': 'Aldi', 'description': 'Groceries', 'amount': 85.60, 'category': 'Groceries', 'payment_method': 'debit'},
-        {'date': '2025-11-21T16:00:00', 'merchant': 'Kwik Trip', 'description': 'Gas', 'amount': 38.90, 'category': 'Gas/Transportation', 'payment_method': 'credit'},
-        
-        # Week 4 (Nov 22-30)
-        {'date': '2025-11-22T10:00:00', 'merchant': 'Walmart', 'description': 'Groceries', 'amount': 128.50, 'category': 'Groceries', 'payment_method': 'debit'},
-        {'date': '2025-11-23T12:30:00', 'merchant': 'Starbucks', 'description': 'Coffee', 'amount': 8.75, 'category': 'Dining Out', 'payment_method': 'debit'},
-        {'date': '2025-11-24T15:00:00', 'merchant': 'CVS', 'description': 'Personal care', 'amount': 24.90, 'category': 'Personal Care', 'payment_method': 'debit'},
-        {'date': '2025-11-25T11:30:00', 'merchant': 'McDonalds', 'description': 'Quick lunch', 'amount': 15.40, 'category': 'Dining Out', 'payment_method': 'debit'},
-        {'date': '2025-11-26T14:15:00', 'merchant': 'Shell', 'description': 'Gas', 'amount': 44.25, 'category': 'Gas/Transportation', 'payment_method': 'credit'},
-        {'date': '2025-11-27T09:45:00', 'merchant': 'Aldi', 'description': 'Thanksgiving groceries', 'amount': 156.80, 'category': 'Groceries', 'payment_method': 'debit'},
-        {'date': '2025-11-28T16:30:00', 'merchant': 'Amazon', 'description': 'Black Friday deal', 'amount': 89.99, 'category': 'Shopping', 'payment_method': 'credit'},
-        {'date': '2025-11-29T10:30:00', 'merchant': 'Target', 'description': 'Black Friday shopping', 'amount': 112.50, 'category': 'Shopping', 'payment_method': 'credit'},
-        {'date': '2025-11-30T13:00:00', 'merchant': 'Panera', 'description': 'Lunch', 'amount': 22.75, 'category': 'Dining Out', 'payment_method': 'debit'},
-    ]
-    
-    # December 2025 transactions (current month)
-    december_transactions = [
-        # Week 1 (Dec 1-7)
-        {'date': '2025-12-01T08:30:00', 'merchant': 'Walmart', 'description': 'Grocery shopping', 'amount': 127.45, 'category': 'Groceries', 'payment_method': 'debit'},
-        {'date': '2025-12-01T14:20:00', 'merchant': 'Shell', 'description': 'Gas fill-up', 'amount': 42.00, 'category': 'Gas/Transportation', 'payment_method': 'credit'},
-        {'date': '2025-12-02T12:15:00', 'merchant': 'Elementary School', 'description': 'School lunch account', 'amount': 35.00, 'category': 'Childcare/Education', 'payment_method': 'debit'},
-        {'date': '2025-12-02T18:45:00', 'merchant': 'Olive Garden', 'description': 'Family dinner', 'amount': 58.75, 'category': 'Dining Out', 'payment_method': 'credit'},
-        {'date': '2025-12-03T09:00:00', 'merchant': 'Starbucks', 'description': 'Coffee', 'amount': 6.25, 'category': 'Dining Out', 'payment_method': 'debit'},
-        {'date': '2025-12-03T16:30:00', 'merchant': 'Target', 'description': 'Household items', 'amount': 45.80, 'category': 'Household', 'payment_method': 'debit'},
-        {'date': '2025-12-04T10:45:00', 'merchant': 'Dollar General', 'description': 'Cleaning supplies', 'amount': 28.30, 'category': 'Household', 'payment_method': 'debit'},
-        {'date': '2025-12-04T19:00:00', 'merchant': 'Pizza Hut', 'description': 'Pizza night', 'amount': 32.50, 'category': 'Dining Out', 'payment_method': 'credit'},
-        {'date': '2025-12-05T11:20:00', 'merchant': 'CVS', 'description': 'Prescriptions', 'amount': 15.00, 'category': 'Healthcare', 'payment_method': 'debit'},
-        {'date': '2025-12-05T16:00:00', 'merchant': 'Shell', 'description': 'Gas', 'amount': 38.50, 'category': 'Gas/Transportation', 'payment_method': 'credit'},
-        {'date': '2025-12-06T13:30:00', 'merchant': 'Aldi', 'description': 'Weekly groceries', 'amount': 95.20, 'category': 'Groceries', 'payment_method': 'debit'},
-        
-        # Week 2 (Dec 8-14) - A bit more spending
-        {'date': '2025-12-08T09:30:00', 'merchant': 'Walmart', 'description': 'Groceries', 'amount': 142.35, 'category': 'Groceries', 'payment_method': 'debit'},
-        {'date': '2025-12-08T14:00:00', 'merchant': 'Amazon', 'description': 'Kids toys', 'amount': 67.99, 'category': 'Shopping', 'payment_method': 'credit'},
-        {'date': '2025-12-09T10:15:00', 'merchant': 'Shell', 'description': 'Gas', 'amount': 41.00, 'category': 'Gas/Transportation', 'payment_method': 'credit'},
-        {'date': '2025-12-09T19:30:00', 'merchant': 'Chipotle', 'description': 'Quick dinner', 'amount': 28.45, 'category': 'Dining Out', 'payment_method': 'debit'},
-        {'date': '2025-12-10T11:00:00', 'merchant': 'Walgreens', 'description': 'Household items', 'amount': 22.75, 'category': 'Household', 'payment_method': 'debit'},
-        {'date': '2025-12-10T17:45:00', 'merchant': 'McDonalds', 'description': 'Kids dinner', 'amount': 18.60, 'category': 'Dining Out', 'payment_method': 'credit'},
-        {'date': '2025-12-11T12:30:00', 'merchant': 'Target', 'description': 'Clothing', 'amount': 85.40, 'category': 'Clothing', 'payment_method': 'credit'},
-        {'date': '2025-12-11T15:00:00', 'merchant': 'PetSmart', 'description': 'Dog food', 'amount': 42.00, 'category': 'Pet Care', 'payment_method': 'debit'},
-        {'date': '2025-12-12T10:00:00', 'merchant': 'Kwik Trip', 'description': 'Gas and snacks', 'amount': 52.30, 'category': 'Gas/Transportation', 'payment_method': 'credit'},
-        {'date': '2025-12-12T18:00:00', 'merchant': 'Buffalo Wild Wings', 'description': 'Date night', 'amount': 72.50, 'category': 'Dining Out', 'payment_method': 'credit'},
-        {'date': '2025-12-13T09:45:00', 'merchant': 'Aldi', 'description': 'Groceries', 'amount': 78.90, 'category': 'Groceries', 'payment_method': 'debit'},
-        {'date': '2025-12-14T11:30:00', 'merchant': 'Starbucks', 'description': 'Coffee', 'amount': 7.50, 'category': 'Dining Out', 'payment_method': 'debit'},
-        {'date': '2025-12-14T16:20:00', 'merchant': 'Auto Zone', 'description': 'Car maintenance', 'amount': 38.75, 'category': 'Gas/Transportation', 'payment_method': 'credit'},
-        
-        # Week 3 (Dec 15-21) - Holiday shopping starting
-        {'date': '2025-12-15T10:00:00', 'merchant': 'Walmart', 'description': 'Weekly shopping', 'amount': 156.80, 'category': 'Groceries', 'payment_method': 'debit'},
-        {'date': '2025-12-15T14:30:00', 'merchant': 'Amazon', 'description': 'Holiday gifts', 'amount': 125.99, 'category': 'Gifts', 'payment_method': 'credit'},
-        {'date': '2025-12-16T09:00:00', 'merchant': 'Shell', 'description': 'Gas', 'amount': 44.00, 'category': 'Gas/Transportation', 'payment_method': 'credit'},
-        {'date': '2025-12-16T19:00:00', 'merchant': 'Papa Johns', 'description': 'Pizza', 'amount': 29.99, 'category': 'Dining Out', 'payment_method': 'debit'},
-        {'date': '2025-12-17T11:15:00', 'merchant': 'Target', 'description': 'Holiday decor', 'amount': 92.30, 'category': 'Shopping', 'payment_method': 'credit'},
-        {'date': '2025-12-17T15:45:00', 'merchant': 'CVS', 'description': 'Pharmacy', 'amount': 18.50, 'category': 'Healthcare', 'payment_method': 'debit'},
-        {'date': '2025-12-18T10:30:00', 'merchant': 'Kohls', 'description': 'Gifts', 'amount': 145.75, 'category': 'Gifts', 'payment_method': 'credit'},
-        {'date': '2025-12-18T18:00:00', 'merchant': 'Applebees', 'description': 'Dinner out', 'amount': 64.25, 'category': 'Dining Out', 'payment_method': 'credit'},
-        {'date': '2025-12-19T09:15:00', 'merchant': 'Kwik Trip', 'description': 'Gas', 'amount': 39.75, 'category': 'Gas/Transportation', 'payment_method': 'credit'},
-        {'date': '2025-12-19T14:00:00', 'merchant': 'Walgreens', 'description': 'Wrapping paper', 'amount': 24.50, 'category': 'Shopping', 'payment_method': 'debit'},
-        {'date': '2025-12-20T10:00:00', 'merchant': 'Aldi', 'description': 'Groceries', 'amount': 88.40, 'category': 'Groceries', 'payment_method': 'debit'},
-        {'date': '2025-12-20T16:30:00', 'merchant': 'Best Buy', 'description': 'Electronics gift', 'amount': 189.99, 'category': 'Gifts', 'payment_method': 'credit'},
-        {'date': '2025-12-21T12:00:00', 'merchant': 'Panera', 'description': 'Lunch', 'amount': 26.80, 'category': 'Dining Out', 'payment_method': 'debit'},
-        
-        # Add a few more December transactions to show pattern changes
-        # More gifts for holidays
-        {'date': '2025-12-03T15:00:00', 'merchant': 'Amazon', 'description': 'Holiday gifts', 'amount': 98.50, 'category': 'Gifts', 'payment_method': 'credit'},
-        {'date': '2025-12-05T10:30:00', 'merchant': 'Toys R Us', 'description': 'Kids gifts', 'amount': 156.75, 'category': 'Gifts', 'payment_method': 'credit'},
-        
-        # More dining out than usual (holiday parties/gatherings)
-        {'date': '2025-12-06T18:30:00', 'merchant': 'Texas Roadhouse', 'description': 'Family gathering', 'amount': 85.40, 'category': 'Dining Out', 'payment_method': 'credit'},
-        {'date': '2025-12-12T19:00:00', 'merchant': 'Red Lobster', 'description': 'Celebration dinner', 'amount': 94.50, 'category': 'Dining Out', 'payment_method': 'credit'},
-        
-        # Extra groceries for holiday baking/cooking
-        {'date': '2025-12-08T10:00:00', 'merchant': 'Walmart', 'description': 'Holiday baking supplies', 'amount': 72.30, 'category': 'Groceries', 'payment_method': 'debit'},
-        {'date': '2025-12-16T14:00:00', 'merchant': 'Costco', 'description': 'Bulk holiday food', 'amount': 185.60, 'category': 'Groceries', 'payment_method': 'debit'},
-    ]
-    
-    # Combine all transactions (historical + November + December)
-    all_transactions = historical_months + november_transactions + december_transactions
-    
-    for tx_data in all_transactions:
-        transactions.append({
-            'id': transaction_id,
-            'date': tx_data['date'],
-            'description': tx_data['description'],
-            'merchant': tx_data['merchant'],
-            'amount': tx_data['amount'],
-            'category': tx_data['category'],
-            'payment_method': tx_data['payment_method']
-        })
-        transaction_id += 1
-    
-    budget_data['transactions'] = transactions
-    
-    # Generate retirement accounts with contributions
-    retirement_accounts = []
-    
-    # 401(k) Account - realistic for $36k/year salary
-    retirement_401k = {
-        'id': 1,
-        'account_name': 'Company 401(k)',
-        'account_type': '401k',
-        'contribution_type': 'pre_tax',
-        'annual_limit': 23500,
-        'current_balance': 18500.00,  # More realistic for someone starting to save
-        'employer_match_percent': 50,  # Company matches 50% (50 cents per dollar)
-        'employer_match_limit': 6,  # Up to 6% of salary
-        'linked_income_id': 1,
-        'contribution_per_paycheck': 180,  # 6% of $3,000 = $180/month
-        'notes': 'Company matches 50% up to 6% of salary. Contributing 6% to maximize match.',
-        'contributions': [],
-        'created_at': '2023-01-01T00:00:00'
-    }
-    
-    # Generate contributions for 401(k) for 2023, 2024 and 2025
-    for year in [2023, 2024, 2025]:
-        months = 12 if year < 2025 else 12  # All 12 months for all years
-        for month in range(1, months + 1):
-            # Employee contribution - 6% of salary
-            date = f"{year}-{month:02d}-15"
-            
-            # Adjust contribution based on salary progression
-            if year == 2023:
-                employee_amount = 162.00  # 6% of $2,700
-                employer_match = 81.00    # 50% match of employee contribution
-            elif year == 2024:
-                employee_amount = 171.00  # 6% of $2,850
-                employer_match = 85.50    # 50% match of employee contribution
-            else:  # 2025
-                employee_amount = 180.00  # 6% of $3,000
-                employer_match = 90.00    # 50% match of employee contribution
-            
-            retirement_401k['contributions'].append({
-                'id': len(retirement_401k['contributions']) + 1,
-                'date': date,
-                'amount': employee_amount,
-                'contribution_type': 'employee',
-                'note': f'Paycheck contribution {month}/{year}',
-                'created_at': f'{year}-{month:02d}-15T12:00:00'
-            })
-            
-            # Employer match
-            retirement_401k['contributions'].append({
-                'id': len(retirement_401k['contributions']) + 1,
-                'date': date,
-                'amount': employer_match,
-                'contribution_type': 'employer_match',
-                'note': f'Employer match {month}/{year}',
-                'created_at': f'{year}-{month:02d}-15T12:00:00'
-            })
-    
-    retirement_accounts.append(retirement_401k)
-    
-    # Roth IRA Account - spouse's retirement account
-    retirement_roth = {
-        'id': 2,
-        'account_name': 'Personal Roth IRA',
-        'account_type': 'roth_ira',
-        'contribution_type': 'post_tax',
-        'annual_limit': 7000,
-        'current_balance': 8250.00,  # Smaller balance, started more recently
-        'employer_match_percent': 0,
-        'employer_match_limit': 0,
-        'linked_income_id': 2,  # Linked to secondary salary
-        'contribution_per_paycheck': 0,
-        'notes': 'Personal retirement savings for spouse. Contributing when possible.',
-        'contributions': [],
-        'created_at': '2023-06-01T00:00:00'
+    now = today.isoformat()
+    return {
+        'categories': [],
+        'total_budget': 0,
+        'accounts': [
+            {'id': next_id(), 'type': kind, 'name': name, 'balance': balance, 'institution': institution,
+             'notes': '', 'created_at': start.isoformat(), 'updated_at': now}
+            for kind, name, institution, balance in (ACCOUNTS[i % len(ACCOUNTS)] for i in range(accounts))
+        ],
+        'income_sources': sources,
+        'fixed_expenses': [
+            {'id': next_id(), 'name': name, 'amount': amount, 'frequency': 'monthly', 'due_day': due_day,
+             'category': category, 'is_autopay': autopay, 'is_paid': due_day < today.day}
+            for name, amount, due_day, category, autopay in BILLS
+        ],
+        'retirement_accounts': retirement,
+        'savings_goals': [{'id': next_id(), 'name': 'Vacation', 'monthly_contribution': 200}]
     }
-    
-    # Generate occasional contributions for Roth IRA (not every month, more realistic)
-    # Contributing when they have extra money
-    contribution_months_2023 = [6, 9, 12]  # Started mid-year
-    contribution_months_2024 = [2, 4, 7, 10, 12]  # More regular
-    contribution_months_2025 = [1, 3, 5, 7, 9, 11]  # Bi-monthly pattern
-    
-    for month in contribution_months_2023:
-        date = f"2023-{month:02d}-01"
-        amount = 250.00 + random.randint(-25, 25)
-        retirement_roth['contributions'].append({
-            'id': len(retirement_roth['contributions']) + 1,
-            'date': date,
-            'amount': amount,
-            'contribution_type': 'employee',
-            'note': f'Extra money from part-time job',
-            'created_at': f'2023-{month:02d}-01T12:00:00'
-        })
-    
-    for month in contribution_months_2024:
-        date = f"2024-{month:02d}-01"
-        amount = 300.00 + random.randint(-25, 25)
-        retirement_roth['contributions'].append({
-            'id': len(retirement_roth['contributions']) + 1,
-            'date': date,
-            'amount': amount,
-            'contribution_type': 'employee',
-            'note': f'Contribution from savings',
-            'created_at': f'2024-{month:02d}-01T12:00:00'
-        })
-    
-    for month in contribution_months_2025:
-        date = f"2025-{month:02d}-01"
-        amount = 350.00 + random.randint(-25, 25)
-        retirement_roth['contributions'].append({
-            'id': len(retirement_roth['contributions']) + 1,
-            'date': date,
-            'amount': amount,
-            'contribution_type': 'employee',
-            'note': f'Monthly IRA contribution',
-            'created_at': f'2025-{month:02d}-01T12:00:00'
+
+
+# ----- transactions -----
+
+def month_plan(years=3, per_month=45, total=None, today=None):
+    """
+    [(year, month, count, first id, last day)] for every month of history.
+    `total` (spread evenly) overrides per_month; the current month only gets
+    the days that have passed.
+    """
+    today = today or date.today()
+    months = history_months(years, today)
+    plan = []
+    next_id = 1
+    for index, (year, month) in enumerate(months):
+        days = monthrange(year, month)[1]
+        last_day = today.day if (year, month) == (today.year, today.month) else days
+        if total is not None:
+            count = total * (index + 1) // len(months) - total * index // len(months)
+        else:
+            count = per_month * last_day // days
+        plan.append((year, month, count, next_id, last_day))
+        next_id += count
+    return plan
+
+
+def month_transactions(seed, year, month, count, first_id, last_day):
+    """One month of transactions, sorted by date"""
+    rng = random.Random(f'{seed}-{year}-{month}')
+    seasonal = SEASONAL.get(month, {})
+    categories = list(SPENDING)
+    weights = [SPENDING[category][0] * seasonal.get(category, 1) for category in categories]
+    records = []
+    for category in rng.choices(categories, weights, k=count):
+        _, (low, high), merchants, descriptions, methods, (opens, closes) = SPENDING[category]
+        records.append({
+            'date': f'{year}-{month:02d}-{rng.randint(1, last_day):02d}T'
+                    f'{rng.randint(opens, closes - 1):02d}:{rng.randint(0, 59):02d}:00',
+            'description': rng.choice(descriptions),
+            'merchant': rng.choice(merchants),
+            'amount': round(rng.uniform(low, high), 2),
+            'category': category,
+            'payment_method': rng.choice(methods)
         })
+    records.sort(key=lambda record: record['date'])
+    for offset, record in enumerate(records):
+        record['id'] = first_id + offset
+    return records
+
+
+def _month_task(task):
+    seed, year, month, count, first_id, last_day = task
+    return f'{year}-{month:02d}', month_transactions(seed, year, month, count, first_id, last_day)
+
+
+def generate_transactions(plan, seed=0, workers=1):
+    """Yield ('YYYY-MM', records) in month order, generating up to `workers` months at a time in other processes"""
+    tasks = [(seed,) + month for month in plan]
+    if workers <= 1:
+        yield from map(_month_task, tasks)
+        return
+    # A bounded window of pending months, so fast workers can't pile finished months up in memory
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(_month_task, task))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# ----- writing -----
+
+def _reported(months, on_month):
+    for month, records in months:
+        on_month(month, records)
+        yield month, records
+
+
+def open_backend(data_dir, backend='json'):
+    """The storage backend for budget_data.json in data_dir (sqlite uses budget_data.db next to it)"""
+    if SERVER_DIR not in sys.path:
+        sys.path.insert(0, SERVER_DIR)
+    import storage
+    
+    data_file = os.path.join(data_dir, 'budget_data.json')
+    if backend == 'json':
+        return storage.JsonStorage(data_file)
+    if backend == 'sqlite':
+        return storage.SqliteStorage(os.path.splitext(data_file)[0] + '.db')
+    raise ValueError(f'Unknown storage backend: {backend}')
+
+
+def write_dataset(data_dir, backend='json', seed=0, years=3, per_month=45, total=None, earners=2,
+                  income_sources=3, accounts=4, retirement_accounts=2, contribution_frequency='paycheck',
+                  workers=1, today=None, on_month=None):
+    """Generate a dataset into data_dir; returns the household dict (without transactions)"""
+    today = today or date.today()
+    os.makedirs(data_dir, exist_ok=True)
+    household = generate_household(seed, years, earners, income_sources, accounts, retirement_accounts,
+                                   contribution_frequency, today)
+    months = generate_transactions(month_plan(years, per_month, total, today), seed, workers)
+    if on_month:
+        months = _reported(months, on_month)
+    
+    store = open_backend(data_dir, backend)
+    try:
+        store.import_data(household, months)
+    finally:
+        store.close()
+    return household
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic household for the Budget App')
+    parser.add_argument('--years', type=int, default=3, help='years of history (default 3)')
+    parser.add_argument('--transactions-per-month', type=int, default=45)
+    parser.add_argument('--transactions', type=int, help='total transactions, spread evenly (overrides per month)')
+    parser.add_argument('--earners', type=int, default=2)
+    parser.add_argument('--income-sources', type=int, default=3, help="earners' jobs first, then side income")
+    parser.add_argument('--accounts', type=int, default=4)
+    parser.add_argument('--retirement-accounts', type=int, default=2)
+    parser.add_argument('--contribution-frequency', choices=CONTRIBUTION_FREQUENCIES, default='paycheck')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--backend', choices=['json', 'sqlite'], default=os.environ.get('BUDGET_APP_STORAGE', 'json'))
+    parser.add_argument('--data-dir', default=os.environ.get('BUDGET_APP_DATA_DIR', SERVER_DIR))
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='processes generating months')
+    args = parser.parse_args()
     
-    retirement_accounts.append(retirement_roth)
-    
-    budget_data['retirement_accounts'] = retirement_accounts
-    
-    # Save to file
-    with open(DATA_FILE, 'w') as f:
-        json.dump(budget_data, f, indent=2)
-    
-    print(f"✅ Test data generated successfully!")
-    print(f"📁 Saved to: {DATA_FILE}")
+    print("🔧 Generating test data for Budget App...\n")
+    started = time.perf_counter()
+    by_year = {}
+    
+    def progress(month, records):
+        year = by_year.setdefault(month[:4], [0, 0.0])
+        year[0] += len(records)
+        year[1] += sum(record['amount'] for record in records)
+        print(f"   {month}: {len(records):,} transactions", end='\r', flush=True)
+    
+    household = write_dataset(
+        args.data_dir, args.backend, args.seed, args.years, args.transactions_per_month, args.transactions,
+        args.earners, args.income_sources, args.accounts, args.retirement_accounts, args.contribution_frequency,
+        args.workers, on_month=progress
+    )
+    
+    print(f"✅ Test data generated in {time.perf_counter() - started:.1f}s" + ' ' * 20)
+    print(f"📁 Saved to: {os.path.abspath(args.data_dir)} ({args.backend} storage)")
     print(f"\n📊 Summary:")
-    print(f"   - Income sources: {len(income_sources)}")
-    print(f"   - Retirement accounts: {len(retirement_accounts)}")
-    print(f"   - Fixed expenses: {len(budget_data['fixed_expenses'])}")
-    print(f"   - Transactions (December 2025): {len(budget_data['transactions'])}")
-    print(f"   - Years covered: 2023, 2024, 2025")
-    
-    # Calculate totals by year
-    totals = {2023: 0, 2024: 0, 2025: 0}
-    for source in income_sources:
-        for payment in source['actual_payments']:
-            year = int(payment['date'][:4])
-            totals[year] += payment['amount']
-    
-    print(f"\n💰 Income by Year:")
-    print(f"   - 2023: ${totals[2023]:,.2f}")
-    print(f"   - 2024: ${totals[2024]:,.2f}")
-    print(f"   - 2025: ${totals[2025]:,.2f}")
-    print(f"   - Growth 2023→2024: {((totals[2024] - totals[2023]) / totals[2023] * 100):.1f}%")
-    print(f"   - Growth 2024→2025: {((totals[2025] - totals[2024]) / totals[2024] * 100):.1f}%")
-    
-    # Calculate retirement contributions
-    retirement_total = 0
-    for account in retirement_accounts:
-        for contrib in account['contributions']:
-            retirement_total += contrib['amount']
-    
-    print(f"\n🏦 Retirement Contributions:")
-    print(f"   - Total contributed: ${retirement_total:,.2f}")
-    print(f"   - Total balance: ${sum(acc['current_balance'] for acc in retirement_accounts):,.2f}")
-    
-    # Calculate spending by month
-    november_spending = sum(tx['amount'] for tx in budget_data['transactions'] if '2025-11-' in tx['date'])
-    december_spending = sum(tx['amount'] for tx in budget_data['transactions'] if '2025-12-' in tx['date'])
-    
-    print(f"\n💳 November 2025 Spending:")
-    print(f"   - Total spent: ${november_spending:,.2f}")
-    print(f"   - Number of transactions: {sum(1 for tx in budget_data['transactions'] if '2025-11-' in tx['date'])}")
-    
-    print(f"\n💳 December 2025 Spending (so far):")
-    print(f"   - Total spent: ${december_spending:,.2f}")
-    print(f"   - Number of transactions: {sum(1 for tx in budget_data['transactions'] if '2025-12-' in tx['date'])}")
-    print(f"   - Average per transaction: ${december_spending / sum(1 for tx in budget_data['transactions'] if '2025-12-' in tx['date']) if december_spending > 0 else 0:.2f}")
-    
-    # Calculate month-over-month change
-    if november_spending > 0:
-        spending_change = december_spending - november_spending
-        spending_percent = (spending_change / november_spending) * 100
-        print(f"\n📊 Month-over-Month Comparison:")
-        print(f"   - Spending change: ${spending_change:,.2f} ({spending_percent:+.1f}%)")
-        if spending_change < 0:
-            print(f"   - ✅ Great! Spending decreased from last month")
-        elif spending_change > 0:
-            print(f"   - ⚠️  Spending increased from last month")
-    
-    # Calculate spending by category (December only)
-    category_totals = {}
-    for tx in budget_data['transactions']:
-        if '2025-12-' in tx['date']:
-            cat = tx['category']
-            category_totals[cat] = category_totals.get(cat, 0) + tx['amount']
-    
-    print(f"\n📊 December Spending by Category:")
-    for cat, amount in sorted(category_totals.items(), key=lambda x: x[1], reverse=True):
-        print(f"   - {cat}: ${amount:,.2f}")
+    print(f"   - Income sources: {len(household['income_sources'])} across {args.earners} earner(s)")
+    print(f"   - Accounts: {len(household['accounts'])}")
+    print(f"   - Retirement accounts: {len(household['retirement_accounts'])}")
+    print(f"   - Fixed expenses: {len(household['fixed_expenses'])}")
+    print(f"   - Transactions: {sum(count for count, _ in by_year.values()):,}")
+    
+    print(f"\n💰 Income and spending by year:")
+    for year in sorted(by_year):
+        income = sum(payment['amount'] for source in household['income_sources']
+                     for payment in source['actual_payments'] if payment['date'].startswith(year))
+        count, spent = by_year[year]
+        print(f"   - {year}: ${income:,.2f} earned, ${spent:,.2f} spent in {count:,} transactions")
+    
+    contributed = sum(c['amount'] for account in household['retirement_accounts'] for c in account['contributions'])
+    print(f"\n🏦 Retirement contributions ({args.contribution_frequency}): ${contributed:,.2f}")
+    return 0
+
 
 if __name__ == '__main__':
-    print("🔧 Generating test data for Budget App...\n")
-    generate_test_data()
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""
+Materialised month x category spending aggregates
+For every (year, month, category) that has transactions the table keeps the
+count, sum, min and max of the amounts (in integer cents), plus the sum and
+count of the positive ones (expenses), which is what the spending analytics
+use. It is an observer of PartitionedTransactions like TransactionColumns: a
+single add or delete updates one bucket in O(1), bulk changes (imports,
+update_budget) mark the table stale and it is rebuilt on next use.
+"""
+import threading
+
+from columnar import to_cents
+
+
+class Bucket:
+    """Aggregates of one (year, month, category); amounts in cents"""
+    
+    __slots__ = ('count', 'total', 'spent_count', 'spent', 'low', 'high', 'extremes_stale')
+    
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.spent_count = 0
+        self.spent = 0
+        self.low = None
+        self.high = None
+        self.extremes_stale = False
+    
+    def add(self, cents):
+        self.count += 1
+        self.total += cents
+        if cents > 0:
+            self.spent_count += 1
+            self.spent += cents
+        if not self.extremes_stale:
+            if self.low is None or cents < self.low:
+                self.low = cents
+            if self.high is None or cents > self.high:
+                self.high = cents
+    
+    def remove(self, cents):
+        self.count -= 1
+        self.total -= cents
+        if cents > 0:
+            self.spent_count -= 1
+            self.spent -= cents
+        # Removing an extreme can't be undone from the aggregates alone;
+        # min/max are recomputed from the month's records when next asked for
+        if cents == self.low or cents == self.high:
+            self.extremes_stale = True
+    
+    def as_tuple(self):
+        return (self.count, self.total, self.low, self.high, self.spent_count, self.spent)
+
+
+class CategoryAggregates:
+    """(year, month) -> {category: Bucket}, kept in sync with the transactions"""
+    
+    def __init__(self):
+        self.months = {}
+        self.stale = True
+        self.rebuilds = 0
+        self.version = 0
+        self.lock = threading.RLock()
+        self._transactions = None
+    
+    # ----- maintenance -----
+    
+    @staticmethod
+    def _key(transaction):
+        """((year, month), category, cents) or None for records the analytics skip"""
+        when = getattr(transaction, 'when', None)
+        value = getattr(transaction, 'value', None)
+        if when is None or value is None:
+            return None
+        return (when.year, when.month), transaction.get('category'), to_cents(value)
+    
+    def rebuild(self, transactions):
+        with self.lock:
+            self.months = {}
+            for transaction in transactions:
+                key = self._key(transaction)
+                if key is not None:
+                    self._add(*key)
+            self._transactions = transactions
+            self.stale = False
+            self.rebuilds += 1
+            self.version += 1
+    
+    def ensure(self, transactions):
+        """Rebuild from transactions if a bulk change made the table stale"""
+        with self.lock:
+            if self.stale:
+                self.rebuild(transactions)
+            return self
+    
+    def _add(self, month, category, cents):
+        categories = self.months.get(month)
+        if categories is None:
+            categories = self.months[month] = {}
+        bucket = categories.get(category)
+        if bucket is None:
+            bucket = categories[category] = Bucket()
+        bucket.add(cents)
+    
+    def added(self, transaction):
+        with self.lock:
+            if self.stale:
+                return
+            key = self._key(transaction)
+            if key is not None:
+                self._add(*key)
+                self.version += 1
+    
+    def removed(self, transaction):
+        with self.lock:
+            if self.stale:
+                return
+            key = self._key(transaction)
+            if key is None:
+                return
+            month, category, cents = key
+            bucket = self.months.get(month, {}).get(category)
+            if bucket is None or bucket.count == 0:
+                # Not found (shouldn't happen): start over on next use
+                self.stale = True
+                return
+            bucket.remove(cents)
+            if bucket.count == 0:
+                del self.months[month][category]
+                if not self.months[month]:
+                    del self.months[month]
+            self.version += 1
+    
+    def invalidate(self):
+        with self.lock:
+            self.stale = True
+    
+    # ----- queries -----
+    
+    def month(self, year, month):
+        """{category: Bucket} for one month (empty if it has no transactions)"""
+        return self.months.get((year, month), {})
+    
+    def sorted_months(self):
+        """(year, month) of every month with transactions, oldest first"""
+        return sorted(self.months)
+    
+    def spending(self, year, month):
+        """(total cents, count) of positive amounts in a month"""
+        total = 0
+        count = 0
+        for bucket in self.month(year, month).values():
+            total += bucket.spent
+            count += bucket.spent_count
+        return total, count
+    
+    def spending_by_category(self, year, month, default=None):
+        """Category -> cents of positive amounts in a month (categories with no expenses left out)"""
+        result = {}
+        for category, bucket in self.month(year, month).items():
+            if bucket.spent_count:
+                name = default if category is None else category
+                result[name] = result.get(name, 0) + bucket.spent
+        return result
+    
+    def bucket(self, year, month, category):
+        """The Bucket of one (year, month, category), min/max brought up to date; None if empty"""
+        with self.lock:
+            bucket = self.month(year, month).get(category)
+            if bucket is not None and bucket.extremes_stale:
+                self._refresh_extremes(year, month, category, bucket)
+            return bucket
+    
+    def _refresh_extremes(self, year, month, category, bucket):
+        partition = getattr(self._transactions, 'partition', None)
+        records = partition(f"{year}-{month:02d}") if partition else self._transactions
+        amounts = [
+            key[2] for key in map(self._key, records)
+            if key is not None and key[0] == (year, month) and key[1] == category
+        ]
+        bucket.low = min(amounts) if amounts else None
+        bucket.high = max(amounts) if amounts else None
+        bucket.extremes_stale = False
+    
+    def snapshot(self):
+        """{(year, month, category): (count, sum, min, max, positive count, positive sum)} with current min/max"""
+        with self.lock:
+            return {
+                (year, month, category): self.bucket(year, month, category).as_tuple()
+                for (year, month), categories in self.months.items()
+                for category in list(categories)
+            }
+    
+    @classmethod
+    def recompute(cls, transactions):
+        """The same table as snapshot(), computed from scratch (for verification)"""
+        table = cls()
+        table.rebuild(transactions)
+        return table.snapshot()
@@ -1,11 +1,23 @@
 from flask import Flask, jsonify, request, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+import atexit
+import functools
+import itertools
 import json
+import multiprocessing
 import os
+import signal
 import sys
+import threading
 from datetime import datetime
 from pathlib import Path
 
+# Overdraft-risk workers (see risk.py) are spawned processes that re-import the
+# main module, and with it this one; they only need risk.simulate, so the
+# startup below (storage, writer thread, sampler, loading the data) is skipped there
+SIMULATION_WORKER = multiprocessing.current_process().name != 'MainProcess'
+
 # Determine the correct path to frontend files
 # In packaged app, server is in app.asar.unpacked/server
 # frontend is in app.asar/frontend (or app.asar.unpacked/frontend if we unpack it)
@@ -31,7 +43,7 @@ except ImportError:
 # Import changelog manager
 try:
     from changelog_manager import ChangelogManager
-    changelog_manager = ChangelogManager()
+    changelog_manager = ChangelogManager() if not SIMULATION_WORKER else None
     CHANGELOG_AVAILABLE = True
 except ImportError:
     CHANGELOG_AVAILABLE = False
@@ -61,35 +73,303 @@ budget_data = {
     'fixed_expenses': []  # Monthly fixed expenses (bills, subscriptions, etc.)
 }
 
-# Load data from file if it exists
+# Storage backend (JSON file by default, SQLite with BUDGET_APP_STORAGE=sqlite)
+sys.path.insert(0, str(Path(__file__).parent))
+from storage import open_storage, WriteBehind, inserted, updated, deleted, updated_setting
+from partitions import PartitionedTransactions, date_key, encode_cursor, decode_cursor
+from columnar import TransactionColumns, epoch_day, from_epoch_day, month_days
+from aggregates import CategoryAggregates
+import income_stats
+import contribution_totals
+from models import Transaction, IncomePayment, RetirementContribution, FixedExpense, Account, to_json
+from registry import EntityRegistry, ID_SEQUENCE_KEY
+from context import FinancialContext
+from memo import DataVersion, ResponseCache
+from schedule import PaySchedule
+from bills import BillCalendar
+import forecast
+import risk
+import retirement
+import taxes
+import metrics
+import profiling
+import sampling
+
+# Records are typed models in indexed collections; responses still use the plain JSON shape
+class BudgetJSONProvider(DefaultJSONProvider):
+    @staticmethod
+    def default(o):
+        try:
+            return to_json(o)
+        except TypeError:
+            return DefaultJSONProvider.default(o)
+
+app.json = BudgetJSONProvider(app)
+
+if not SIMULATION_WORKER:
+    data_store = open_storage(DATA_FILE)
+    print(f"Storage backend: {data_store.name}")
+    atexit.register(data_store.close)
+    
+    # Writes happen on a background thread; bursts within BUDGET_APP_WRITE_DELAY
+    # seconds are coalesced into a single disk write
+    persister = WriteBehind(data_store, max_delay=float(os.environ.get('BUDGET_APP_WRITE_DELAY', 0.25)))
+    atexit.register(persister.close)
+# Held from preparing a batch until it is queued, so batches reach disk in the order they were prepared
+persist_lock = threading.Lock()
+
+def _handle_sigterm(signum, frame):
+    """Exit through atexit so pending writes are flushed"""
+    print("Received SIGTERM, flushing data before exit...")
+    sys.exit(0)
+
+if threading.current_thread() is threading.main_thread() and not SIMULATION_WORKER:
+    signal.signal(signal.SIGTERM, _handle_sigterm)
+
+# id -> record indexes for every collection, and the id allocator
+registry = EntityRegistry()
+
+# Date-sorted columns over all transactions, used by the analytics endpoints
+transaction_columns = TransactionColumns()
+
+def get_transaction_columns():
+    """Columnar view of every transaction (built on first use, then kept in sync)"""
+    return transaction_columns.ensure(budget_data['transactions'])
+
+# Per (year, month, category) count/sum/min/max, updated on every add and delete
+category_aggregates = CategoryAggregates()
+
+def get_category_aggregates():
+    """Month x category aggregates of every transaction (built on first use, then kept in sync)"""
+    return category_aggregates.ensure(budget_data['transactions'])
+
+# Bumped after every change to budget_data; memoized responses are keyed on it
+data_version = DataVersion()
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get('BUDGET_APP_CACHE_ENTRIES', 256)),
+    max_bytes=int(os.environ.get('BUDGET_APP_CACHE_MB', 32)) * 1024 * 1024
+)
+
+def memoized(view):
+    """
+    Serve a read-only endpoint from response_cache while budget_data and the
+    date are unchanged. Only successful JSON responses are stored.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        # The version is read before computing, so a change made meanwhile
+        # leaves the result under a key that is already out of date
+        key = (view.__name__, tuple(sorted(request.args.items(multi=True))), tuple(sorted(kwargs.items())),
+               data_version.value, datetime.now().date())
+        body = response_cache.get(key)
+        if body is not None:
+            return app.response_class(body, mimetype='application/json')
+        response = app.make_response(view(*args, **kwargs))
+        if response.status_code == 200 and response.mimetype == 'application/json':
+            response_cache.put(key, response.get_data())
+        return response
+    return wrapper
+
+@app.teardown_request
+def _bump_data_version(exc):
+    """Any write request may have changed budget_data (even one that failed half way)"""
+    if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+        data_version.bump()
+
+# Per-route latency, error and size counters, served at /api/metrics; requests
+# slower than BUDGET_APP_SLOW_MS are also kept in a log
+request_metrics = metrics.Metrics(
+    slow_seconds=float(os.environ.get('BUDGET_APP_SLOW_MS', 500)) / 1000,
+    slow_log_size=int(os.environ.get('BUDGET_APP_SLOW_LOG', 100))
+)
+
+@app.before_request
+def _start_request_metrics():
+    metrics.start()
+
+@app.after_request
+def _record_request_metrics(response):
+    timing = metrics.finish()
+    if timing is None:
+        return response
+    seconds, scanned = timing
+    route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+    size = response.calculate_content_length() or 0
+    request_metrics.record(request.method, route, response.status_code, seconds, size, scanned)
+    if request_metrics.is_slow(seconds):
+        entry = {
+            'at': datetime.now().isoformat(timespec='seconds'),
+            'method': request.method,
+            'route': route,
+            'path': request.path,
+            'args': request.args.to_dict(flat=False),
+            'status': response.status_code,
+            'duration_ms': round(seconds * 1000, 1),
+            'request_bytes': request.content_length or 0,
+            'response_bytes': size,
+            'transactions_scanned': scanned,
+            'transactions_total': len(budget_data['transactions'])
+        }
+        request_metrics.log_slow(entry)
+        print(f"🐢 Slow request: {request.method} {request.path} took {entry['duration_ms']} ms "
+              f"({scanned} of {entry['transactions_total']} transactions scanned)")
+    return response
+
+# cProfile for single requests (?__profile=1 or X-Profile: 1), only with BUDGET_APP_PROFILE=1
+PROFILING_ENABLED = os.environ.get('BUDGET_APP_PROFILE') == '1'
+request_profiler = profiling.Profiler(
+    DATA_FILE.parent / 'profiles',
+    keep=int(os.environ.get('BUDGET_APP_PROFILE_KEEP', 50))
+)
+
+@app.before_request
+def _start_request_profile():
+    if not PROFILING_ENABLED or not request.path.startswith('/api/'):
+        return
+    if request.args.get('__profile') == '1' or request.headers.get('X-Profile') == '1':
+        if not request_profiler.start():
+            print(f"⚠️ Not profiling {request.path}: another profile is running")
+
+@app.after_request
+def _save_request_profile(response):
+    if not PROFILING_ENABLED:
+        return response
+    saved = request_profiler.stop(request.method, request.endpoint)
+    if saved is not None:
+        name, top = saved
+        response.headers['X-Profile'] = name
+        response.headers['X-Profile-Top'] = '; '.join(
+            f"{entry['cumulative_ms']}ms {entry['function']}" for entry in top[:5]
+        )
+        print(f"📊 Profiled {request.method} {request.path} -> {request_profiler.directory / name}")
+    return response
+
+@app.teardown_request
+def _discard_request_profile(exc):
+    """A request that never reached after_request mustn't keep the profiler busy"""
+    if PROFILING_ENABLED:
+        request_profiler.discard()
+
+# Background sampling of the stacks of in-flight requests, for /api/admin/flamegraph
+# (BUDGET_APP_SAMPLE_HZ=0 turns it off)
+SAMPLE_HZ = float(os.environ.get('BUDGET_APP_SAMPLE_HZ', 100))
+stack_sampler = sampling.SamplingProfiler(
+    hz=SAMPLE_HZ or 1,
+    capacity=int(os.environ.get('BUDGET_APP_SAMPLE_BUFFER', 100000))
+)
+if SAMPLE_HZ > 0 and not SIMULATION_WORKER:
+    stack_sampler.start()
+
+@app.before_request
+def _begin_stack_sampling():
+    # The thread rendering the flamegraph mustn't show up in it
+    if request.endpoint == 'get_flamegraph':
+        stack_sampler.exclude()
+    else:
+        stack_sampler.begin()
+
+@app.teardown_request
+def _end_stack_sampling(exc):
+    stack_sampler.end()
+
+def dashboard_context():
+    """Shared income/expense/balance/month-to-date figures for one dashboard request"""
+    return FinancialContext(budget_data, get_category_aggregates, bill_calendar)
+
+# Every fixed-expense occurrence from the 1st of this month on, precomputed
+# once per data version and month; windows up to MAX_BILL_WINDOW_DAYS fit
+MAX_BILL_WINDOW_DAYS = 366
+_bill_calendar = (None, None)
+
+def bill_calendar():
+    """BillCalendar for the current data version (rebuilt after any write or at the start of a month)"""
+    global _bill_calendar
+    start = datetime.now().date().replace(day=1)
+    key = (data_version.value, start)
+    cached_key, calendar = _bill_calendar
+    if cached_key != key:
+        calendar = BillCalendar(budget_data['fixed_expenses'], start, MAX_BILL_WINDOW_DAYS + 32)
+        _bill_calendar = (key, calendar)
+    return calendar
+
+def _load_transaction_partition(month):
+    """Read one month of transactions, after any queued writes have landed"""
+    persister.flush(timeout=30)
+    return data_store.load_transaction_partition(month)
+
+# Load data from storage if it exists
 def load_data():
-    """Load budget data from JSON file"""
+    """Load budget data from the storage backend"""
     global budget_data
     try:
-        if DATA_FILE.exists():
-            with open(DATA_FILE, 'r') as f:
-                loaded_data = json.load(f)
-                budget_data.update(loaded_data)
-                print(f"Data loaded successfully from {DATA_FILE}")
+        loaded_data = data_store.load()
+        if loaded_data is not None:
+            budget_data.update(loaded_data)
+            print(f"Data loaded successfully from {data_store.path}")
         else:
             print(f"No existing data file found. Starting with empty data.")
+        
+        # Transactions are partitioned by month: recent months load now, older ones on demand
+        budget_data['transactions'] = PartitionedTransactions(
+            _load_transaction_partition,
+            data_store.transaction_manifest(),
+            eager_months=int(os.environ.get('BUDGET_APP_EAGER_MONTHS', 3)),
+            max_loaded=int(os.environ.get('BUDGET_APP_MAX_PARTITIONS', 24)),
+            factory=Transaction.from_dict,
+            index=data_store.transaction_index()
+        )
+        reassigned = registry.attach(budget_data)
+        transaction_columns.invalidate()
+        category_aggregates.invalidate()
+        budget_data['transactions'].observers.extend([transaction_columns, category_aggregates])
+        data_version.bump()
+        
+        if reassigned:
+            # Older versions could give two records the same timestamp id
+            print(f"Assigned new ids to {reassigned} records with missing or duplicate ids")
+            save_data()
     except Exception as e:
         print(f"Error loading data: {e}")
 
-# Save data to file
+# Save data to storage
 def save_data():
-    """Save budget data to JSON file"""
+    """Save all budget data (full rewrite) and wait for it to reach disk"""
+    data_version.bump()
+    try:
+        with persist_lock:
+            _sync_id_sequence()
+            persister.submit(data_store.prepare_save(budget_data))
+        if not persister.flush(timeout=30):
+            raise RuntimeError(persister.last_error or 'timed out waiting for write')
+        print(f"Data saved successfully to {data_store.path}")
+        return True
+    except Exception as e:
+        print(f"Error saving data: {e}")
+        return False
+
+def _sync_id_sequence():
+    """Copy the allocator's high-water mark into budget_data; True if it moved"""
+    if registry.allocator.take_dirty():
+        budget_data[ID_SEQUENCE_KEY] = registry.allocator.last
+        return True
+    return False
+
+def persist(*mutations):
+    """Queue the records changed by a request for the write-behind thread (see storage.Mutation)"""
+    data_version.bump()
     try:
-        with open(DATA_FILE, 'w') as f:
-            json.dump(budget_data, f, indent=2)
-        print(f"Data saved successfully to {DATA_FILE}")
+        with persist_lock:
+            if _sync_id_sequence():
+                mutations += (updated_setting(ID_SEQUENCE_KEY),)
+            persister.submit(data_store.prepare(budget_data, mutations))
         return True
     except Exception as e:
         print(f"Error saving data: {e}")
         return False
 
 # Load data on startup
-load_data()
+if not SIMULATION_WORKER:
+    load_data()
 
 # Helper function for variable income statistics
 def _update_variable_income_stats(income):
@@ -115,36 +395,26 @@ def _update_variable_income_stats(income):
         income['income_variance'] = 0
         return
     
-    # Get payments from last 6 months
-    six_months_ago = datetime.now() - timedelta(days=180)
-    recent_payments = [
-        p for p in payments
-        if datetime.strptime(p['date'], '%Y-%m-%d') >= six_months_ago
+    # Monthly totals of the last 6 months, from the running per-month buckets
+    cutoff = datetime.now() - timedelta(days=180)
+    stats = income_stats.ensure(income)
+    monthly_amounts = [
+        bucket['total']
+        for _, bucket in income_stats.monthly_totals(stats, since=f"{cutoff.year}-{cutoff.month:02d}")
     ]
     
-    if not recent_payments:
+    if not monthly_amounts:
         return
     
-    # Group payments by month to calculate monthly totals
-    from collections import defaultdict
-    monthly_totals = defaultdict(float)
-    
-    for payment in recent_payments:
-        payment_date = datetime.strptime(payment['date'], '%Y-%m-%d')
-        month_key = f"{payment_date.year}-{payment_date.month:02d}"
-        monthly_totals[month_key] += payment['amount']
-    
     # Calculate average and variance
-    if monthly_totals:
-        monthly_amounts = list(monthly_totals.values())
-        income['average_monthly'] = mean(monthly_amounts)
-        
-        # Calculate coefficient of variation (standard deviation / mean * 100)
-        if len(monthly_amounts) > 1 and income['average_monthly'] > 0:
-            std_dev = stdev(monthly_amounts)
-            income['income_variance'] = (std_dev / income['average_monthly']) * 100
-        else:
-            income['income_variance'] = 0
+    income['average_monthly'] = mean(monthly_amounts)
+    
+    # Calculate coefficient of variation (standard deviation / mean * 100)
+    if len(monthly_amounts) > 1 and income['average_monthly'] > 0:
+        std_dev = stdev(monthly_amounts)
+        income['income_variance'] = (std_dev / income['average_monthly']) * 100
+    else:
+        income['income_variance'] = 0
     
     # Mark as variable if variance is high (>15%)
     if income['income_variance'] > 15:
@@ -607,7 +877,8 @@ def load_test_data():
             })
             transaction_id += 1
     
-    # Save the test data
+    # Index the sample records and save the test data
+    registry.attach(budget_data)
     save_data()
     print(f"Test data loaded successfully!")
     print(f"  - {len(budget_data['accounts'])} accounts")
@@ -644,36 +915,175 @@ def serve_static(path):
 def health():
     return jsonify({'status': 'Server is running', 'backend': 'Python Flask'})
 
+@app.route('/api/admin/flush', methods=['POST'])
+def admin_flush():
+    """Barrier: returns once every queued write is on disk"""
+    if persister.flush(timeout=30):
+        return jsonify({'success': True, 'writes': persister.writes})
+    return jsonify({'success': False, 'error': str(persister.last_error or 'Timed out waiting for write')}), 500
+
+@app.route('/api/admin/cache', methods=['GET'])
+def admin_cache():
+    """Response cache size and hit/miss counters"""
+    return jsonify({'data_version': data_version.value, **response_cache.stats()})
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Per-route request counts, errors, latency percentiles, response sizes and
+    transactions scanned, plus the slow-request log. JSON by default; the
+    Prometheus text format with ?format=prometheus or an Accept header that
+    prefers text/plain (as Prometheus scrapers send).
+    """
+    wanted = request.args.get('format')
+    if wanted is None:
+        best = request.accept_mimetypes.best_match(['application/json', 'text/plain', 'text/plain;version=0.0.4'])
+        wanted = 'prometheus' if best and best.startswith('text/plain') else 'json'
+    if wanted == 'prometheus':
+        return app.response_class(request_metrics.to_prometheus(), mimetype='text/plain; version=0.0.4')
+    return jsonify({'success': True, **request_metrics.to_dict()})
+
+MAX_FLAMEGRAPH_SECONDS = 24 * 60 * 60
+
+@app.route('/api/admin/flamegraph', methods=['GET'])
+def get_flamegraph():
+    """
+    Stacks sampled from in-flight requests over the last ?seconds=N (default 60)
+    in collapsed-stack format, or as a self-contained SVG with ?format=svg
+    """
+    if not stack_sampler.running:
+        return jsonify({'success': False, 'error': 'The sampling profiler is off (BUDGET_APP_SAMPLE_HZ=0)'}), 404
+    try:
+        seconds = float(request.args.get('seconds', 60))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'seconds must be a number'}), 400
+    if not 0 < seconds <= MAX_FLAMEGRAPH_SECONDS:
+        return jsonify({'success': False, 'error': f'seconds must be from 0 to {MAX_FLAMEGRAPH_SECONDS}'}), 400
+    
+    stats = stack_sampler.stats()
+    if request.args.get('format') == 'svg':
+        response = app.response_class(stack_sampler.svg(seconds, title=f'Request flamegraph, last {seconds:g}s'),
+                                      mimetype='image/svg+xml')
+    else:
+        response = app.response_class(stack_sampler.collapsed(seconds), mimetype='text/plain')
+    response.headers['X-Samples-Buffered'] = str(stats['buffered'])
+    response.headers['X-Sample-Hz'] = str(stats['hz'])
+    return response
+
+def _profiling_disabled():
+    return jsonify({'success': False, 'error': 'Profiling is disabled (start the server with BUDGET_APP_PROFILE=1)'}), 404
+
+@app.route('/api/admin/profiles', methods=['GET'])
+def list_profiles():
+    """Saved request profiles, newest first"""
+    if not PROFILING_ENABLED:
+        return _profiling_disabled()
+    return jsonify({'success': True, 'directory': str(request_profiler.directory), 'profiles': request_profiler.list()})
+
+@app.route('/api/admin/profiles/<name>', methods=['GET'])
+def get_profile(name):
+    """
+    Top functions by cumulative time of one saved profile (?top=N, default 15),
+    or the .pstats file itself with ?download=1
+    """
+    if not PROFILING_ENABLED:
+        return _profiling_disabled()
+    path = request_profiler.path(name)
+    if path is None:
+        return jsonify({'success': False, 'error': 'Profile not found'}), 404
+    if request.args.get('download') == '1':
+        return send_from_directory(path.parent, path.name, as_attachment=True, mimetype='application/octet-stream')
+    try:
+        top = int(request.args.get('top', request_profiler.top))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'top must be a whole number'}), 400
+    return jsonify({'success': True, 'name': name, 'functions': request_profiler.summary(name, max(1, top))})
+
+def _budget_data_json():
+    """budget_data with the partitioned transactions materialized as a list"""
+    data = {key: value for key, value in budget_data.items() if key != ID_SEQUENCE_KEY}
+    data['transactions'] = list(budget_data['transactions'])
+    data['income_sources'] = [income_stats.public(income) for income in budget_data['income_sources']]
+    if 'retirement_accounts' in data:
+        data['retirement_accounts'] = [contribution_totals.public(account) for account in data['retirement_accounts']]
+    return data
+
 @app.route('/api/budget', methods=['GET'])
 def get_budget():
-    return jsonify(budget_data)
+    return jsonify(_budget_data_json())
 
 @app.route('/api/budget', methods=['POST'])
 def update_budget():
-    data = request.json
+    data = dict(request.json)
+    transactions = data.pop('transactions', None)
+    data.pop(ID_SEQUENCE_KEY, None)
     budget_data.update(data)
-    return jsonify({'success': True, 'data': budget_data})
+    if transactions is not None:
+        budget_data['transactions'].replace(transactions)
+    registry.attach(budget_data)
+    save_data()
+    return jsonify({'success': True, 'data': _budget_data_json()})
 
 @app.route('/api/transactions', methods=['GET'])
 def get_transactions():
-    return jsonify(budget_data['transactions'])
+    """
+    All transactions, or a date-ordered slice of them:
+    ?from=YYYY-MM-DD&to=YYYY-MM-DD  inclusive date range
+    ?order=desc                     most recent first
+    ?limit=N&after=CURSOR           one page; the response carries next_cursor
+    """
+    args = request.args
+    if not any(key in args for key in ('from', 'to', 'order', 'limit', 'after')):
+        return jsonify(list(budget_data['transactions']))
+    
+    try:
+        first_day = epoch_day(datetime.strptime(args['from'], '%Y-%m-%d')) if args.get('from') else None
+        last_day = epoch_day(datetime.strptime(args['to'], '%Y-%m-%d')) if args.get('to') else None
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    try:
+        limit = int(args['limit']) if args.get('limit') else None
+        if limit is not None and limit <= 0:
+            raise ValueError
+    except ValueError:
+        return jsonify({'success': False, 'error': 'limit must be a positive integer'}), 400
+    try:
+        after = decode_cursor(args['after']) if args.get('after') else None
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+    order = args.get('order', 'asc')
+    if order not in ('asc', 'desc'):
+        return jsonify({'success': False, 'error': "order must be 'asc' or 'desc'"}), 400
+    
+    transactions = budget_data['transactions'].between(first_day, last_day, after, descending=(order == 'desc'))
+    if limit is None:
+        return jsonify(list(transactions))
+    
+    page = []
+    for transaction in transactions:
+        if len(page) == limit:
+            # There is at least one more record after this page
+            return jsonify({
+                'transactions': page,
+                'next_cursor': encode_cursor(date_key(page[-1])),
+                'has_more': True
+            })
+        page.append(transaction)
+    return jsonify({'transactions': page, 'next_cursor': None, 'has_more': False})
 
 @app.route('/api/transactions', methods=['POST'])
 def add_transaction():
-    transaction = request.json
-    transaction['id'] = int(datetime.now().timestamp() * 1000)
+    transaction = Transaction.from_dict(request.json)
+    transaction['id'] = registry.next_id()
     transaction['date'] = datetime.now().isoformat()
     budget_data['transactions'].append(transaction)
-    save_data()
+    persist(inserted('transactions', transaction))
     return jsonify({'success': True, 'data': transaction})
 
 @app.route('/api/transactions/<int:transaction_id>', methods=['DELETE'])
 def delete_transaction(transaction_id):
-    budget_data['transactions'] = [
-        t for t in budget_data['transactions'] 
-        if t['id'] != transaction_id
-    ]
-    save_data()
+    budget_data['transactions'].remove_id(transaction_id)
+    persist(deleted('transactions', transaction_id))
     return jsonify({'success': True})
 
 @app.route('/api/transactions/month-to-date', methods=['GET'])
@@ -689,20 +1099,15 @@ def get_month_to_date_transactions():
     mtd_transactions = []
     total_spent = 0
     
-    for transaction in budget_data['transactions']:
-        try:
-            # Parse transaction date
-            trans_date = datetime.fromisoformat(transaction['date'])
-            
-            # Check if transaction is from current month
-            if trans_date.year == current_year and trans_date.month == current_month:
-                mtd_transactions.append(transaction)
-                # Only count expenses (negative amounts or amounts with type='expense')
-                amount = float(transaction.get('amount', 0))
-                if amount > 0:  # Assuming positive amounts are expenses
-                    total_spent += amount
-        except (ValueError, KeyError):
+    # Date index: bisect to the current month instead of parsing every transaction
+    for transaction in budget_data['transactions'].between(*month_days(current_year, current_month)):
+        if transaction.value is None:
             continue
+        mtd_transactions.append(transaction)
+        # Only count expenses (negative amounts or amounts with type='expense')
+        amount = transaction.value
+        if amount > 0:  # Assuming positive amounts are expenses
+            total_spent += amount
     
     # Calculate days passed in current month
     days_passed = now.day
@@ -723,8 +1128,9 @@ def get_categories():
 @app.route('/api/categories', methods=['POST'])
 def add_category():
     category = request.json
-    category['id'] = int(datetime.now().timestamp() * 1000)
+    category['id'] = registry.next_id()
     budget_data['categories'].append(category)
+    persist(updated_setting('categories'))
     return jsonify({'success': True, 'data': category})
 
 # Account endpoints
@@ -765,13 +1171,14 @@ def add_account():
             return jsonify({'success': False, 'error': 'Balance must be a valid number'}), 400
         
         # Add metadata
-        account['id'] = int(datetime.now().timestamp() * 1000)
+        account['id'] = registry.next_id()
         account['created_at'] = datetime.now().isoformat()
         account['updated_at'] = datetime.now().isoformat()
         
         # Save account
+        account = Account.from_dict(account)
         budget_data['accounts'].append(account)
-        save_data()
+        persist(inserted('accounts', account))
         
         return jsonify({'success': True, 'data': account}), 201
     except Exception as e:
@@ -784,11 +1191,7 @@ def update_account(account_id):
         updated_data = request.json
         
         # Find account
-        account = None
-        for acc in budget_data['accounts']:
-            if acc['id'] == account_id:
-                account = acc
-                break
+        account = budget_data['accounts'].by_id(account_id)
         
         if not account:
             return jsonify({'success': False, 'error': 'Account not found'}), 404
@@ -809,10 +1212,11 @@ def update_account(account_id):
             except (ValueError, TypeError):
                 return jsonify({'success': False, 'error': 'Balance must be a valid number'}), 400
         
-        # Update account
+        # Update account (the id keys the registry index and can't change)
+        updated_data.pop('id', None)
         account.update(updated_data)
         account['updated_at'] = datetime.now().isoformat()
-        save_data()
+        persist(updated('accounts', account))
         
         return jsonify({'success': True, 'data': account})
     except Exception as e:
@@ -822,16 +1226,10 @@ def update_account(account_id):
 def delete_account(account_id):
     """Delete an account"""
     try:
-        initial_length = len(budget_data['accounts'])
-        budget_data['accounts'] = [
-            a for a in budget_data['accounts'] 
-            if a['id'] != account_id
-        ]
-        
-        if len(budget_data['accounts']) == initial_length:
+        if budget_data['accounts'].remove_id(account_id) is None:
             return jsonify({'success': False, 'error': 'Account not found'}), 404
         
-        save_data()
+        persist(deleted('accounts', account_id))
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -840,47 +1238,39 @@ def delete_account(account_id):
 def get_accounts_summary():
     """Get summary of all accounts by type"""
     try:
-        summary = {
-            'checking_total': 0,
-            'savings_total': 0,
-            'credit_total': 0,
-            'investment_total': 0,
-            'net_worth': 0,
-            'total_assets': 0,
-            'total_liabilities': 0,
-            'has_data': len(budget_data['accounts']) > 0  # Flag to indicate if any accounts exist
-        }
-        
-        for account in budget_data['accounts']:
-            balance = float(account.get('balance', 0))
-            account_type = account.get('type', '')
-            
-            if account_type == 'checking':
-                summary['checking_total'] += balance
-                summary['total_assets'] += balance
-            elif account_type == 'savings':
-                summary['savings_total'] += balance
-                summary['total_assets'] += balance
-            elif account_type == 'credit':
-                summary['credit_total'] += balance
-                # Credit card balances are liabilities
-                summary['total_liabilities'] += balance
-            elif account_type == 'investment':
-                summary['investment_total'] += balance
-                summary['total_assets'] += balance
-        
-        # Calculate net worth (assets - liabilities)
-        summary['net_worth'] = summary['total_assets'] - summary['total_liabilities']
-        
-        # Round all values (except has_data flag)
-        for key in summary:
-            if key != 'has_data':
-                summary[key] = round(summary[key], 2)
-        
-        return jsonify(summary)
+        return jsonify(_accounts_summary(dashboard_context()))
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def _accounts_summary(ctx):
+    """Account totals by type and net worth, built from a FinancialContext"""
+    # Types match exactly here ('Savings' isn't counted), unlike the case-insensitive ctx.balances
+    balances = {'checking': 0, 'savings': 0, 'credit': 0, 'investment': 0}
+    for account in ctx.data['accounts']:
+        if isinstance(account.type, str) and account.type in balances:
+            balances[account.type] += account.value
+    summary = {
+        'checking_total': balances['checking'],
+        'savings_total': balances['savings'],
+        'credit_total': balances['credit'],
+        'investment_total': balances['investment'],
+        'net_worth': 0,
+        'total_assets': balances['checking'] + balances['savings'] + balances['investment'],
+        # Credit card balances are liabilities
+        'total_liabilities': balances['credit'],
+        'has_data': len(ctx.data['accounts']) > 0  # Flag to indicate if any accounts exist
+    }
+    
+    # Calculate net worth (assets - liabilities)
+    summary['net_worth'] = summary['total_assets'] - summary['total_liabilities']
+    
+    # Round all values (except has_data flag)
+    for key in summary:
+        if key != 'has_data':
+            summary[key] = round(summary[key], 2)
+    
+    return summary
+
 # Helper function to update variable income statistics
 # Income endpoints
 @app.route('/api/income', methods=['GET'])
@@ -889,7 +1279,7 @@ def get_income_sources():
     # Add net income calculation to each source
     income_sources_with_net = []
     for income in budget_data['income_sources']:
-        income_copy = income.copy()
+        income_copy = income_stats.public(income)
         income_copy['net_income_breakdown'] = calculate_net_income(income)
         income_sources_with_net.append(income_copy)
     
@@ -942,7 +1332,7 @@ def get_income_by_earner():
                 }
             
             # Add net income breakdown to income copy
-            income_copy = income.copy()
+            income_copy = income_stats.public(income)
             income_copy['net_income_breakdown'] = net_breakdown
             income_copy['monthly_gross'] = monthly_gross
             income_copy['monthly_net'] = monthly_net
@@ -954,7 +1344,7 @@ def get_income_by_earner():
             earners[earner_name]['total_deductions'] += net_breakdown.get('total_deductions', 0)
         else:
             # Add net income breakdown to unassigned income
-            income_copy = income.copy()
+            income_copy = income_stats.public(income)
             income_copy['net_income_breakdown'] = net_breakdown
             income_copy['monthly_gross'] = monthly_gross
             income_copy['monthly_net'] = monthly_net
@@ -1087,12 +1477,12 @@ def add_income_source():
     else:
         income['other_deductions'] = 0
     
-    income['id'] = int(datetime.now().timestamp() * 1000)
+    income['id'] = registry.next_id()
     income['created_at'] = datetime.now().isoformat()
     income['updated_at'] = datetime.now().isoformat()
     
     # Initialize actual income tracking fields
-    income['actual_payments'] = []  # List of actual payments received: [{date, amount, notes}]
+    income['actual_payments'] = registry.children('income_sources')  # Actual payments received: [{date, amount, notes}]
     income['expected_next_payment'] = None  # When the next payment is expected
     
     # Initialize variable income tracking fields
@@ -1106,10 +1496,11 @@ def add_income_source():
     income['average_monthly'] = income['amount']  # Start with expected amount, will update as payments come in
     income['income_variance'] = 0  # Track variability percentage
     income['payment_count'] = 0  # Number of payments received
+    income.pop(income_stats.STATS_KEY, None)  # Derived from actual_payments, never client-supplied
     
     budget_data['income_sources'].append(income)
-    save_data()
-    return jsonify({'success': True, 'data': income})
+    persist(inserted('income_sources', income))
+    return jsonify({'success': True, 'data': income_stats.public(income)})
 
 @app.route('/api/income/<int:income_id>', methods=['PUT'])
 def update_income_source(income_id):
@@ -1117,11 +1508,7 @@ def update_income_source(income_id):
     updated_data = request.json
     
     # Find the income source
-    income = None
-    for inc in budget_data['income_sources']:
-        if inc['id'] == income_id:
-            income = inc
-            break
+    income = budget_data['income_sources'].by_id(income_id)
     
     if not income:
         return jsonify({'success': False, 'error': 'Income source not found'}), 404
@@ -1211,20 +1598,35 @@ def update_income_source(income_id):
         except (ValueError, TypeError):
             return jsonify({'success': False, 'error': 'Invalid other deductions value'}), 400
     
+    if 'actual_payments' in updated_data:
+        payments = updated_data['actual_payments']
+        if not isinstance(payments, list) or not all(isinstance(payment, dict) for payment in payments):
+            return jsonify({'success': False, 'error': 'actual_payments must be a list of payments'}), 400
+    
     # Update the income source
+    updated_data.pop('id', None)
+    updated_data.pop(income_stats.STATS_KEY, None)
+    mutations = []
+    if 'actual_payments' in updated_data:
+        # Payments replaced wholesale: the running stats are rebuilt on next use, and the
+        # storage gets the old payments deleted and the new ones inserted (parent updates
+        # don't carry their child list)
+        income.pop(income_stats.STATS_KEY, None)
+        old_ids = dict.fromkeys(payment.get('id') for payment in income.get('actual_payments') or [])
+        mutations += [deleted('actual_payments', payment_id, income_id) for payment_id in old_ids]
     income.update(updated_data)
+    registry.adopt_children('income_sources', income)
+    if 'actual_payments' in updated_data:
+        mutations += [inserted('actual_payments', payment, income_id) for payment in income['actual_payments']]
     income['updated_at'] = datetime.now().isoformat()
-    save_data()
-    return jsonify({'success': True, 'data': income})
+    persist(updated('income_sources', income), *mutations)
+    return jsonify({'success': True, 'data': income_stats.public(income)})
 
 @app.route('/api/income/<int:income_id>', methods=['DELETE'])
 def delete_income_source(income_id):
     """Delete an income source"""
-    budget_data['income_sources'] = [
-        i for i in budget_data['income_sources'] 
-        if i['id'] != income_id
-    ]
-    save_data()
+    budget_data['income_sources'].remove_id(income_id)
+    persist(deleted('income_sources', income_id))
     return jsonify({'success': True})
 
 @app.route('/api/income/<int:income_id>/record-payment', methods=['POST'])
@@ -1233,11 +1635,7 @@ def record_income_payment(income_id):
     payment_data = request.json
     
     # Find the income source
-    income = None
-    for inc in budget_data['income_sources']:
-        if inc['id'] == income_id:
-            income = inc
-            break
+    income = budget_data['income_sources'].by_id(income_id)
     
     if not income:
         return jsonify({'success': False, 'error': 'Income source not found'}), 404
@@ -1270,51 +1668,47 @@ def record_income_payment(income_id):
     
     # Initialize actual_payments if it doesn't exist (for backwards compatibility)
     if 'actual_payments' not in income:
-        income['actual_payments'] = []
+        income['actual_payments'] = registry.children('income_sources')
     
     # Create payment record
-    payment = {
-        'id': int(datetime.now().timestamp() * 1000),
+    payment = IncomePayment({
+        'id': registry.next_id(),
         'date': payment_date,
         'amount': amount,
         'notes': notes,
         'recorded_at': datetime.now().isoformat()
-    }
+    })
     
     income['actual_payments'].append(payment)
+    income_stats.payment_added(income, payment)
     income['updated_at'] = datetime.now().isoformat()
     
     # Update variable income statistics
     _update_variable_income_stats(income)
     
-    save_data()
-    return jsonify({'success': True, 'data': payment, 'income': income})
+    persist(inserted('actual_payments', payment, income_id), updated('income_sources', income))
+    return jsonify({'success': True, 'data': payment, 'income': income_stats.public(income)})
 
 @app.route('/api/income/<int:income_id>/payments/<int:payment_id>', methods=['DELETE'])
 def delete_income_payment(income_id, payment_id):
     """Delete a recorded payment from an income source"""
     # Find the income source
-    income = None
-    for inc in budget_data['income_sources']:
-        if inc['id'] == income_id:
-            income = inc
-            break
+    income = budget_data['income_sources'].by_id(income_id)
     
     if not income:
         return jsonify({'success': False, 'error': 'Income source not found'}), 404
     
     # Remove the payment
     if 'actual_payments' in income:
-        income['actual_payments'] = [
-            p for p in income['actual_payments'] 
-            if p['id'] != payment_id
-        ]
+        payment = income['actual_payments'].remove_id(payment_id)
+        if payment is not None:
+            income_stats.payment_removed(income, payment)
         income['updated_at'] = datetime.now().isoformat()
         
         # Update variable income statistics after deletion
         _update_variable_income_stats(income)
         
-        save_data()
+        persist(deleted('actual_payments', payment_id, income_id), updated('income_sources', income))
     
     return jsonify({'success': True})
 
@@ -1322,11 +1716,7 @@ def delete_income_payment(income_id, payment_id):
 def get_income_analysis(income_id):
     """Get analysis of expected vs actual income for a specific source"""
     # Find the income source
-    income = None
-    for inc in budget_data['income_sources']:
-        if inc['id'] == income_id:
-            income = inc
-            break
+    income = budget_data['income_sources'].by_id(income_id)
     
     if not income:
         return jsonify({'success': False, 'error': 'Income source not found'}), 404
@@ -1403,16 +1793,11 @@ def get_income_analysis(income_id):
 @app.route('/api/income/<int:income_id>/variable-analysis', methods=['GET'])
 def get_variable_income_analysis(income_id):
     """Get comprehensive analysis for variable income sources (commission, freelance)"""
-    from datetime import datetime, timedelta
-    from collections import defaultdict
-    from statistics import mean, median, stdev
+    from datetime import datetime
+    from statistics import mean, median
     
     # Find the income source
-    income = None
-    for inc in budget_data['income_sources']:
-        if inc['id'] == income_id:
-            income = inc
-            break
+    income = budget_data['income_sources'].by_id(income_id)
     
     if not income:
         return jsonify({'success': False, 'error': 'Income source not found'}), 404
@@ -1429,32 +1814,11 @@ def get_variable_income_analysis(income_id):
             'is_variable': income.get('is_variable', False)
         })
     
-    # Calculate historical statistics
-    six_months_ago = datetime.now() - timedelta(days=180)
-    three_months_ago = datetime.now() - timedelta(days=90)
-    
-    # Group payments by month
-    monthly_totals = defaultdict(float)
-    monthly_counts = defaultdict(int)
-    
-    for payment in payments:
-        payment_date = datetime.strptime(payment['date'], '%Y-%m-%d')
-        month_key = f"{payment_date.year}-{payment_date.month:02d}"
-        month_name = payment_date.strftime('%B %Y')
-        monthly_totals[month_key] = monthly_totals[month_key] + payment['amount']
-        monthly_counts[month_key] += 1
-    
-    # Get recent payments (last 6 months)
-    recent_payments = [
-        p for p in payments
-        if datetime.strptime(p['date'], '%Y-%m-%d') >= six_months_ago
-    ]
-    
-    # Get very recent payments (last 3 months)
-    very_recent_payments = [
-        p for p in payments
-        if datetime.strptime(p['date'], '%Y-%m-%d') >= three_months_ago
-    ]
+    # Monthly totals and counts come from the running per-month buckets
+    stats = income_stats.ensure(income)
+    buckets = income_stats.monthly_totals(stats)
+    monthly_totals = {month_key: bucket['total'] for month_key, bucket in buckets}
+    monthly_counts = {month_key: bucket['count'] for month_key, bucket in buckets}
     
     # Calculate monthly statistics
     monthly_amounts = list(monthly_totals.values())
@@ -1468,14 +1832,15 @@ def get_variable_income_analysis(income_id):
             'message': 'No payment history yet. Record payments to see analysis.'
         })
     
-    # Basic statistics
-    avg_monthly = mean(monthly_amounts)
+    # Basic statistics (mean and deviation kept incrementally)
+    welford = income_stats.Welford(**stats['welford'])
+    avg_monthly = welford.mean
     median_monthly = median(monthly_amounts)
     min_monthly = min(monthly_amounts)
     max_monthly = max(monthly_amounts)
     
     # Variability metrics
-    std_deviation = stdev(monthly_amounts) if len(monthly_amounts) > 1 else 0
+    std_deviation = welford.stdev
     coefficient_of_variation = (std_deviation / avg_monthly * 100) if avg_monthly > 0 else 0
     
     # Determine income stability
@@ -1635,28 +2000,13 @@ def get_variable_income_analysis(income_id):
 @app.route('/api/income/total', methods=['GET'])
 def get_total_monthly_income():
     """Calculate total monthly income from all sources"""
-    total = 0
-    for income in budget_data['income_sources']:
-        amount = float(income.get('amount', 0))
-        frequency = income.get('frequency', 'monthly')
-        
-        # Convert all frequencies to monthly
-        if frequency == 'weekly':
-            monthly_amount = amount * 52 / 12
-        elif frequency == 'bi-weekly':
-            monthly_amount = amount * 26 / 12
-        elif frequency == 'monthly':
-            monthly_amount = amount
-        elif frequency == 'annual':
-            monthly_amount = amount / 12
-        else:
-            monthly_amount = amount
-            
-        total += monthly_amount
-    
-    return jsonify({'total': round(total, 2)})
+    return jsonify(_total_income(dashboard_context()))
+
+def _total_income(ctx):
+    return {'total': round(ctx.total_income, 2)}
 
 @app.route('/api/income/trends', methods=['GET'])
+@memoized
 def get_income_trends():
     """Get income trend data for the last 12 months"""
     from datetime import datetime, timedelta
@@ -1709,7 +2059,7 @@ def get_income_trends():
                         income_by_month[month_key] += amount
                         income_by_source[source_name][month_key] += amount
                         income_by_earner[earner][month_key] += amount
-                        
+                
                 except (ValueError, KeyError) as e:
                     continue
         
@@ -1785,7 +2135,7 @@ def get_income_trends():
                 'end': months[-1]['label'] if months else None
             }
         })
-        
+    
     except Exception as e:
         print(f"Error calculating income trends: {e}")
         import traceback
@@ -1853,7 +2203,7 @@ def get_year_over_year_income():
                         yearly_data[year]['by_source'][source_name] += amount
                         yearly_data[year]['by_earner'][earner] += amount
                         yearly_data[year]['payment_count'] += 1
-                        
+                
                 except (ValueError, KeyError) as e:
                     continue
         
@@ -1944,7 +2294,7 @@ def get_year_over_year_income():
                 'latest_year': years[0] if years else None
             }
         })
-        
+    
     except Exception as e:
         print(f"Error calculating year-over-year income: {e}")
         import traceback
@@ -1960,158 +2310,8 @@ def get_next_paycheck():
     Calculate days until the next paycheck based on all income sources.
     Returns the soonest upcoming paycheck and information about all upcoming paychecks.
     """
-    from datetime import datetime, timedelta
-    
     try:
-        now = datetime.now()
-        income_sources = budget_data.get('income_sources', [])
-        
-        if not income_sources:
-            return jsonify({
-                'has_paychecks': False,
-                'has_data': False,
-                'message': 'No income sources configured. Please add income sources with payment dates.',
-                'next_paycheck': None,
-                'all_upcoming': []
-            })
-        
-        # Find all upcoming paychecks from all income sources
-        upcoming_paychecks = []
-        
-        for income in income_sources:
-            next_pay_date_str = income.get('next_pay_date')
-            frequency = income.get('frequency', 'monthly')
-            
-            if not next_pay_date_str:
-                continue
-            
-            # Parse the date
-            try:
-                pay_date = datetime.fromisoformat(next_pay_date_str.replace('Z', '+00:00'))
-                if pay_date.tzinfo:
-                    pay_date = pay_date.replace(tzinfo=None)
-            except:
-                continue
-            
-            # If the pay date is in the past, calculate the next one based on frequency
-            while pay_date.date() < now.date():
-                if frequency == 'weekly':
-                    pay_date += timedelta(days=7)
-                elif frequency == 'bi-weekly':
-                    pay_date += timedelta(days=14)
-                elif frequency == 'semi-monthly':
-                    # Semi-monthly is typically 15th and last day of month
-                    if pay_date.day == 15:
-                        # Next is last day of current month
-                        from calendar import monthrange
-                        last_day = monthrange(pay_date.year, pay_date.month)[1]
-                        pay_date = pay_date.replace(day=last_day)
-                    else:
-                        # Next is 15th of next month
-                        if pay_date.month == 12:
-                            pay_date = pay_date.replace(year=pay_date.year + 1, month=1, day=15)
-                        else:
-                            pay_date = pay_date.replace(month=pay_date.month + 1, day=15)
-                elif frequency == 'monthly':
-                    # Add one month
-                    month = pay_date.month
-                    year = pay_date.year
-                    if month == 12:
-                        month = 1
-                        year += 1
-                    else:
-                        month += 1
-                    try:
-                        pay_date = pay_date.replace(month=month, year=year)
-                    except ValueError:
-                        # Handle day overflow (e.g., Jan 31 -> Feb 31)
-                        import calendar
-                        last_day = calendar.monthrange(year, month)[1]
-                        pay_date = pay_date.replace(day=last_day, month=month, year=year)
-                elif frequency == 'annual':
-                    pay_date = pay_date.replace(year=pay_date.year + 1)
-                else:
-                    break
-            
-            # Only include future or today's paychecks
-            if pay_date.date() >= now.date():
-                days_until = (pay_date.date() - now.date()).days
-                upcoming_paychecks.append({
-                    'name': income.get('name', 'Unknown Income'),
-                    'source_name': income.get('source_name', 'Unknown Source'),
-                    'earner_name': income.get('earner_name', 'Unknown Earner'),
-                    'amount': float(income.get('amount', 0)),
-                    'frequency': frequency,
-                    'next_pay_date': pay_date.strftime('%Y-%m-%d'),
-                    'next_pay_date_formatted': pay_date.strftime('%B %d, %Y'),
-                    'days_until': days_until
-                })
-        
-        if not upcoming_paychecks:
-            return jsonify({
-                'has_paychecks': False,
-                'has_data': len(income_sources) > 0,
-                'message': 'No upcoming paychecks found. Please add income sources with payment dates.',
-                'next_paycheck': None,
-                'all_upcoming': []
-            })
-        
-        # Sort by days_until (soonest first)
-        upcoming_paychecks.sort(key=lambda x: x['days_until'])
-        
-        # Get the next (soonest) paycheck
-        next_paycheck = upcoming_paychecks[0]
-        days_until = next_paycheck['days_until']
-        
-        # Determine status and message based on days until paycheck
-        if days_until == 0:
-            status = 'success'
-            status_text = 'Payday!'
-            message = f"It's payday! {next_paycheck['earner_name']}'s {next_paycheck['source_name']} payment is today."
-            urgency = 'none'
-        elif days_until == 1:
-            status = 'success'
-            status_text = 'Tomorrow'
-            message = f"Your next paycheck is tomorrow! {next_paycheck['earner_name']} gets paid ${next_paycheck['amount']:,.2f}."
-            urgency = 'low'
-        elif days_until <= 3:
-            status = 'success'
-            status_text = 'Very Soon'
-            message = f"{days_until} days until your next paycheck from {next_paycheck['earner_name']}."
-            urgency = 'low'
-        elif days_until <= 7:
-            status = 'info'
-            status_text = 'This Week'
-            message = f"{days_until} days until your next paycheck. Budget wisely!"
-            urgency = 'medium'
-        elif days_until <= 14:
-            status = 'info'
-            status_text = 'Next Week'
-            message = f"{days_until} days until your next paycheck. Make your money last!"
-            urgency = 'medium'
-        else:
-            status = 'warning'
-            status_text = 'A While Away'
-            message = f"{days_until} days until your next paycheck. Careful with spending!"
-            urgency = 'high'
-        
-        # Calculate total amount from upcoming paychecks in next 30 days
-        next_30_days_total = sum(p['amount'] for p in upcoming_paychecks if p['days_until'] <= 30)
-        
-        return jsonify({
-            'has_paychecks': True,
-            'has_data': True,
-            'days_until_next': days_until,
-            'status': status,
-            'status_text': status_text,
-            'message': message,
-            'urgency': urgency,
-            'next_paycheck': next_paycheck,
-            'all_upcoming': upcoming_paychecks[:5],  # Return up to 5 upcoming paychecks
-            'next_30_days_count': len([p for p in upcoming_paychecks if p['days_until'] <= 30]),
-            'next_30_days_total': round(next_30_days_total, 2)
-        })
-        
+        return jsonify(_next_paycheck(dashboard_context()))
     except Exception as e:
         print(f"Error calculating next paycheck: {e}")
         import traceback
@@ -2124,6 +2324,111 @@ def get_next_paycheck():
             'all_upcoming': []
         }), 500
 
+def _next_paycheck(ctx):
+    """Next paycheck card, built from a FinancialContext"""
+    now = ctx.now
+    income_sources = ctx.data.get('income_sources', [])
+    
+    if not income_sources:
+        return {
+            'has_paychecks': False,
+            'has_data': False,
+            'message': 'No income sources configured. Please add income sources with payment dates.',
+            'next_paycheck': None,
+            'all_upcoming': []
+        }
+    
+    # Find all upcoming paychecks from all income sources
+    upcoming_paychecks = []
+    
+    for income in income_sources:
+        frequency = income.get('frequency', 'monthly')
+        schedule = PaySchedule.for_income(income)
+        if schedule is None:
+            continue
+        
+        # Roll a past pay date forward to the first one today or later
+        pay_date = schedule.next_on_or_after(datetime.combine(now.date(), datetime.min.time()))
+        
+        # Only include future or today's paychecks
+        if pay_date is not None:
+            days_until = (pay_date.date() - now.date()).days
+            upcoming_paychecks.append({
+                'name': income.get('name', 'Unknown Income'),
+                'source_name': income.get('source_name', 'Unknown Source'),
+                'earner_name': income.get('earner_name', 'Unknown Earner'),
+                'amount': float(income.get('amount', 0)),
+                'frequency': frequency,
+                'next_pay_date': pay_date.strftime('%Y-%m-%d'),
+                'next_pay_date_formatted': pay_date.strftime('%B %d, %Y'),
+                'days_until': days_until
+            })
+    
+    if not upcoming_paychecks:
+        return {
+            'has_paychecks': False,
+            'has_data': len(income_sources) > 0,
+            'message': 'No upcoming paychecks found. Please add income sources with payment dates.',
+            'next_paycheck': None,
+            'all_upcoming': []
+        }
+    
+    # Sort by days_until (soonest first)
+    upcoming_paychecks.sort(key=lambda x: x['days_until'])
+    
+    # Get the next (soonest) paycheck
+    next_paycheck = upcoming_paychecks[0]
+    days_until = next_paycheck['days_until']
+    
+    # Determine status and message based on days until paycheck
+    if days_until == 0:
+        status = 'success'
+        status_text = 'Payday!'
+        message = f"It's payday! {next_paycheck['earner_name']}'s {next_paycheck['source_name']} payment is today."
+        urgency = 'none'
+    elif days_until == 1:
+        status = 'success'
+        status_text = 'Tomorrow'
+        message = f"Your next paycheck is tomorrow! {next_paycheck['earner_name']} gets paid ${next_paycheck['amount']:,.2f}."
+        urgency = 'low'
+    elif days_until <= 3:
+        status = 'success'
+        status_text = 'Very Soon'
+        message = f"{days_until} days until your next paycheck from {next_paycheck['earner_name']}."
+        urgency = 'low'
+    elif days_until <= 7:
+        status = 'info'
+        status_text = 'This Week'
+        message = f"{days_until} days until your next paycheck. Budget wisely!"
+        urgency = 'medium'
+    elif days_until <= 14:
+        status = 'info'
+        status_text = 'Next Week'
+        message = f"{days_until} days until your next paycheck. Make your money last!"
+        urgency = 'medium'
+    else:
+        status = 'warning'
+        status_text = 'A While Away'
+        message = f"{days_until} days until your next paycheck. Careful with spending!"
+        urgency = 'high'
+    
+    # Calculate total amount from upcoming paychecks in next 30 days
+    next_30_days_total = sum(p['amount'] for p in upcoming_paychecks if p['days_until'] <= 30)
+    
+    return {
+        'has_paychecks': True,
+        'has_data': True,
+        'days_until_next': days_until,
+        'status': status,
+        'status_text': status_text,
+        'message': message,
+        'urgency': urgency,
+        'next_paycheck': next_paycheck,
+        'all_upcoming': upcoming_paychecks[:5],  # Return up to 5 upcoming paychecks
+        'next_30_days_count': len([p for p in upcoming_paychecks if p['days_until'] <= 30]),
+        'next_30_days_total': round(next_30_days_total, 2)
+    }
+
 # Fixed Expenses endpoints
 @app.route('/api/expenses', methods=['GET'])
 def get_fixed_expenses():
@@ -2133,45 +2438,41 @@ def get_fixed_expenses():
 @app.route('/api/expenses', methods=['POST'])
 def add_fixed_expense():
     """Add a new fixed expense"""
-    expense = request.json
-    expense['id'] = int(datetime.now().timestamp() * 1000)
+    expense = FixedExpense.from_dict(request.json)
+    expense['id'] = registry.next_id()
     expense['created_at'] = datetime.now().isoformat()
     expense['updated_at'] = datetime.now().isoformat()
     budget_data['fixed_expenses'].append(expense)
-    save_data()
+    persist(inserted('fixed_expenses', expense))
     return jsonify({'success': True, 'data': expense})
 
 @app.route('/api/expenses/<int:expense_id>', methods=['PUT'])
 def update_fixed_expense(expense_id):
     """Update an existing fixed expense"""
     updated_data = request.json
-    for expense in budget_data['fixed_expenses']:
-        if expense['id'] == expense_id:
-            expense.update(updated_data)
-            expense['updated_at'] = datetime.now().isoformat()
-            save_data()
-            return jsonify({'success': True, 'data': expense})
-    return jsonify({'success': False, 'error': 'Expense not found'}), 404
+    expense = budget_data['fixed_expenses'].by_id(expense_id)
+    if expense is None:
+        return jsonify({'success': False, 'error': 'Expense not found'}), 404
+    updated_data.pop('id', None)
+    expense.update(updated_data)
+    expense['updated_at'] = datetime.now().isoformat()
+    persist(updated('fixed_expenses', expense))
+    return jsonify({'success': True, 'data': expense})
 
 @app.route('/api/expenses/<int:expense_id>', methods=['DELETE'])
 def delete_fixed_expense(expense_id):
     """Delete a fixed expense"""
-    budget_data['fixed_expenses'] = [
-        e for e in budget_data['fixed_expenses'] 
-        if e['id'] != expense_id
-    ]
-    save_data()
+    budget_data['fixed_expenses'].remove_id(expense_id)
+    persist(deleted('fixed_expenses', expense_id))
     return jsonify({'success': True})
 
 @app.route('/api/expenses/total', methods=['GET'])
 def get_total_monthly_expenses():
     """Calculate total monthly fixed expenses"""
-    total = 0
-    for expense in budget_data['fixed_expenses']:
-        amount = float(expense.get('amount', 0))
-        total += amount
-    
-    return jsonify({'total': round(total, 2)})
+    return jsonify(_total_expenses(dashboard_context()))
+
+def _total_expenses(ctx):
+    return {'total': round(ctx.total_expenses, 2)}
 
 # Dashboard endpoints
 @app.route('/api/dashboard/available-spending', methods=['GET'])
@@ -2188,87 +2489,39 @@ def get_available_spending():
     - Available spending (monthly, per paycheck, per day)
     - Status and recommendations
     """
-    from datetime import datetime, timedelta
-    
+    return jsonify(_available_spending(dashboard_context()))
+
+def _available_spending(ctx):
+    """Available spending card, built from a FinancialContext"""
     # Check if we have meaningful data
     has_data = len(budget_data['income_sources']) > 0 or len(budget_data['fixed_expenses']) > 0
     
-    # Calculate total monthly income
-    total_income = 0
-    income_breakdown = []
-    for income in budget_data['income_sources']:
-        amount = float(income.get('amount', 0))
-        frequency = income.get('frequency', 'monthly')
-        
-        # Convert all frequencies to monthly
-        if frequency == 'weekly':
-            monthly_amount = amount * 52 / 12
-        elif frequency == 'bi-weekly':
-            monthly_amount = amount * 26 / 12
-        elif frequency == 'monthly':
-            monthly_amount = amount
-        elif frequency == 'annual':
-            monthly_amount = amount / 12
-        else:
-            monthly_amount = amount
-            
-        total_income += monthly_amount
-        income_breakdown.append({
+    # Monthly income, fixed expenses, retirement contributions and savings allocations
+    total_income = ctx.total_income
+    income_breakdown = [
+        {
             'name': income.get('name', 'Unnamed Income'),
             'earner': income.get('earner_name', 'Unknown'),
             'monthly_amount': round(monthly_amount, 2)
-        })
+        }
+        for income, monthly_amount in ctx.income
+    ]
     
-    # Calculate total monthly fixed expenses
-    total_expenses = 0
-    expense_breakdown = []
-    for expense in budget_data['fixed_expenses']:
-        amount = float(expense.get('amount', 0))
-        total_expenses += amount
-        expense_breakdown.append({
+    total_expenses = ctx.total_expenses
+    expense_breakdown = [
+        {
             'name': expense.get('name', 'Unnamed Expense'),
             'category': expense.get('category', 'Other'),
-            'amount': round(amount, 2)
-        })
-    
-    # Calculate total monthly retirement contributions
-    total_retirement = 0
-    retirement_accounts = budget_data.get('retirement_accounts', [])
-    for account in retirement_accounts:
-        contribution = float(account.get('contribution_per_paycheck', 0))
-        linked_income_id = account.get('linked_income_id')
-        
-        # Find the linked income source to determine pay frequency
-        pay_frequency = 'monthly'  # default
-        for income in budget_data['income_sources']:
-            if income.get('id') == linked_income_id:
-                pay_frequency = income.get('frequency', 'monthly')
-                break
-        
-        # Convert to monthly contribution
-        if pay_frequency == 'weekly':
-            monthly_contribution = contribution * 52 / 12
-        elif pay_frequency == 'bi-weekly':
-            monthly_contribution = contribution * 26 / 12
-        elif pay_frequency == 'monthly':
-            monthly_contribution = contribution
-        elif pay_frequency == 'annual':
-            monthly_contribution = contribution / 12
-        else:
-            monthly_contribution = contribution
-            
-        total_retirement += monthly_contribution
+            'amount': round(expense.value, 2)
+        }
+        for expense in budget_data['fixed_expenses']
+    ]
     
-    # Calculate total monthly savings allocations
-    # This would be for savings goals that have automatic monthly contributions
-    total_savings_allocations = 0
-    savings_goals = budget_data.get('savings_goals', [])
-    for goal in savings_goals:
-        monthly_contribution = float(goal.get('monthly_contribution', 0))
-        total_savings_allocations += monthly_contribution
+    total_retirement = ctx.total_retirement
+    total_savings_allocations = ctx.total_savings_allocations
     
     # Calculate available spending
-    available = total_income - total_expenses - total_retirement - total_savings_allocations
+    available = ctx.available
     
     # Calculate per-paycheck amount (assuming bi-weekly as most common)
     # We'll use the most common pay frequency from income sources
@@ -2329,7 +2582,7 @@ def get_available_spending():
     # Calculate percentage of income available for spending
     percent_available = (available / total_income * 100) if total_income > 0 else 0
     
-    return jsonify({
+    return {
         'total_income': round(total_income, 2),
         'total_expenses': round(total_expenses, 2),
         'total_retirement': round(total_retirement, 2),
@@ -2352,7 +2605,7 @@ def get_available_spending():
             'retirement_contribution': round(total_retirement, 2),
             'savings_allocations': round(total_savings_allocations, 2)
         }
-    })
+    }
 
 @app.route('/api/dashboard/spending-velocity', methods=['GET'])
 def get_spending_velocity():
@@ -2360,7 +2613,7 @@ def get_spending_velocity():
     Calculate spending velocity - how fast the user is spending compared to a safe rate.
     This helps prevent overdrafts by warning when spending too quickly.
     """
-    from datetime import datetime
+    from datetime import datetime, timedelta
     from calendar import monthrange
     
     now = datetime.now()
@@ -2389,13 +2642,13 @@ def get_spending_velocity():
             monthly_amount = amount / 12
         else:
             monthly_amount = amount
-            
+        
         total_income += monthly_amount
     
     # Calculate total monthly fixed expenses
     total_monthly_expenses = 0
     for expense in budget_data['fixed_expenses']:
-        amount = float(expense.get('amount', 0))
+        amount = expense.value
         total_monthly_expenses += amount
     
     # Calculate upcoming bills (bills due after today but before end of month)
@@ -2403,19 +2656,17 @@ def get_spending_velocity():
     upcoming_bill_count = 0
     upcoming_bills_list = []
     
-    for expense in budget_data['fixed_expenses']:
-        due_date = expense.get('due_date', 1)
-        amount = float(expense.get('amount', 0))
-        
-        # If due date is after today and within this month, it's upcoming
-        if due_date > current_day:
-            upcoming_bills += amount
-            upcoming_bill_count += 1
-            upcoming_bills_list.append({
-                'name': expense.get('name', 'Unknown'),
-                'amount': amount,
-                'due_date': due_date
-            })
+    # Bills falling due after today and within this month are upcoming
+    today = now.date()
+    for due, expense in bill_calendar().between(today + timedelta(days=1), today.replace(day=days_in_month) + timedelta(days=1)):
+        amount = expense.value
+        upcoming_bills += amount
+        upcoming_bill_count += 1
+        upcoming_bills_list.append({
+            'name': expense.get('name', 'Unknown'),
+            'amount': amount,
+            'due_date': due.day
+        })
     
     available_for_month = total_income - total_monthly_expenses
     
@@ -2423,16 +2674,15 @@ def get_spending_velocity():
     mtd_spent = 0
     transaction_count = 0
     
-    for transaction in budget_data['transactions']:
-        try:
-            trans_date = datetime.fromisoformat(transaction['date'])
-            if trans_date.year == current_year and trans_date.month == current_month:
-                amount = float(transaction.get('amount', 0))
-                if amount > 0:  # Only count expenses (positive amounts)
-                    mtd_spent += amount
-                    transaction_count += 1
-        except (ValueError, KeyError):
+    for transaction in budget_data['transactions'].partition(f"{current_year}-{current_month:02d}"):
+        trans_date = transaction.when
+        if trans_date is None or transaction.value is None:
             continue
+        if trans_date.year == current_year and trans_date.month == current_month:
+            amount = transaction.value
+            if amount > 0:  # Only count expenses (positive amounts)
+                mtd_spent += amount
+                transaction_count += 1
     
     # Calculate actual daily spending rate
     actual_daily_rate = mtd_spent / current_day if current_day > 0 else 0
@@ -2534,112 +2784,46 @@ def get_mtd_spending():
     - Status indicators
     - Recent transactions
     """
-    from datetime import datetime
-    from calendar import monthrange
-    from collections import defaultdict
-    
-    now = datetime.now()
-    current_year = now.year
-    current_month = now.month
-    current_day = now.day
+    return jsonify(_mtd_spending(dashboard_context()))
+
+def _mtd_spending(ctx):
+    """Month-to-date spending card, built from a FinancialContext"""
+    now = ctx.now
+    current_year = ctx.year
+    current_day = ctx.day
     
     # Get days in current month
-    days_in_month = monthrange(current_year, current_month)[1]
+    days_in_month = ctx.days_in_month
     days_remaining = days_in_month - current_day
     percent_of_month = (current_day / days_in_month) * 100
     
     # Check if we have meaningful data
-    has_data = (len(budget_data.get('transactions', [])) > 0 or 
-                len(budget_data.get('income_sources', [])) > 0 or 
-                len(budget_data.get('fixed_expenses', [])) > 0)
-    
-    # Calculate MTD spending from transactions
-    mtd_spent = 0
-    category_spending = defaultdict(float)
-    mtd_transactions = []
-    transactions = budget_data.get('transactions', [])
-    
-    for transaction in transactions:
-        try:
-            trans_date_str = transaction.get('date', '')
-            trans_date = datetime.fromisoformat(trans_date_str.replace('Z', '+00:00'))
-            
-            if trans_date.year == current_year and trans_date.month == current_month:
-                amount = float(transaction.get('amount', 0))
-                category = transaction.get('category', 'Uncategorized')
-                
-                mtd_spent += amount
-                category_spending[category] += amount
-                
-                # Add to recent transactions list
-                mtd_transactions.append({
-                    'id': transaction.get('id'),
-                    'date': trans_date_str,
-                    'description': transaction.get('description', 'No description'),
-                    'amount': round(amount, 2),
-                    'category': category,
-                    'merchant': transaction.get('merchant', '')
-                })
-        except Exception as e:
-            print(f"Error processing transaction: {e}")
-            continue
-    
-    # Sort transactions by date (most recent first)
-    mtd_transactions.sort(key=lambda x: x['date'], reverse=True)
-    
-    # Get available spending for the month
-    total_income = 0
-    for income in budget_data.get('income_sources', []):
-        amount = float(income.get('amount', 0))
-        frequency = income.get('frequency', 'monthly')
-        
-        # Convert all frequencies to monthly
-        if frequency == 'weekly':
-            monthly_amount = amount * 52 / 12
-        elif frequency == 'bi-weekly':
-            monthly_amount = amount * 26 / 12
-        elif frequency == 'monthly':
-            monthly_amount = amount
-        elif frequency == 'annual':
-            monthly_amount = amount / 12
-        else:
-            monthly_amount = amount
-            
-        total_income += monthly_amount
-    
-    # Calculate total monthly commitments (expenses + retirement + savings)
-    total_expenses = sum(float(expense.get('amount', 0)) for expense in budget_data.get('fixed_expenses', []))
-    
-    # Add retirement contributions
-    total_retirement = 0
-    for account in budget_data.get('retirement_accounts', []):
-        contribution = float(account.get('contribution_per_paycheck', 0))
-        linked_income_id = account.get('linked_income_id')
-        
-        # Find the linked income source to determine pay frequency
-        pay_frequency = 'monthly'
-        for income in budget_data.get('income_sources', []):
-            if income.get('id') == linked_income_id:
-                pay_frequency = income.get('frequency', 'monthly')
-                break
-        
-        # Convert to monthly
-        if pay_frequency == 'weekly':
-            monthly_contribution = contribution * 52 / 12
-        elif pay_frequency == 'bi-weekly':
-            monthly_contribution = contribution * 26 / 12
-        elif pay_frequency == 'monthly':
-            monthly_contribution = contribution
-        else:
-            monthly_contribution = contribution
-            
-        total_retirement += monthly_contribution
-    
-    # Add savings allocations
-    total_savings = sum(float(goal.get('monthly_contribution', 0)) for goal in budget_data.get('savings_goals', []))
+    has_data = (len(ctx.data.get('transactions', [])) > 0 or 
+                len(ctx.data.get('income_sources', [])) > 0 or 
+                len(ctx.data.get('fixed_expenses', [])) > 0)
+    
+    # MTD spending (refunds included) from the month x category aggregates
+    mtd = ctx.mtd
+    mtd_spent = mtd.net
+    category_spending = mtd.by_category
+    
+    # The 10 most recent transactions, straight from the date index
+    month_transactions = budget_data['transactions'].between(*month_days(ctx.year, ctx.month), descending=True)
+    recent = itertools.islice((t for t in month_transactions if t.value is not None), 10)
+    recent_transactions = [
+        {
+            'id': transaction.get('id'),
+            'date': transaction.get('date', ''),
+            'description': transaction.get('description', 'No description'),
+            'amount': round(transaction.value, 2),
+            'category': transaction.get('category', 'Uncategorized'),
+            'merchant': transaction.get('merchant', '')
+        }
+        for transaction in recent
+    ]
     
-    # Calculate available for discretionary spending
-    available = total_income - total_expenses - total_retirement - total_savings
+    # Available for discretionary spending (income - expenses - retirement - savings)
+    available = ctx.available
     
     # Calculate remaining and percentages
     remaining = available - mtd_spent
@@ -2678,16 +2862,13 @@ def get_mtd_spending():
             'category': category,
             'amount': round(amount, 2),
             'percent': round((amount / mtd_spent * 100) if mtd_spent > 0 else 0, 1),
-            'transaction_count': sum(1 for t in mtd_transactions if t['category'] == category)
+            'transaction_count': mtd.category_counts[category]
         }
         for category, amount in category_spending.items()
     ]
     category_breakdown.sort(key=lambda x: x['amount'], reverse=True)
     
-    # Get top 10 recent transactions
-    recent_transactions = mtd_transactions[:10]
-    
-    return jsonify({
+    return {
         'total': round(mtd_spent, 2),
         'available': round(available, 2),
         'remaining': round(remaining, 2),
@@ -2699,7 +2880,7 @@ def get_mtd_spending():
         'days_elapsed': current_day,
         'days_remaining': days_remaining,
         'days_in_month': days_in_month,
-        'transaction_count': len(mtd_transactions),
+        'transaction_count': mtd.transaction_count,
         'status': status,
         'status_message': status_message,
         'color': color,
@@ -2708,7 +2889,7 @@ def get_mtd_spending():
         'has_data': has_data,
         'month_name': now.strftime('%B'),
         'year': current_year
-    })
+    }
 
 @app.route('/api/dashboard/money-per-day', methods=['GET'])
 def get_money_per_day():
@@ -2716,58 +2897,25 @@ def get_money_per_day():
     Calculate how much money is available to spend per day until the next paycheck.
     This helps users budget their daily spending to avoid running out before payday.
     """
-    from datetime import datetime, timedelta
-    from calendar import monthrange
-    
-    now = datetime.now()
-    current_year = now.year
-    current_month = now.month
+    return jsonify(_money_per_day(dashboard_context()))
+
+def _money_per_day(ctx):
+    """Money-per-day card, built from a FinancialContext"""
+    now = ctx.now
     
     # Calculate available spending (income - fixed expenses)
-    total_income = 0
-    for income in budget_data['income_sources']:
-        amount = float(income.get('amount', 0))
-        frequency = income.get('frequency', 'monthly')
-        
-        # Convert all frequencies to monthly
-        if frequency == 'weekly':
-            monthly_amount = amount * 52 / 12
-        elif frequency == 'bi-weekly':
-            monthly_amount = amount * 26 / 12
-        elif frequency == 'monthly':
-            monthly_amount = amount
-        elif frequency == 'annual':
-            monthly_amount = amount / 12
-        else:
-            monthly_amount = amount
-            
-        total_income += monthly_amount
-    
-    total_expenses = 0
-    for expense in budget_data['fixed_expenses']:
-        amount = float(expense.get('amount', 0))
-        total_expenses += amount
-    
+    total_income = ctx.total_income
+    total_expenses = ctx.total_expenses
     available_for_month = total_income - total_expenses
     
-    # Calculate month-to-date spending from transactions
-    mtd_spent = 0
-    
-    for transaction in budget_data['transactions']:
-        try:
-            trans_date = datetime.fromisoformat(transaction['date'])
-            if trans_date.year == current_year and trans_date.month == current_month:
-                amount = float(transaction.get('amount', 0))
-                if amount > 0:  # Only count expenses (positive amounts)
-                    mtd_spent += amount
-        except (ValueError, KeyError):
-            continue
+    # Month-to-date spending (only expenses, i.e. positive amounts)
+    mtd_spent = ctx.mtd.spent
     
     # Calculate remaining money
     remaining_money = available_for_month - mtd_spent
     
     # Find days until next paycheck
-    income_sources = budget_data.get('income_sources', [])
+    income_sources = ctx.data.get('income_sources', [])
     days_until_paycheck = None
     next_paycheck_date = None
     
@@ -2775,45 +2923,14 @@ def get_money_per_day():
         next_paychecks = []
         
         for income in income_sources:
-            next_pay_date = income.get('next_pay_date')
-            frequency = income.get('frequency', 'monthly')
-            
-            if not next_pay_date:
-                continue
-            
-            try:
-                pay_date = datetime.fromisoformat(next_pay_date.replace('Z', '+00:00'))
-                if pay_date.tzinfo:
-                    pay_date = pay_date.replace(tzinfo=None)
-            except:
+            schedule = PaySchedule.for_income(income)
+            if schedule is None:
                 continue
             
             # If the pay date is in the past, calculate the next one
-            while pay_date < now:
-                if frequency == 'weekly':
-                    pay_date += timedelta(days=7)
-                elif frequency == 'bi-weekly':
-                    pay_date += timedelta(days=14)
-                elif frequency == 'monthly':
-                    month = pay_date.month
-                    year = pay_date.year
-                    if month == 12:
-                        month = 1
-                        year += 1
-                    else:
-                        month += 1
-                    try:
-                        pay_date = pay_date.replace(month=month, year=year)
-                    except ValueError:
-                        import calendar
-                        last_day = calendar.monthrange(year, month)[1]
-                        pay_date = pay_date.replace(day=last_day, month=month, year=year)
-                elif frequency == 'annual':
-                    pay_date = pay_date.replace(year=pay_date.year + 1)
-                else:
-                    break
+            pay_date = schedule.next_on_or_after(now)
             
-            if pay_date >= now:
+            if pay_date is not None:
                 next_paychecks.append(pay_date)
         
         if next_paychecks:
@@ -2824,8 +2941,7 @@ def get_money_per_day():
     
     # If no paycheck date found, use days remaining in month
     if days_until_paycheck is None:
-        days_in_month = monthrange(current_year, current_month)[1]
-        days_until_paycheck = days_in_month - now.day
+        days_until_paycheck = ctx.days_in_month - now.day
         if days_until_paycheck == 0:
             days_until_paycheck = 1
     
@@ -2861,7 +2977,7 @@ def get_money_per_day():
         status = 'warning'
         status_text = 'No Data'
     
-    return jsonify({
+    return {
         'money_per_day': round(money_per_day, 2),
         'remaining_money': round(remaining_money, 2),
         'days_until_paycheck': days_until_paycheck,
@@ -2871,7 +2987,7 @@ def get_money_per_day():
         'available_for_month': round(available_for_month, 2),
         'mtd_spent': round(mtd_spent, 2),
         'next_paycheck_date': next_paycheck_date.strftime('%Y-%m-%d') if next_paycheck_date else None
-    })
+    }
 
 @app.route('/api/dashboard/overdraft-status', methods=['GET'])
 def get_overdraft_status():
@@ -2884,94 +3000,33 @@ def get_overdraft_status():
     - Warning (Yellow): Approaching overdraft 
     - Safe (Green): Healthy financial position
     """
-    from datetime import datetime
-    from calendar import monthrange
-    
-    now = datetime.now()
-    current_year = now.year
-    current_month = now.month
-    current_day = now.day
+    return jsonify(_overdraft_status(dashboard_context()))
+
+def _overdraft_status(ctx):
+    """Overdraft risk card, built from a FinancialContext"""
+    current_day = ctx.day
     
     # Get days in current month and days remaining
-    days_in_month = monthrange(current_year, current_month)[1]
+    days_in_month = ctx.days_in_month
     days_remaining = days_in_month - current_day
     if days_remaining == 0:
         days_remaining = 1
     
-    # Calculate total liquid account balances (checking + savings, not credit)
-    total_liquid = 0
-    checking_balance = 0
-    savings_balance = 0
-    credit_balance = 0
-    
-    for account in budget_data['accounts']:
-        balance = float(account.get('balance', 0))
-        account_type = account.get('type', '').lower()
-        
-        if account_type == 'checking':
-            checking_balance += balance
-            total_liquid += balance
-        elif account_type == 'savings':
-            savings_balance += balance
-            total_liquid += balance
-        elif account_type == 'credit':
-            credit_balance += balance
+    # Total liquid account balances (checking + savings, not credit)
+    balances = ctx.balances
+    total_liquid = balances['liquid']
+    checking_balance = balances['checking']
+    savings_balance = balances['savings']
+    credit_balance = balances['credit']
     
     # Calculate available spending (income - fixed expenses)
-    total_income = 0
-    for income in budget_data['income_sources']:
-        amount = float(income.get('amount', 0))
-        frequency = income.get('frequency', 'monthly')
-        
-        # Convert all frequencies to monthly
-        if frequency == 'weekly':
-            monthly_amount = amount * 52 / 12
-        elif frequency == 'bi-weekly':
-            monthly_amount = amount * 26 / 12
-        elif frequency == 'monthly':
-            monthly_amount = amount
-        elif frequency == 'annual':
-            monthly_amount = amount / 12
-        else:
-            monthly_amount = amount
-            
-        total_income += monthly_amount
-    
-    total_expenses = 0
-    upcoming_bills = 0  # Bills due in next 7 days
-    
-    for expense in budget_data['fixed_expenses']:
-        amount = float(expense.get('amount', 0))
-        total_expenses += amount
-        
-        # Check if bill is due soon
-        due_day = expense.get('due_day')
-        if due_day:
-            try:
-                due_day = int(due_day)
-                days_until_due = due_day - current_day
-                if days_until_due < 0:
-                    days_until_due += days_in_month
-                    
-                # Count bills due in next 7 days
-                if 0 <= days_until_due <= 7:
-                    upcoming_bills += amount
-            except (ValueError, TypeError):
-                pass
-    
+    total_income = ctx.total_income
+    total_expenses = ctx.total_expenses
+    upcoming_bills = ctx.bills_due_this_week  # Bills due in next 7 days
     available_for_month = total_income - total_expenses
     
-    # Calculate month-to-date spending
-    mtd_spent = 0
-    for transaction in budget_data['transactions']:
-        try:
-            trans_date = datetime.fromisoformat(transaction['date'])
-            if trans_date.year == current_year and trans_date.month == current_month:
-                amount = float(transaction.get('amount', 0))
-                if amount > 0:  # Only count expenses
-                    mtd_spent += amount
-        except (ValueError, KeyError):
-            continue
+    # Month-to-date spending (only expenses)
+    mtd_spent = ctx.mtd.spent
     
     # Calculate remaining for the month
     remaining_money = available_for_month - mtd_spent
@@ -3057,7 +3112,7 @@ def get_overdraft_status():
             recommendations.append('Link your checking and savings accounts')
     
     # Handle no data scenario
-    if total_income == 0 and len(budget_data['accounts']) == 0:
+    if total_income == 0 and len(ctx.data['accounts']) == 0:
         risk_level = 'warning'
         alert_color = '#6b7280'  # Gray
         alert_icon = 'ℹ️'
@@ -3068,7 +3123,7 @@ def get_overdraft_status():
             'Add your fixed monthly expenses'
         ]
     
-    return jsonify({
+    return {
         'risk_level': risk_level,
         'alert_color': alert_color,
         'alert_icon': alert_icon,
@@ -3083,7 +3138,7 @@ def get_overdraft_status():
             'projected_remaining': round(projected_remaining, 2),
             'days_remaining': days_remaining
         }
-    })
+    }
 
 # Alias endpoints for frontend compatibility
 @app.route('/api/dashboard/overdraft-warning', methods=['GET'])
@@ -3102,6 +3157,7 @@ def get_recommendations():
     return get_smart_recommendations()
 
 @app.route('/api/dashboard/budget-health-score', methods=['GET'])
+@memoized
 def get_budget_health_score():
     """
     Calculate a comprehensive budget health score (0-100) based on multiple factors:
@@ -3113,16 +3169,14 @@ def get_budget_health_score():
     
     Returns a score with breakdown, grade, and recommendations.
     """
-    from datetime import datetime
-    from calendar import monthrange
-    
-    now = datetime.now()
-    current_year = now.year
-    current_month = now.month
-    current_day = now.day
+    return jsonify(_budget_health_score(dashboard_context()))
+
+def _budget_health_score(ctx):
+    """Budget health score card, built from a FinancialContext"""
+    current_day = ctx.day
     
     # Get days in current month
-    days_in_month = monthrange(current_year, current_month)[1]
+    days_in_month = ctx.days_in_month
     days_remaining = days_in_month - current_day
     if days_remaining == 0:
         days_remaining = 1
@@ -3136,85 +3190,26 @@ def get_budget_health_score():
         'setup_completeness': {'score': 0, 'max': 10, 'factors': []}
     }
     
-    # Calculate account balances
-    total_liquid = 0
-    checking_balance = 0
-    savings_balance = 0
-    credit_balance = 0
-    num_accounts = len(budget_data['accounts'])
-    
-    for account in budget_data['accounts']:
-        balance = float(account.get('balance', 0))
-        account_type = account.get('type', '').lower()
-        
-        if account_type == 'checking':
-            checking_balance += balance
-            total_liquid += balance
-        elif account_type == 'savings':
-            savings_balance += balance
-            total_liquid += balance
-        elif account_type == 'credit':
-            credit_balance += balance
-    
-    # Calculate income and expenses
-    total_income = 0
-    num_income_sources = len(budget_data['income_sources'])
-    
-    for income in budget_data['income_sources']:
-        amount = float(income.get('amount', 0))
-        frequency = income.get('frequency', 'monthly')
-        
-        # Convert to monthly
-        if frequency == 'weekly':
-            monthly_amount = amount * 52 / 12
-        elif frequency == 'bi-weekly':
-            monthly_amount = amount * 26 / 12
-        elif frequency == 'monthly':
-            monthly_amount = amount
-        elif frequency == 'annual':
-            monthly_amount = amount / 12
-        else:
-            monthly_amount = amount
-            
-        total_income += monthly_amount
-    
-    total_expenses = 0
-    num_expenses = len(budget_data['fixed_expenses'])
-    upcoming_bills = 0
-    
-    for expense in budget_data['fixed_expenses']:
-        amount = float(expense.get('amount', 0))
-        total_expenses += amount
-        
-        # Check bills due in next 7 days
-        due_day = expense.get('due_day')
-        if due_day:
-            try:
-                due_day = int(due_day)
-                days_until_due = due_day - current_day
-                if days_until_due < 0:
-                    days_until_due += days_in_month
-                if 0 <= days_until_due <= 7:
-                    upcoming_bills += amount
-            except (ValueError, TypeError):
-                pass
+    # Account balances
+    balances = ctx.balances
+    total_liquid = balances['liquid']
+    checking_balance = balances['checking']
+    savings_balance = balances['savings']
+    credit_balance = balances['credit']
+    num_accounts = len(ctx.data['accounts'])
+    
+    # Income and expenses
+    total_income = ctx.total_income
+    num_income_sources = len(ctx.data['income_sources'])
+    total_expenses = ctx.total_expenses
+    num_expenses = len(ctx.data['fixed_expenses'])
+    upcoming_bills = ctx.bills_due_this_week
     
     available_for_month = total_income - total_expenses
     
-    # Calculate month-to-date spending
-    mtd_spent = 0
-    num_transactions = 0
-    
-    for transaction in budget_data['transactions']:
-        try:
-            trans_date = datetime.fromisoformat(transaction['date'])
-            if trans_date.year == current_year and trans_date.month == current_month:
-                amount = float(transaction.get('amount', 0))
-                if amount > 0:
-                    mtd_spent += amount
-                    num_transactions += 1
-        except (ValueError, KeyError):
-            continue
+    # Month-to-date spending
+    mtd_spent = ctx.mtd.spent
+    num_transactions = ctx.mtd.count
     
     remaining_money = available_for_month - mtd_spent
     
@@ -3346,7 +3341,7 @@ def get_budget_health_score():
             score_breakdown['savings_rate']['factors'].append(f'🚨 Negative savings rate ({savings_rate:.1f}%)')
         
         # Additional points for having savings goals
-        num_goals = len(budget_data.get('savings_goals', []))
+        num_goals = len(ctx.data.get('savings_goals', []))
         if num_goals > 0:
             score_breakdown['savings_rate']['factors'].append(f'✅ {num_goals} savings goal(s) set')
     else:
@@ -3500,7 +3495,7 @@ def get_budget_health_score():
     # Check if we have meaningful data
     has_data = (num_accounts > 0 or num_income_sources > 0 or num_expenses > 0)
     
-    return jsonify({
+    return {
         'score': total_score,
         'grade': grade,
         'grade_text': grade_text,
@@ -3517,7 +3512,7 @@ def get_budget_health_score():
             'mtd_spent': round(mtd_spent, 2),
             'remaining_money': round(remaining_money, 2)
         }
-    })
+    }
 
 @app.route('/api/dashboard/month-comparison', methods=['GET'])
 def get_month_comparison():
@@ -3525,245 +3520,207 @@ def get_month_comparison():
     Compare current month metrics with previous months
     Returns comparison data for income, expenses, spending, and savings
     """
-    from datetime import datetime
+    try:
+        return jsonify(_month_comparison(dashboard_context()))
+    except Exception as e:
+        print(f"Error in month comparison: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e), 'has_data': False}), 500
+
+def _month_comparison(ctx):
+    """Month-over-month comparison card, built from a FinancialContext"""
     from calendar import month_name
     
-    try:
-        now = datetime.now()
-        current_year = now.year
-        current_month = now.month
+    now = ctx.now
+    current_year = ctx.year
+    current_month = ctx.month
+    
+    # Calculate previous month
+    if current_month == 1:
+        prev_year = current_year - 1
+        prev_month = 12
+    else:
+        prev_year = current_year
+        prev_month = current_month - 1
+    
+    # Helper function to get month metrics
+    def get_month_metrics(year, month):
+        metrics = {
+            'income': 0,
+            'expenses': 0,
+            'spending': 0,
+            'transaction_count': 0,
+            'savings': 0
+        }
         
-        # Calculate previous month
-        if current_month == 1:
-            prev_year = current_year - 1
-            prev_month = 12
-        else:
-            prev_year = current_year
-            prev_month = current_month - 1
-        
-        # Helper function to get month metrics
-        def get_month_metrics(year, month):
-            metrics = {
-                'income': 0,
-                'expenses': 0,
-                'spending': 0,
-                'transaction_count': 0,
-                'savings': 0
-            }
-            
-            # Calculate income (this is typically constant, but we'll track it)
-            for income in budget_data.get('income_sources', []):
-                amount = float(income.get('amount', 0))
-                frequency = income.get('frequency', 'monthly')
-                
-                # Convert to monthly
-                if frequency == 'weekly':
-                    monthly_amount = amount * 52 / 12
-                elif frequency == 'bi-weekly':
-                    monthly_amount = amount * 26 / 12
-                elif frequency == 'monthly':
-                    monthly_amount = amount
-                elif frequency == 'annual':
-                    monthly_amount = amount / 12
-                else:
-                    monthly_amount = amount
-                
-                metrics['income'] += monthly_amount
-            
-            # Calculate fixed expenses
-            for expense in budget_data.get('fixed_expenses', []):
-                amount = float(expense.get('amount', 0))
-                metrics['expenses'] += amount
-            
-            # Calculate spending from transactions
-            for transaction in budget_data.get('transactions', []):
-                try:
-                    trans_date = datetime.fromisoformat(transaction['date'])
-                    if trans_date.year == year and trans_date.month == month:
-                        amount = float(transaction.get('amount', 0))
-                        if amount > 0:
-                            metrics['spending'] += amount
-                            metrics['transaction_count'] += 1
-                except (ValueError, KeyError):
-                    continue
-            
-            # Calculate available money and implied savings
-            available = metrics['income'] - metrics['expenses']
-            metrics['savings'] = available - metrics['spending']
-            
-            return metrics
+        # Monthly income and fixed expenses (these are typically constant)
+        metrics['income'] += ctx.total_income
+        metrics['expenses'] += ctx.total_expenses
         
-        # Get current and previous month metrics
-        current = get_month_metrics(current_year, current_month)
-        previous = get_month_metrics(prev_year, prev_month)
+        # Calculate spending from transactions
+        aggregates = get_category_aggregates()
+        with aggregates.lock:
+            cents, count = aggregates.spending(year, month)
+        metrics['spending'] += cents / 100
+        metrics['transaction_count'] += count
         
-        # Calculate changes and percentages
-        def calculate_change(current_val, prev_val):
-            change = current_val - prev_val
-            if prev_val != 0:
-                percent_change = (change / prev_val) * 100
-            else:
-                percent_change = 100 if change > 0 else 0
-            
-            return {
-                'current': round(current_val, 2),
-                'previous': round(prev_val, 2),
-                'change': round(change, 2),
-                'percent_change': round(percent_change, 1),
-                'direction': 'up' if change > 0 else 'down' if change < 0 else 'same'
-            }
+        # Calculate available money and implied savings
+        available = metrics['income'] - metrics['expenses']
+        metrics['savings'] = available - metrics['spending']
         
-        # Build comparison object
-        comparison = {
-            'current_month': {
-                'year': current_year,
-                'month': current_month,
-                'month_name': now.strftime('%B %Y')
-            },
-            'previous_month': {
-                'year': prev_year,
-                'month': prev_month,
-                'month_name': f"{month_name[prev_month]} {prev_year}"
-            },
-            'income': calculate_change(current['income'], previous['income']),
-            'expenses': calculate_change(current['expenses'], previous['expenses']),
-            'spending': calculate_change(current['spending'], previous['spending']),
-            'savings': calculate_change(current['savings'], previous['savings']),
-            'transaction_count': calculate_change(current['transaction_count'], previous['transaction_count']),
-            'has_data': current['transaction_count'] > 0 or previous['transaction_count'] > 0
+        return metrics
+    
+    # Get current and previous month metrics
+    current = get_month_metrics(current_year, current_month)
+    previous = get_month_metrics(prev_year, prev_month)
+    
+    # Calculate changes and percentages
+    def calculate_change(current_val, prev_val):
+        change = current_val - prev_val
+        if prev_val != 0:
+            percent_change = (change / prev_val) * 100
+        else:
+            percent_change = 100 if change > 0 else 0
+        
+        return {
+            'current': round(current_val, 2),
+            'previous': round(prev_val, 2),
+            'change': round(change, 2),
+            'percent_change': round(percent_change, 1),
+            'direction': 'up' if change > 0 else 'down' if change < 0 else 'same'
         }
-        
-        # Add insights
-        insights = []
-        
-        # Spending insights
-        if comparison['spending']['direction'] == 'down' and abs(comparison['spending']['percent_change']) > 5:
-            insights.append({
-                'type': 'positive',
-                'icon': '📉',
-                'message': f"Great job! Spending decreased by {abs(comparison['spending']['percent_change'])}% from last month"
-            })
-        elif comparison['spending']['direction'] == 'up' and comparison['spending']['percent_change'] > 10:
-            insights.append({
-                'type': 'warning',
-                'icon': '📈',
-                'message': f"Spending increased by {comparison['spending']['percent_change']}% from last month"
-            })
-        
-        # Savings insights
-        if comparison['savings']['direction'] == 'up' and comparison['savings']['change'] > 0:
-            insights.append({
-                'type': 'positive',
-                'icon': '💰',
-                'message': f"Saving ${abs(comparison['savings']['change']):.2f} more than last month"
-            })
-        elif comparison['savings']['direction'] == 'down' and abs(comparison['savings']['change']) > 100:
-            insights.append({
-                'type': 'warning',
-                'icon': '⚠️',
-                'message': f"Savings decreased by ${abs(comparison['savings']['change']):.2f} from last month"
-            })
-        
-        # Transaction count insights
-        if comparison['transaction_count']['direction'] == 'up' and comparison['transaction_count']['percent_change'] > 20:
-            insights.append({
-                'type': 'info',
-                'icon': '🛒',
-                'message': f"{int(comparison['transaction_count']['change'])} more transactions than last month"
-            })
-        
-        comparison['insights'] = insights
-        
-        return jsonify(comparison)
-        
-    except Exception as e:
-        print(f"Error in month comparison: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'success': False, 'error': str(e), 'has_data': False}), 500
+    
+    # Build comparison object
+    comparison = {
+        'current_month': {
+            'year': current_year,
+            'month': current_month,
+            'month_name': now.strftime('%B %Y')
+        },
+        'previous_month': {
+            'year': prev_year,
+            'month': prev_month,
+            'month_name': f"{month_name[prev_month]} {prev_year}"
+        },
+        'income': calculate_change(current['income'], previous['income']),
+        'expenses': calculate_change(current['expenses'], previous['expenses']),
+        'spending': calculate_change(current['spending'], previous['spending']),
+        'savings': calculate_change(current['savings'], previous['savings']),
+        'transaction_count': calculate_change(current['transaction_count'], previous['transaction_count']),
+        'has_data': current['transaction_count'] > 0 or previous['transaction_count'] > 0
+    }
+    
+    # Add insights
+    insights = []
+    
+    # Spending insights
+    if comparison['spending']['direction'] == 'down' and abs(comparison['spending']['percent_change']) > 5:
+        insights.append({
+            'type': 'positive',
+            'icon': '📉',
+            'message': f"Great job! Spending decreased by {abs(comparison['spending']['percent_change'])}% from last month"
+        })
+    elif comparison['spending']['direction'] == 'up' and comparison['spending']['percent_change'] > 10:
+        insights.append({
+            'type': 'warning',
+            'icon': '📈',
+            'message': f"Spending increased by {comparison['spending']['percent_change']}% from last month"
+        })
+    
+    # Savings insights
+    if comparison['savings']['direction'] == 'up' and comparison['savings']['change'] > 0:
+        insights.append({
+            'type': 'positive',
+            'icon': '💰',
+            'message': f"Saving ${abs(comparison['savings']['change']):.2f} more than last month"
+        })
+    elif comparison['savings']['direction'] == 'down' and abs(comparison['savings']['change']) > 100:
+        insights.append({
+            'type': 'warning',
+            'icon': '⚠️',
+            'message': f"Savings decreased by ${abs(comparison['savings']['change']):.2f} from last month"
+        })
+    
+    # Transaction count insights
+    if comparison['transaction_count']['direction'] == 'up' and comparison['transaction_count']['percent_change'] > 20:
+        insights.append({
+            'type': 'info',
+            'icon': '🛒',
+            'message': f"{int(comparison['transaction_count']['change'])} more transactions than last month"
+        })
+    
+    comparison['insights'] = insights
+    
+    return comparison
 
 @app.route('/api/dashboard/upcoming-bills', methods=['GET'])
 def get_upcoming_bills():
     """
-    Get list of bills due in the next 7 days
+    Get list of bills due in the next 7 days (or ?days=N, up to a year)
     Returns detailed information about each upcoming bill
     """
-    from datetime import datetime, timedelta
-    from calendar import monthrange
+    from datetime import datetime
     
     try:
-        now = datetime.now()
-        current_year = now.year
-        current_month = now.month
-        current_day = now.day
-        days_in_month = monthrange(current_year, current_month)[1]
+        days = int(request.args.get('days', 7))
+        if not 1 <= days <= MAX_BILL_WINDOW_DAYS:
+            raise ValueError
+    except ValueError:
+        return jsonify({'success': False, 'error': f'days must be a whole number from 1 to {MAX_BILL_WINDOW_DAYS}'}), 400
+    
+    try:
+        today = datetime.now().date()
         
         upcoming_bills = []
         total_due = 0
         
-        for expense in budget_data['fixed_expenses']:
-            due_day = expense.get('due_day')
-            if due_day:
-                try:
-                    due_day = int(due_day)
-                    amount = float(expense.get('amount', 0))
-                    
-                    # Calculate days until due
-                    days_until_due = due_day - current_day
-                    if days_until_due < 0:
-                        days_until_due += days_in_month
-                    
-                    # Check if bill is due in next 7 days
-                    if 0 <= days_until_due <= 7:
-                        # Calculate the actual due date
-                        if due_day >= current_day:
-                            due_date = datetime(current_year, current_month, due_day)
-                        else:
-                            # Bill is due next month
-                            next_month = current_month + 1 if current_month < 12 else 1
-                            next_year = current_year if current_month < 12 else current_year + 1
-                            due_date = datetime(next_year, next_month, due_day)
-                        
-                        bill_info = {
-                            'id': expense.get('id'),
-                            'name': expense.get('name', 'Unnamed Bill'),
-                            'amount': round(amount, 2),
-                            'due_day': due_day,
-                            'due_date': due_date.strftime('%Y-%m-%d'),
-                            'due_date_formatted': due_date.strftime('%b %d, %Y'),
-                            'days_until_due': days_until_due,
-                            'category': expense.get('category', 'Other'),
-                            'is_autopay': expense.get('is_autopay', False),
-                            'is_paid': expense.get('is_paid', False),
-                            'urgency': 'urgent' if days_until_due <= 2 else 'soon' if days_until_due <= 5 else 'upcoming'
-                        }
-                        
-                        upcoming_bills.append(bill_info)
-                        if not bill_info['is_paid']:
-                            total_due += amount
-                            
-                except (ValueError, TypeError) as e:
-                    print(f"Error processing expense {expense.get('name')}: {e}")
-                    continue
-        
-        # Sort by days until due (most urgent first)
-        upcoming_bills.sort(key=lambda x: x['days_until_due'])
+        # Occurrences come out in due-date order (most urgent first)
+        for occurrence in bill_calendar().upcoming(today, days):
+            due_date, expense = occurrence
+            amount = expense.value
+            days_until_due = (due_date - today).days
+            is_paid = occurrence.is_paid(today)
+            
+            bill_info = {
+                'id': expense.get('id'),
+                'name': expense.get('name', 'Unnamed Bill'),
+                'amount': round(amount, 2),
+                'due_day': expense.due,
+                'due_date': due_date.strftime('%Y-%m-%d'),
+                'due_date_formatted': due_date.strftime('%b %d, %Y'),
+                'days_until_due': days_until_due,
+                'category': expense.get('category', 'Other'),
+                'is_autopay': expense.get('is_autopay', False),
+                'is_paid': is_paid,
+                'urgency': 'urgent' if days_until_due <= 2 else 'soon' if days_until_due <= 5 else 'upcoming'
+            }
+            
+            upcoming_bills.append(bill_info)
+            if not is_paid:
+                total_due += amount
         
         return jsonify({
             'success': True,
+            'days': days,
             'bills': upcoming_bills,
             'total_count': len(upcoming_bills),
             'total_due': round(total_due, 2),
             'unpaid_count': len([b for b in upcoming_bills if not b['is_paid']])
         })
-        
+    
     except Exception as e:
         print(f"Error in upcoming bills: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e), 'bills': [], 'total_count': 0, 'total_due': 0}), 500
 
+def _mean_cents(totals):
+    """Mean of non-negative cent totals, to the nearest cent (halves round up)"""
+    return (2 * sum(totals) + len(totals)) // (2 * len(totals))
+
 @app.route('/api/dashboard/spending-patterns', methods=['GET'])
+@memoized
 def get_spending_patterns():
     """
     Analyze historical spending patterns and compare with current month
@@ -3773,6 +3730,8 @@ def get_spending_patterns():
     - "You usually spend more on groceries this week"
     - "Dining out is 40% higher than usual"
     - "Gas spending is lower than typical"
+    
+    Averages are exact means of the cent totals, rounded half up to the cent.
     """
     from datetime import datetime, timedelta
     from collections import defaultdict
@@ -3796,36 +3755,28 @@ def get_spending_patterns():
         # Also track weekly patterns (same week across multiple months)
         weekly_patterns = defaultdict(lambda: defaultdict(list))
         
-        for transaction in budget_data['transactions']:
-            try:
-                trans_date = datetime.fromisoformat(transaction['date'])
-                amount = float(transaction.get('amount', 0))
-                category = transaction.get('category', 'Miscellaneous')
-                
-                if amount <= 0:  # Only analyze expenses
-                    continue
-                
-                trans_day = trans_date.day
-                trans_week = ((trans_day - 1) // 7) + 1
+        # Monthly totals come from the aggregates, the week-of-month slices from the columns
+        aggregates = get_category_aggregates()
+        columns = get_transaction_columns()
+        with aggregates.lock, columns.lock:
+            for year, month in aggregates.sorted_months():
+                # Only expenses (positive amounts) are analyzed
+                monthly = aggregates.spending_by_category(year, month, 'Miscellaneous')
+                weekly = columns.spending_by_category(*columns.week_span(year, month, current_week), 'Miscellaneous')
                 
-                # Track current month spending
-                if trans_date.year == current_year and trans_date.month == current_month:
-                    current_month_spending[category] += amount
-                    
-                    # Track current week spending
-                    if trans_week == current_week:
-                        current_week_spending[category] += amount
+                if year == current_year and month == current_month:
+                    # Track current month and current week spending
+                    for category, cents in monthly.items():
+                        current_month_spending[category] += cents / 100
+                    for category, cents in weekly.items():
+                        current_week_spending[category] += cents / 100
                 else:
-                    # Build historical monthly data
-                    month_key = f"{trans_date.year}-{trans_date.month:02d}"
-                    category_history[category][month_key].append(amount)
-                    
-                    # Build historical weekly data (same week number in past months)
-                    if trans_week == current_week:
-                        weekly_patterns[category][month_key].append(amount)
-                    
-            except (ValueError, KeyError) as e:
-                continue
+                    # Build historical monthly and weekly data (same week number in past months), in cents
+                    month_key = f"{year}-{month:02d}"
+                    for category, cents in monthly.items():
+                        category_history[category][month_key].append(cents)
+                    for category, cents in weekly.items():
+                        weekly_patterns[category][month_key].append(cents)
         
         # Calculate patterns and anomalies
         patterns = []
@@ -3837,17 +3788,18 @@ def get_spending_patterns():
             if len(monthly_data) < 2:  # Need at least 2 months of history
                 continue
             
-            # Calculate monthly totals for this category
+            # Calculate monthly totals for this category (cents)
             monthly_totals = [sum(transactions) for transactions in monthly_data.values()]
             
             if not monthly_totals:
                 continue
             
-            # Calculate statistics
-            avg_monthly_spend = statistics.mean(monthly_totals)
-            std_dev = statistics.stdev(monthly_totals) if len(monthly_totals) > 1 else 0
-            min_spend = min(monthly_totals)
-            max_spend = max(monthly_totals)
+            # Calculate statistics. The totals are exact cents, so averages are rounded once, half a cent
+            # up (the float sums used before could round an exact half cent either way)
+            avg_monthly_spend = _mean_cents(monthly_totals) / 100
+            std_dev = statistics.stdev(monthly_totals) / 100 if len(monthly_totals) > 1 else 0
+            min_spend = min(monthly_totals) / 100
+            max_spend = max(monthly_totals) / 100
             
             # Get current month spending for this category
             current_spend = current_month_spending.get(category, 0)
@@ -3857,7 +3809,7 @@ def get_spending_patterns():
             weekly_data = weekly_patterns.get(category, {})
             if weekly_data:
                 weekly_totals = [sum(transactions) for transactions in weekly_data.values()]
-                avg_weekly_spend = statistics.mean(weekly_totals) if weekly_totals else 0
+                avg_weekly_spend = _mean_cents(weekly_totals) / 100 if weekly_totals else 0
             else:
                 # Estimate from monthly average (divide by ~4 weeks)
                 avg_weekly_spend = avg_monthly_spend / 4
@@ -4004,7 +3956,7 @@ def get_spending_patterns():
             'current_week': current_week,
             'current_day': current_day
         })
-        
+    
     except Exception as e:
         print(f"Error in spending patterns: {e}")
         import traceback
@@ -4050,6 +4002,7 @@ def get_category_icon(category):
     return category_icons.get(category, '📁')
 
 @app.route('/api/dashboard/smart-recommendations', methods=['GET'])
+@memoized
 def get_smart_recommendations():
     """
     Generate comprehensive AI-powered financial recommendations based on:
@@ -4057,7 +4010,7 @@ def get_smart_recommendations():
     - Spending patterns and behavioral insights
     - Upcoming bills and payment history
     - Budget health and goal progress
-    - Historical data analysis (3-6 months)
+    - Historical data analysis (6 months, or ?months=N)
     - Predictive analytics
     - Contextual timing (time of month, season, etc.)
     
@@ -4068,6 +4021,14 @@ def get_smart_recommendations():
     from statistics import mean, median
     from collections import defaultdict
     
+    # Months of history to analyze (?months=12 or 24 for a longer view)
+    try:
+        lookback_months = int(request.args.get('months', 6))
+        if not 1 <= lookback_months <= 120:
+            raise ValueError
+    except ValueError:
+        return jsonify({'success': False, 'error': 'months must be a whole number from 1 to 120'}), 400
+    
     try:
         now = datetime.now()
         current_year = now.year
@@ -4096,8 +4057,8 @@ def get_smart_recommendations():
         account_count = len(budget_data['accounts'])
         
         for account in budget_data['accounts']:
-            balance = float(account.get('balance', 0))
-            account_type = account.get('type', '').lower()
+            balance = account.value
+            account_type = account.kind
             
             if account_type == 'checking':
                 checking_balance += balance
@@ -4135,30 +4096,15 @@ def get_smart_recommendations():
             income_by_earner[earner_name] += monthly_amount
             
             # Calculate next paycheck date
-            last_payment = income.get('last_payment_date')
-            if last_payment:
-                try:
-                    last_date = datetime.fromisoformat(last_payment)
-                    if frequency == 'weekly':
-                        next_date = last_date + timedelta(days=7)
-                    elif frequency == 'bi-weekly':
-                        next_date = last_date + timedelta(days=14)
-                    elif frequency == 'monthly':
-                        next_date = (last_date.replace(day=1) + timedelta(days=32)).replace(day=last_date.day)
-                    else:
-                        next_date = None
-                    
-                    if next_date:
-                        days_until = (next_date - now).days
-                        if days_until >= 0:
-                            next_paychecks.append({
-                                'earner': earner_name,
-                                'amount': amount,
-                                'days': days_until,
-                                'date': next_date
-                            })
-                except (ValueError, TypeError):
-                    pass
+            schedule = PaySchedule.for_income(income)
+            next_date = schedule.next_on_or_after(now) if schedule else None
+            if next_date:
+                next_paychecks.append({
+                    'earner': earner_name,
+                    'amount': amount,
+                    'days': (next_date - now).days,
+                    'date': next_date
+                })
         
         # Sort paychecks by soonest first
         next_paychecks.sort(key=lambda x: x['days'])
@@ -4172,40 +4118,33 @@ def get_smart_recommendations():
         manual_pay_total = 0
         
         for expense in budget_data['fixed_expenses']:
-            amount = float(expense.get('amount', 0))
+            amount = expense.value
             total_monthly_expenses += amount
             
-            is_autopay = expense.get('is_autopay', False)
-            is_paid = expense.get('is_paid', False)
-            
-            if is_autopay:
+            if expense.get('is_autopay', False):
                 autopay_total += amount
             else:
                 manual_pay_total += amount
+        
+        # Unpaid bills due in the next 7 and 14 days
+        today = now.date()
+        for occurrence in bill_calendar().upcoming(today, 14):
+            if occurrence.is_paid(today):
+                continue
+            expense = occurrence.expense
+            amount = expense.value
+            days_until_due = (occurrence.due - today).days
             
-            # Calculate upcoming bills
-            due_day = expense.get('due_day')
-            if due_day and not is_paid:
-                try:
-                    due_day = int(due_day)
-                    days_until_due = due_day - current_day
-                    if days_until_due < 0:
-                        days_until_due += days_in_month
-                    
-                    if days_until_due <= 7:
-                        upcoming_bills_7days += amount
-                        unpaid_bills.append({
-                            'name': expense.get('name', 'Bill'),
-                            'amount': amount,
-                            'days': days_until_due,
-                            'is_autopay': is_autopay,
-                            'category': expense.get('category', 'Other')
-                        })
-                    
-                    if days_until_due <= 14:
-                        upcoming_bills_14days += amount
-                except (ValueError, TypeError):
-                    pass
+            if days_until_due <= 7:
+                upcoming_bills_7days += amount
+                unpaid_bills.append({
+                    'name': expense.get('name', 'Bill'),
+                    'amount': amount,
+                    'days': days_until_due,
+                    'is_autopay': expense.get('is_autopay', False),
+                    'category': expense.get('category', 'Other')
+                })
+            upcoming_bills_14days += amount
         
         # Sort unpaid bills by urgency
         unpaid_bills.sort(key=lambda x: x['days'])
@@ -4218,74 +4157,53 @@ def get_smart_recommendations():
         # ================================================================
         
         # Current month spending
-        mtd_spent = 0
-        mtd_transaction_count = 0
         spending_by_category = defaultdict(float)
         spending_by_week = defaultdict(float)
         largest_transactions = []
         
-        for transaction in budget_data['transactions']:
-            try:
-                trans_date = datetime.fromisoformat(transaction['date'])
-                amount = float(transaction.get('amount', 0))
-                category = transaction.get('category', 'Uncategorized')
-                
-                if trans_date.year == current_year and trans_date.month == current_month and amount > 0:
-                    mtd_spent += amount
-                    mtd_transaction_count += 1
-                    spending_by_category[category] += amount
-                    
-                    # Track by week of month
-                    week_num = (trans_date.day - 1) // 7 + 1
-                    spending_by_week[week_num] += amount
-                    
-                    # Track large transactions
-                    largest_transactions.append({
-                        'date': trans_date,
-                        'amount': amount,
-                        'category': category,
-                        'description': transaction.get('description', '')
-                    })
-            except (ValueError, KeyError):
-                continue
-        
-        # Sort largest transactions
-        largest_transactions.sort(key=lambda x: x['amount'], reverse=True)
-        largest_transactions = largest_transactions[:5]
+        # This month's categories, weeks and largest purchases come from one
+        # grouped pass over its rows. Past months only need their totals, which
+        # the aggregates keep per month, so a longer lookback adds no pass.
+        columns = get_transaction_columns()
+        with columns.lock:
+            summary = columns.month_summary(current_year, current_month, top=5)
+            mtd_spent = summary['cents'] / 100
+            mtd_transaction_count = summary['count']
+            for category, cents in summary['by_category'].items():
+                spending_by_category[columns.category_names.value(category, 'Uncategorized')] += cents / 100
+            for week_num, cents in summary['by_week'].items():
+                spending_by_week[week_num] += cents / 100
+            for index in summary['largest']:
+                largest_transactions.append({
+                    'date': from_epoch_day(columns.days[index]),
+                    'amount': columns.cents[index] / 100,
+                    'category': columns.category_names.value(columns.categories[index], 'Uncategorized')
+                })
         
-        # Historical spending analysis (last 3-6 months)
+        # Historical spending analysis (last `lookback_months` months, 6 by default)
         historical_spending = defaultdict(float)
         historical_income = defaultdict(float)
         historical_savings = defaultdict(float)
         months_analyzed = []
         
-        for i in range(1, 7):  # Look back 6 months
-            past_month = current_month - i
-            past_year = current_year
-            if past_month <= 0:
-                past_month += 12
-                past_year -= 1
-            
-            month_key = f"{past_year}-{past_month:02d}"
-            months_analyzed.append(month_key)
-            
-            # Calculate spending for that month
-            month_spending = 0
-            for transaction in budget_data['transactions']:
-                try:
-                    trans_date = datetime.fromisoformat(transaction['date'])
-                    if trans_date.year == past_year and trans_date.month == past_month:
-                        amount = float(transaction.get('amount', 0))
-                        if amount > 0:
-                            month_spending += amount
-                except (ValueError, KeyError):
-                    continue
-            
-            historical_spending[month_key] = month_spending
-            # Income would be roughly the same each month
-            historical_income[month_key] = total_monthly_income
-            # Savings = Income - Expenses - Spending
-            historical_savings[month_key] = total_monthly_income - total_monthly_expenses - month_spending
+        aggregates = get_category_aggregates()
+        with aggregates.lock:
+            for i in range(1, lookback_months + 1):
+                past_year, past_month = divmod(current_year * 12 + current_month - 1 - i, 12)
+                past_month += 1
+                
+                month_key = f"{past_year}-{past_month:02d}"
+                months_analyzed.append(month_key)
+                
+                # Spending for that month
+                cents, _ = aggregates.spending(past_year, past_month)
+                month_spending = cents / 100
+                
+                historical_spending[month_key] = month_spending
+                # Income would be roughly the same each month
+                historical_income[month_key] = total_monthly_income
+                # Savings = Income - Expenses - Spending
+                historical_savings[month_key] = total_monthly_income - total_monthly_expenses - month_spending
         
         # Calculate average historical spending
         spending_values = [v for v in historical_spending.values() if v > 0]
@@ -4810,7 +4728,7 @@ def get_smart_recommendations():
                 'ai_version': '2.0'
             }
         })
-        
+    
     except Exception as e:
         print(f"Error in smart recommendations: {e}")
         import traceback
@@ -4843,64 +4761,16 @@ def calculate_tax_estimate():
     - After-tax income
     """
     try:
-        # 2025 Federal Tax Brackets (Tax year 2025, filing in 2026)
-        # Updated for inflation adjustments
-        TAX_BRACKETS = {
-            'single': [
-                (11925, 0.10),    # 10% on income up to $11,925
-                (48475, 0.12),    # 12% on income $11,926 to $48,475
-                (103350, 0.22),   # 22% on income $48,476 to $103,350
-                (197300, 0.24),   # 24% on income $103,351 to $197,300
-                (250525, 0.32),   # 32% on income $197,301 to $250,525
-                (626350, 0.35),   # 35% on income $250,526 to $626,350
-                (float('inf'), 0.37)  # 37% on income over $626,350
-            ],
-            'married-joint': [
-                (23850, 0.10),    # 10% on income up to $23,850
-                (96950, 0.12),    # 12% on income $23,851 to $96,950
-                (206700, 0.22),   # 22% on income $96,951 to $206,700
-                (394600, 0.24),   # 24% on income $206,701 to $394,600
-                (501050, 0.32),   # 32% on income $394,601 to $501,050
-                (751600, 0.35),   # 35% on income $501,051 to $751,600
-                (float('inf'), 0.37)  # 37% on income over $751,600
-            ],
-            'married-separate': [
-                (11925, 0.10),    # 10% on income up to $11,925
-                (48475, 0.12),    # 12% on income $11,926 to $48,475
-                (103350, 0.22),   # 22% on income $48,476 to $103,350
-                (197300, 0.24),   # 24% on income $103,351 to $197,300
-                (250525, 0.32),   # 32% on income $197,301 to $250,525
-                (375800, 0.35),   # 35% on income $250,526 to $375,800
-                (float('inf'), 0.37)  # 37% on income over $375,800
-            ],
-            'head-of-household': [
-                (17000, 0.10),    # 10% on income up to $17,000
-                (64850, 0.12),    # 12% on income $17,001 to $64,850
-                (103350, 0.22),   # 22% on income $64,851 to $103,350
-                (197300, 0.24),   # 24% on income $103,351 to $197,300
-                (250500, 0.32),   # 32% on income $197,301 to $250,500
-                (626350, 0.35),   # 35% on income $250,501 to $626,350
-                (float('inf'), 0.37)  # 37% on income over $626,350
-            ]
-        }
-        
-        # Standard deductions for 2025
-        STANDARD_DEDUCTIONS = {
-            'single': 15000,
-            'married-joint': 30000,
-            'married-separate': 15000,
-            'head-of-household': 22500
-        }
-        
         # Get query parameters
         filing_status = request.args.get('filing_status', 'married-joint')
         use_actual_income = request.args.get('use_actual', 'false').lower() == 'true'
         
         # Validate filing status
-        if filing_status not in TAX_BRACKETS:
+        tax_table = taxes.table(filing_status)
+        if tax_table is None:
             return jsonify({
                 'success': False,
-                'error': f'Invalid filing status. Must be one of: {", ".join(TAX_BRACKETS.keys())}'
+                'error': f'Invalid filing status. Must be one of: {", ".join(taxes.FILING_STATUSES)}'
             }), 400
         
         # Calculate total annual gross income from all sources
@@ -4936,39 +4806,12 @@ def calculate_tax_estimate():
                 'annual_amount': round(annual_amount, 2)
             })
         
-        # Calculate taxable income (subtract standard deduction)
-        standard_deduction = STANDARD_DEDUCTIONS[filing_status]
-        taxable_income = max(0, total_annual_income - standard_deduction)
-        
-        # Calculate tax liability using progressive brackets
-        brackets = TAX_BRACKETS[filing_status]
-        total_tax = 0
-        tax_by_bracket = []
-        previous_limit = 0
-        marginal_rate = 0
-        
-        for bracket_limit, rate in brackets:
-            if taxable_income <= previous_limit:
-                break
-            
-            # Calculate income in this bracket
-            income_in_bracket = min(taxable_income, bracket_limit) - previous_limit
-            
-            if income_in_bracket > 0:
-                tax_in_bracket = income_in_bracket * rate
-                total_tax += tax_in_bracket
-                marginal_rate = rate  # Last applied rate is marginal rate
-                
-                tax_by_bracket.append({
-                    'rate': rate,
-                    'rate_percent': round(rate * 100, 1),
-                    'income_in_bracket': round(income_in_bracket, 2),
-                    'tax_amount': round(tax_in_bracket, 2),
-                    'bracket_min': round(previous_limit, 2),
-                    'bracket_max': round(bracket_limit, 2) if bracket_limit != float('inf') else None
-                })
-            
-            previous_limit = bracket_limit
+        # Calculate taxable income (subtract standard deduction) and the tax on it
+        standard_deduction = tax_table.standard_deduction
+        taxable_income = tax_table.taxable(total_annual_income)
+        total_tax = tax_table.tax(taxable_income)
+        marginal_rate = tax_table.marginal_rate(taxable_income)
+        tax_by_bracket = tax_table.by_bracket(taxable_income)
         
         # Calculate effective tax rate
         effective_rate = (total_tax / total_annual_income) if total_annual_income > 0 else 0
@@ -5018,7 +4861,7 @@ def calculate_tax_estimate():
             },
             'note': 'This is an estimate for federal income tax only. State and local taxes, FICA taxes, and other deductions are not included.'
         })
-        
+    
     except Exception as e:
         print(f"Error calculating tax estimate: {e}")
         import traceback
@@ -5028,6 +4871,122 @@ def calculate_tax_estimate():
             'error': str(e)
         }), 500
 
+MAX_TAX_BATCH_INCOMES = 10000
+MAX_TAX_CURVE_POINTS = 2000
+
+def _tax_tables(filing_statuses, year):
+    """TaxTable per filing status, or an error message"""
+    tables = {}
+    for filing_status in filing_statuses:
+        # Unhashable entries (e.g. {} from a JSON body) can't be looked up
+        tax_table = taxes.table(filing_status, year) if isinstance(filing_status, str) else None
+        if tax_table is None:
+            if (year, taxes.FILING_STATUSES[0]) not in taxes.TABLES:
+                return None, f'No tax tables for {year}. Available years: {", ".join(str(y) for y in sorted(taxes.BRACKETS))}'
+            return None, f'Invalid filing status. Must be one of: {", ".join(taxes.FILING_STATUSES)}'
+        tables[filing_status] = tax_table
+    return tables, None
+
+@app.route('/api/income/tax-estimate/batch', methods=['POST'])
+def calculate_tax_estimate_batch():
+    """
+    Federal tax for many annual gross incomes under one or more filing statuses in one call
+    Body: {"incomes": [50000, 120000, ...], "filing_statuses": ["single", ...], "year": 2025}
+    (filing_statuses defaults to every status, year to the latest table).
+    Returns results[filing_status] in the order of incomes.
+    """
+    import math
+    
+    data = request.get_json(silent=True) or {}
+    incomes = data.get('incomes')
+    filing_statuses = data.get('filing_statuses') or list(taxes.FILING_STATUSES)
+    year = data.get('year', taxes.DEFAULT_YEAR)
+    
+    if not isinstance(incomes, list) or not incomes:
+        return jsonify({'success': False, 'error': 'incomes must be a non-empty list of annual gross incomes'}), 400
+    if len(incomes) > MAX_TAX_BATCH_INCOMES:
+        return jsonify({'success': False, 'error': f'At most {MAX_TAX_BATCH_INCOMES} incomes per batch'}), 400
+    # The JSON parser accepts NaN and Infinity, which would come back out as NaN
+    if any(isinstance(income, bool) or not isinstance(income, (int, float)) or not math.isfinite(income) or income < 0
+           for income in incomes):
+        return jsonify({'success': False, 'error': 'incomes must be finite numbers of 0 or more'}), 400
+    if not isinstance(filing_statuses, list) or not isinstance(year, int):
+        return jsonify({'success': False, 'error': 'filing_statuses must be a list and year a whole number'}), 400
+    tables, error = _tax_tables(filing_statuses, year)
+    if error:
+        return jsonify({'success': False, 'error': error}), 400
+    
+    try:
+        return jsonify({
+            'success': True,
+            'year': year,
+            'count': len(incomes),
+            'results': {
+                filing_status: [tax_table.estimate(income) for income in incomes]
+                for filing_status, tax_table in tables.items()
+            }
+        })
+    
+    except Exception as e:
+        print(f"Error calculating tax estimate batch: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/income/tax-estimate/curve', methods=['GET'])
+def get_tax_rate_curve():
+    """
+    Effective and marginal federal tax rates over a range of annual gross incomes, for charting
+    Query parameters (all optional):
+    - filing_status: one or more, comma separated (default married-joint)
+    - min / max: income range (default 0 / 500000)
+    - points: evenly spaced incomes across the range (default 101)
+    - year: tax year (default the latest table)
+    """
+    import math
+    
+    try:
+        filing_statuses = request.args.get('filing_status', 'married-joint').split(',')
+        low = float(request.args.get('min', 0))
+        high = float(request.args.get('max', 500000))
+        points = int(request.args.get('points', 101))
+        year = int(request.args.get('year', taxes.DEFAULT_YEAR))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'min and max must be numbers; points and year whole numbers'}), 400
+    
+    if not 0 <= low < high or not math.isfinite(high):
+        return jsonify({'success': False, 'error': 'max must be a finite number greater than min (and min 0 or more)'}), 400
+    if not 2 <= points <= MAX_TAX_CURVE_POINTS:
+        return jsonify({'success': False, 'error': f'points must be from 2 to {MAX_TAX_CURVE_POINTS}'}), 400
+    tables, error = _tax_tables(filing_statuses, year)
+    if error:
+        return jsonify({'success': False, 'error': error}), 400
+    
+    try:
+        return jsonify({
+            'success': True,
+            'year': year,
+            'min': low,
+            'max': high,
+            'points': points,
+            'curves': {
+                filing_status: taxes.rate_curve(tax_table, low, high, points)
+                for filing_status, tax_table in tables.items()
+            }
+        })
+    
+    except Exception as e:
+        print(f"Error calculating tax rate curve: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 def _calculate_annual_income(amount, frequency):
     """Helper function to convert any income frequency to annual amount"""
     multipliers = {
@@ -5042,42 +5001,40 @@ def _calculate_annual_income(amount, frequency):
 # RETIREMENT ACCOUNTS ENDPOINTS
 # ============================================================================
 
+def _requested_year():
+    """?year= as an int (default the current year), or None if it isn't a year"""
+    try:
+        return int(request.args.get('year', datetime.now().year))
+    except ValueError:
+        return None
+
 @app.route('/api/retirement-accounts', methods=['GET'])
 def get_retirement_accounts():
-    """Get all retirement accounts"""
+    """
+    Get all retirement accounts, each with its contributions for a year
+    (?year=, default the current year) and the annual limit left
+    """
+    year = _requested_year()
+    if year is None:
+        return jsonify({'success': False, 'error': 'year must be a whole number'}), 400
+    
     try:
-        accounts = budget_data.get('retirement_accounts', [])
-        print(f"DEBUG: Found {len(accounts)} retirement accounts")
-        print(f"DEBUG: Accounts data: {accounts}")
-        
-        # Calculate year-to-date totals for each account
-        current_year = datetime.now().year
-        for account in accounts:
-            ytd_total = 0
-            ytd_employee = 0
-            ytd_employer = 0
-            
-            contributions = account.get('contributions', [])
-            for contrib in contributions:
-                contrib_date = datetime.fromisoformat(contrib['date'])
-                if contrib_date.year == current_year:
-                    ytd_total += contrib['amount']
-                    if contrib.get('contribution_type') == 'employer_match':
-                        ytd_employer += contrib['amount']
-                    else:
-                        ytd_employee += contrib['amount']
-            
-            account['ytd_total'] = round(ytd_total, 2)
-            account['ytd_employee'] = round(ytd_employee, 2)
-            account['ytd_employer'] = round(ytd_employer, 2)
-            
-            # Calculate remaining limit
+        accounts = []
+        for account in budget_data.get('retirement_accounts', []):
+            totals = contribution_totals.for_year(account, year)
             limit = account.get('annual_limit', 0)
-            account['remaining_limit'] = round(limit - ytd_employee, 2)
-            account['limit_percentage'] = round((ytd_employee / limit * 100) if limit > 0 else 0, 2)
+            accounts.append({
+                **contribution_totals.public(account),
+                'ytd_total': round(totals['total'], 2),
+                'ytd_employee': round(totals['employee'], 2),
+                'ytd_employer': round(totals['employer_match'], 2),
+                'remaining_limit': round(limit - totals['employee'], 2),
+                'limit_percentage': round((totals['employee'] / limit * 100) if limit > 0 else 0, 2)
+            })
         
         return jsonify({
             'success': True,
+            'year': year,
             'accounts': accounts
         })
     except Exception as e:
@@ -5089,6 +5046,11 @@ def get_retirement_accounts():
             'error': str(e)
         }), 500
 
+def _find_retirement_account(account_id):
+    """Retirement account by id, or None"""
+    accounts = budget_data.get('retirement_accounts')
+    return accounts.by_id(account_id) if accounts else None
+
 @app.route('/api/retirement-accounts', methods=['POST'])
 def add_retirement_account():
     """Add a new retirement account"""
@@ -5097,11 +5059,10 @@ def add_retirement_account():
         
         # Ensure retirement_accounts exists
         if 'retirement_accounts' not in budget_data:
-            budget_data['retirement_accounts'] = []
+            budget_data['retirement_accounts'] = registry.collection(None, [])[0]
         
         # Generate new ID
-        existing_ids = [acc['id'] for acc in budget_data['retirement_accounts']]
-        new_id = max(existing_ids) + 1 if existing_ids else 1
+        new_id = registry.next_id()
         
         # Validate required fields
         required_fields = ['account_name', 'account_type', 'contribution_type']
@@ -5136,16 +5097,17 @@ def add_retirement_account():
             'linked_income_id': account_data.get('linked_income_id'),
             'contribution_per_paycheck': account_data.get('contribution_per_paycheck', 0),
             'notes': account_data.get('notes', ''),
-            'contributions': [],
+            'contributions': registry.children('retirement_accounts'),
+            contribution_totals.TOTALS_KEY: contribution_totals.build([]),
             'created_at': datetime.now().isoformat()
         }
         
         budget_data['retirement_accounts'].append(new_account)
-        save_data()
+        persist(inserted('retirement_accounts', new_account))
         
         return jsonify({
             'success': True,
-            'account': new_account
+            'account': contribution_totals.public(new_account)
         })
     except Exception as e:
         print(f"Error adding retirement account: {e}")
@@ -5162,17 +5124,15 @@ def update_retirement_account(account_id):
     try:
         account_data = request.json
         
-        accounts = budget_data.get('retirement_accounts', [])
-        account_index = next((i for i, acc in enumerate(accounts) if acc['id'] == account_id), None)
+        account = _find_retirement_account(account_id)
         
-        if account_index is None:
+        if account is None:
             return jsonify({
                 'success': False,
                 'error': 'Account not found'
             }), 404
         
         # Update account fields
-        account = accounts[account_index]
         updatable_fields = [
             'account_name', 'account_type', 'contribution_type', 'annual_limit',
             'current_balance', 'employer_match_percent', 'employer_match_limit',
@@ -5184,11 +5144,11 @@ def update_retirement_account(account_id):
                 account[field] = account_data[field]
         
         account['updated_at'] = datetime.now().isoformat()
-        save_data()
+        persist(updated('retirement_accounts', account))
         
         return jsonify({
             'success': True,
-            'account': account
+            'account': contribution_totals.public(account)
         })
     except Exception as e:
         print(f"Error updating retirement account: {e}")
@@ -5203,22 +5163,18 @@ def update_retirement_account(account_id):
 def delete_retirement_account(account_id):
     """Delete a retirement account"""
     try:
-        accounts = budget_data.get('retirement_accounts', [])
-        
-        account_index = next((i for i, acc in enumerate(accounts) if acc['id'] == account_id), None)
-        
-        if account_index is None:
+        if _find_retirement_account(account_id) is None:
             return jsonify({
                 'success': False,
                 'error': 'Account not found'
             }), 404
         
-        deleted_account = accounts.pop(account_index)
-        save_data()
+        deleted_account = budget_data['retirement_accounts'].remove_id(account_id)
+        persist(deleted('retirement_accounts', account_id))
         
         return jsonify({
             'success': True,
-            'deleted_account': deleted_account
+            'deleted_account': contribution_totals.public(deleted_account)
         })
     except Exception as e:
         print(f"Error deleting retirement account: {e}")
@@ -5235,17 +5191,14 @@ def add_contribution(account_id):
     try:
         contribution_data = request.json
         
-        accounts = budget_data.get('retirement_accounts', [])
-        account_index = next((i for i, acc in enumerate(accounts) if acc['id'] == account_id), None)
+        account = _find_retirement_account(account_id)
         
-        if account_index is None:
+        if account is None:
             return jsonify({
                 'success': False,
                 'error': 'Account not found'
             }), 404
         
-        account = accounts[account_index]
-        
         # Validate required fields
         if 'amount' not in contribution_data or 'date' not in contribution_data:
             return jsonify({
@@ -5254,34 +5207,34 @@ def add_contribution(account_id):
             }), 400
         
         # Generate contribution ID
-        existing_contrib_ids = [c.get('id', 0) for c in account.get('contributions', [])]
-        new_contrib_id = max(existing_contrib_ids) + 1 if existing_contrib_ids else 1
+        new_contrib_id = registry.next_id()
         
         # Create contribution
-        new_contribution = {
+        new_contribution = RetirementContribution({
             'id': new_contrib_id,
             'date': contribution_data['date'],
             'amount': contribution_data['amount'],
             'contribution_type': contribution_data.get('contribution_type', 'employee'),
             'note': contribution_data.get('note', ''),
             'created_at': datetime.now().isoformat()
-        }
+        })
         
         # Initialize contributions list if it doesn't exist
         if 'contributions' not in account:
-            account['contributions'] = []
+            account['contributions'] = registry.children('retirement_accounts')
         
         account['contributions'].append(new_contribution)
+        contribution_totals.contribution_added(account, new_contribution)
         
         # Update current balance
         account['current_balance'] = account.get('current_balance', 0) + contribution_data['amount']
         
-        save_data()
+        persist(inserted('contributions', new_contribution, account_id), updated('retirement_accounts', account))
         
         return jsonify({
             'success': True,
             'contribution': new_contribution,
-            'account': account
+            'account': contribution_totals.public(account)
         })
     except Exception as e:
         print(f"Error adding contribution: {e}")
@@ -5296,33 +5249,28 @@ def add_contribution(account_id):
 def delete_contribution(account_id, contribution_id):
     """Delete a contribution from a retirement account"""
     try:
-        accounts = budget_data.get('retirement_accounts', [])
+        account = _find_retirement_account(account_id)
         
-        account_index = next((i for i, acc in enumerate(accounts) if acc['id'] == account_id), None)
-        
-        if account_index is None:
+        if account is None:
             return jsonify({
                 'success': False,
                 'error': 'Account not found'
             }), 404
         
-        account = accounts[account_index]
-        contributions = account.get('contributions', [])
-        
-        contrib_index = next((i for i, c in enumerate(contributions) if c['id'] == contribution_id), None)
+        contributions = account.get('contributions')
+        deleted_contribution = contributions.remove_id(contribution_id) if contributions else None
         
-        if contrib_index is None:
+        if deleted_contribution is None:
             return jsonify({
                 'success': False,
                 'error': 'Contribution not found'
             }), 404
-        
-        deleted_contribution = contributions.pop(contrib_index)
+        contribution_totals.contribution_removed(account, deleted_contribution)
         
         # Update current balance
         account['current_balance'] = account.get('current_balance', 0) - deleted_contribution['amount']
         
-        save_data()
+        persist(deleted('contributions', contribution_id, account_id), updated('retirement_accounts', account))
         
         return jsonify({
             'success': True,
@@ -5339,28 +5287,36 @@ def delete_contribution(account_id, contribution_id):
 
 @app.route('/api/retirement-accounts/summary', methods=['GET'])
 def get_retirement_summary():
-    """Get summary of all retirement accounts and contributions"""
+    """
+    Get summary of all retirement accounts and contributions
+    Contribution totals are for ?year= (default the current year); `by_year`
+    has the household's totals for every year with contributions.
+    """
+    year = _requested_year()
+    if year is None:
+        return jsonify({'success': False, 'error': 'year must be a whole number'}), 400
+    
     try:
         accounts = budget_data.get('retirement_accounts', [])
-        current_year = datetime.now().year
         
         total_balance = 0
         total_ytd_contributions = 0
         total_ytd_employee = 0
         total_ytd_employer = 0
+        by_year = {}
         
         for account in accounts:
             total_balance += account.get('current_balance', 0)
             
-            contributions = account.get('contributions', [])
-            for contrib in contributions:
-                contrib_date = datetime.fromisoformat(contrib['date'])
-                if contrib_date.year == current_year:
-                    total_ytd_contributions += contrib['amount']
-                    if contrib.get('contribution_type') == 'employer_match':
-                        total_ytd_employer += contrib['amount']
-                    else:
-                        total_ytd_employee += contrib['amount']
+            totals = contribution_totals.for_year(account, year)
+            total_ytd_contributions += totals['total']
+            total_ytd_employee += totals['employee']
+            total_ytd_employer += totals['employer_match']
+            
+            for history_year, bucket in contribution_totals.years(account):
+                year_total = by_year.setdefault(history_year, {'employee': 0, 'employer_match': 0, 'total': 0})
+                for kind in ('employee', 'employer_match', 'total'):
+                    year_total[kind] += bucket[kind]
         
         return jsonify({
             'success': True,
@@ -5370,7 +5326,11 @@ def get_retirement_summary():
                 'ytd_contributions': round(total_ytd_contributions, 2),
                 'ytd_employee_contributions': round(total_ytd_employee, 2),
                 'ytd_employer_contributions': round(total_ytd_employer, 2),
-                'current_year': current_year
+                'current_year': year,
+                'by_year': [
+                    {'year': history_year, **{kind: round(value, 2) for kind, value in year_total.items()}}
+                    for history_year, year_total in sorted(by_year.items())
+                ]
             }
         })
     except Exception as e:
@@ -5382,6 +5342,64 @@ def get_retirement_summary():
             'error': str(e)
         }), 500
 
+MAX_PROJECTION_SCENARIOS = 50000
+
+@app.route('/api/retirement/projection', methods=['GET'])
+def get_retirement_projection():
+    """
+    Project every retirement account to retirement age
+    Query parameters (all optional):
+    - current_age / retirement_age: default 35 / 65
+    - mean_return / volatility: annual, as fractions (default 0.07 / 0.15)
+    - scenarios: Monte Carlo return scenarios (default 10000, 0 for the deterministic projection only)
+    - seed: random seed for the scenarios (default 0, so repeated calls agree)
+    Results are cached until an account, its linked income or a parameter changes.
+    """
+    try:
+        current_age = int(request.args.get('current_age', 35))
+        retirement_age = int(request.args.get('retirement_age', 65))
+        mean_return = float(request.args.get('mean_return', 0.07))
+        volatility = float(request.args.get('volatility', 0.15))
+        scenarios = int(request.args.get('scenarios', 10000))
+        seed = int(request.args.get('seed', 0))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Ages, scenarios and seed must be whole numbers; mean_return and volatility numbers'}), 400
+    
+    if not 0 <= current_age < retirement_age <= 100:
+        return jsonify({'success': False, 'error': 'retirement_age must be after current_age (ages 0-100)'}), 400
+    if not -0.5 <= mean_return <= 0.5 or not 0 <= volatility <= 1:
+        return jsonify({'success': False, 'error': 'mean_return must be from -0.5 to 0.5 and volatility from 0 to 1'}), 400
+    if not 0 <= scenarios <= MAX_PROJECTION_SCENARIOS:
+        return jsonify({'success': False, 'error': f'scenarios must be from 0 to {MAX_PROJECTION_SCENARIOS}'}), 400
+    
+    try:
+        accounts = budget_data.get('retirement_accounts', [])
+        inputs = tuple(retirement.account_inputs(account, budget_data.get('income_sources')) for account in accounts)
+        years = retirement_age - current_age
+        projection = retirement.project(inputs, datetime.now().year, current_age, years,
+                                        mean_return, volatility, scenarios, seed)
+        return jsonify({
+            'success': True,
+            'current_age': current_age,
+            'retirement_age': retirement_age,
+            'years': years,
+            'assumptions': {
+                'mean_return': mean_return,
+                'volatility': volatility,
+                'scenarios': scenarios,
+                'seed': seed
+            },
+            **projection
+        })
+    except Exception as e:
+        print(f"Error projecting retirement balances: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/dashboard/projected-balance', methods=['GET'])
 def get_projected_balance():
     """
@@ -5393,220 +5411,8 @@ def get_projected_balance():
     
     Returns comprehensive projection with health indicators
     """
-    from datetime import datetime, timedelta
-    from calendar import monthrange
-    
     try:
-        now = datetime.now()
-        current_year = now.year
-        current_month = now.month
-        current_day = now.day
-        days_in_month = monthrange(current_year, current_month)[1]
-        days_elapsed = current_day
-        days_remaining = days_in_month - current_day
-        
-        # ==== 1. Calculate Current Liquid Balance ====
-        checking_balance = 0
-        savings_balance = 0
-        liquid_balance = 0
-        
-        for account in budget_data['accounts']:
-            account_type = account.get('type', '').lower()
-            balance = float(account.get('balance', 0))
-            
-            if account_type == 'checking':
-                checking_balance += balance
-                liquid_balance += balance
-            elif account_type == 'savings':
-                savings_balance += balance
-                liquid_balance += balance
-        
-        starting_balance = liquid_balance
-        
-        # ==== 2. Calculate Expected Income (Rest of Month) ====
-        expected_income = 0
-        upcoming_paychecks = []
-        
-        for income in budget_data['income_sources']:
-            next_pay_date_str = income.get('next_pay_date')
-            if not next_pay_date_str:
-                continue
-            
-            try:
-                next_pay_date = datetime.fromisoformat(next_pay_date_str.replace('Z', '+00:00')).replace(tzinfo=None)
-                
-                # Check if paycheck is later this month
-                if next_pay_date.year == current_year and next_pay_date.month == current_month and next_pay_date.day > current_day:
-                    amount = float(income.get('amount', 0))
-                    expected_income += amount
-                    upcoming_paychecks.append({
-                        'name': income.get('earner_name', 'Income'),
-                        'amount': amount,
-                        'date': next_pay_date.strftime('%b %d'),
-                        'days_away': (next_pay_date - now).days
-                    })
-            except (ValueError, TypeError) as e:
-                print(f"Error parsing pay date for {income.get('name', 'Unknown')}: {e}")
-                continue
-        
-        # ==== 3. Calculate Remaining Fixed Expenses ====
-        remaining_expenses = 0
-        unpaid_bills = []
-        
-        for expense in budget_data['fixed_expenses']:
-            due_day = expense.get('due_day')
-            is_paid = expense.get('is_paid', False)
-            
-            if due_day and not is_paid:
-                try:
-                    due_day = int(due_day)
-                    amount = float(expense.get('amount', 0))
-                    
-                    # Check if bill is due later this month
-                    if due_day > current_day:
-                        remaining_expenses += amount
-                        unpaid_bills.append({
-                            'name': expense.get('name', 'Bill'),
-                            'amount': amount,
-                            'due_day': due_day,
-                            'days_away': due_day - current_day
-                        })
-                except (ValueError, TypeError):
-                    continue
-        
-        # ==== 4. Calculate Current Spending Velocity ====
-        mtd_spending = 0
-        spending_by_day = {}
-        
-        for transaction in budget_data['transactions']:
-            try:
-                trans_date = datetime.fromisoformat(transaction['date'])
-                if trans_date.year == current_year and trans_date.month == current_month:
-                    amount = float(transaction.get('amount', 0))
-                    if amount > 0:  # Only count expenses
-                        mtd_spending += amount
-                        day_key = trans_date.day
-                        spending_by_day[day_key] = spending_by_day.get(day_key, 0) + amount
-            except (ValueError, KeyError):
-                continue
-        
-        # Calculate daily average and project remaining spending
-        daily_average = mtd_spending / days_elapsed if days_elapsed > 0 else 0
-        projected_remaining_spending = daily_average * days_remaining
-        
-        # ==== 5. Calculate Projection ====
-        projected_balance = starting_balance + expected_income - remaining_expenses - projected_remaining_spending
-        
-        # Calculate change from current
-        balance_change = projected_balance - starting_balance
-        
-        # ==== 6. Determine Health Status ====
-        # Calculate some thresholds for health assessment
-        monthly_income = sum(float(i.get('amount', 0)) for i in budget_data['income_sources'])
-        monthly_expenses = sum(float(e.get('amount', 0)) for e in budget_data['fixed_expenses'])
-        buffer_threshold = monthly_expenses * 0.25  # 25% of monthly expenses
-        
-        if projected_balance < 0:
-            status = 'critical'
-            status_text = 'Overdraft Risk'
-            status_icon = '🚨'
-            status_color = '#ef4444'
-        elif projected_balance < buffer_threshold:
-            status = 'warning'
-            status_text = 'Low Balance'
-            status_icon = '⚠️'
-            status_color = '#f59e0b'
-        elif projected_balance < buffer_threshold * 2:
-            status = 'caution'
-            status_text = 'Tight Budget'
-            status_icon = '⚡'
-            status_color = '#eab308'
-        else:
-            status = 'healthy'
-            status_text = 'On Track'
-            status_icon = '✅'
-            status_color = '#22c55e'
-        
-        # ==== 7. Generate Insights & Recommendations ====
-        insights = []
-        recommendations = []
-        
-        # Insight: Spending velocity
-        if days_elapsed > 0:
-            percent_of_month = (days_elapsed / days_in_month) * 100
-            percent_of_budget_spent = (mtd_spending / (monthly_income - monthly_expenses)) * 100 if (monthly_income - monthly_expenses) > 0 else 0
-            
-            if percent_of_budget_spent > percent_of_month + 10:
-                insights.append(f"You're spending faster than the month is progressing ({percent_of_budget_spent:.0f}% spent vs {percent_of_month:.0f}% of month elapsed)")
-                recommendations.append("Consider reducing discretionary spending to stay on track")
-            elif percent_of_budget_spent < percent_of_month - 10:
-                insights.append(f"Great job! You're spending slower than expected ({percent_of_budget_spent:.0f}% spent vs {percent_of_month:.0f}% of month elapsed)")
-        
-        # Insight: Upcoming bills
-        if len(unpaid_bills) > 0:
-            total_unpaid = sum(b['amount'] for b in unpaid_bills)
-            insights.append(f"You have {len(unpaid_bills)} unpaid bill{' ' if len(unpaid_bills) == 1 else 's'} remaining (${total_unpaid:.2f})")
-        
-        # Insight: Expected income
-        if expected_income > 0:
-            insights.append(f"Expecting ${expected_income:.2f} in income before month end")
-        else:
-            insights.append("No more expected income this month")
-            if projected_balance < 0:
-                recommendations.append("Consider a spending freeze until next paycheck")
-        
-        # Recommendation: Low balance warning
-        if status in ['critical', 'warning']:
-            if remaining_expenses > 0:
-                recommendations.append(f"You have ${remaining_expenses:.2f} in upcoming bills - ensure funds are available")
-            recommendations.append("Review non-essential spending and consider cutting back")
-            
-            if savings_balance > 0 and projected_balance < 0:
-                transfer_needed = abs(projected_balance) + buffer_threshold
-                if transfer_needed <= savings_balance:
-                    recommendations.append(f"Consider transferring ${transfer_needed:.2f} from savings to checking as a buffer")
-        
-        # Recommendation: Positive projection
-        if status == 'healthy' and balance_change > buffer_threshold:
-            surplus = balance_change - buffer_threshold
-            recommendations.append(f"You're on track to have ${surplus:.2f} extra - consider saving or allocating to goals")
-        
-        # ==== 8. Build Breakdown Details ====
-        breakdown = {
-            'starting_balance': round(starting_balance, 2),
-            'checking_balance': round(checking_balance, 2),
-            'savings_balance': round(savings_balance, 2),
-            'expected_income': round(expected_income, 2),
-            'upcoming_paychecks': upcoming_paychecks,
-            'remaining_expenses': round(remaining_expenses, 2),
-            'unpaid_bills': unpaid_bills,
-            'mtd_spending': round(mtd_spending, 2),
-            'daily_average': round(daily_average, 2),
-            'projected_remaining_spending': round(projected_remaining_spending, 2),
-            'days_remaining': days_remaining,
-            'days_elapsed': days_elapsed
-        }
-        
-        # ==== 9. Return Complete Response ====
-        return jsonify({
-            'success': True,
-            'projected_balance': round(projected_balance, 2),
-            'starting_balance': round(starting_balance, 2),
-            'balance_change': round(balance_change, 2),
-            'status': status,
-            'status_text': status_text,
-            'status_icon': status_icon,
-            'status_color': status_color,
-            'insights': insights,
-            'recommendations': recommendations,
-            'breakdown': breakdown,
-            'month_name': now.strftime('%B'),
-            'current_day': current_day,
-            'days_in_month': days_in_month,
-            'days_remaining': days_remaining,
-            'has_data': True
-        })
-        
+        return jsonify(_projected_balance(dashboard_context()))
     except Exception as e:
         print(f"Error calculating projected balance: {e}")
         import traceback
@@ -5617,6 +5423,286 @@ def get_projected_balance():
             'has_data': False
         }), 500
 
+def _projected_balance(ctx):
+    """Projected end-of-month balance card, built from a FinancialContext"""
+    from datetime import timedelta
+    
+    now = ctx.now
+    current_year = ctx.year
+    current_month = ctx.month
+    current_day = ctx.day
+    days_in_month = ctx.days_in_month
+    days_elapsed = current_day
+    days_remaining = days_in_month - current_day
+    
+    # ==== 1. Calculate Current Liquid Balance ====
+    balances = ctx.balances
+    checking_balance = balances['checking']
+    savings_balance = balances['savings']
+    liquid_balance = balances['liquid']
+    
+    starting_balance = liquid_balance
+    
+    # ==== 2. Calculate Expected Income (Rest of Month) ====
+    expected_income = 0
+    upcoming_paychecks = []
+    
+    # Every pay date after today and before the 1st of next month
+    tomorrow = datetime(current_year, current_month, current_day) + timedelta(days=1)
+    month_end = datetime(current_year + current_month // 12, current_month % 12 + 1, 1)
+    
+    for income in ctx.data['income_sources']:
+        schedule = PaySchedule.for_income(income)
+        if schedule is None:
+            continue
+        
+        amount = float(income.get('amount', 0))
+        for next_pay_date in schedule.between(tomorrow, month_end):
+            expected_income += amount
+            upcoming_paychecks.append({
+                'name': income.get('earner_name', 'Income'),
+                'amount': amount,
+                'date': next_pay_date.strftime('%b %d'),
+                'days_away': (next_pay_date - now).days
+            })
+    upcoming_paychecks.sort(key=lambda paycheck: paycheck['days_away'])
+    
+    # ==== 3. Calculate Remaining Fixed Expenses ====
+    remaining_expenses = 0
+    unpaid_bills = []
+    
+    # Unpaid bills falling due later this month
+    for occurrence in ctx.bills().between(tomorrow.date(), month_end.date()):
+        due, expense = occurrence
+        if occurrence.is_paid(now.date()):
+            continue
+        amount = expense.value
+        remaining_expenses += amount
+        unpaid_bills.append({
+            'name': expense.get('name', 'Bill'),
+            'amount': amount,
+            'due_day': due.day,
+            'days_away': due.day - current_day
+        })
+    
+    # ==== 4. Calculate Current Spending Velocity ====
+    mtd_spending = ctx.mtd.spent  # Only expenses
+    
+    # Calculate daily average and project remaining spending
+    daily_average = mtd_spending / days_elapsed if days_elapsed > 0 else 0
+    projected_remaining_spending = daily_average * days_remaining
+    
+    # ==== 5. Calculate Projection ====
+    projected_balance = starting_balance + expected_income - remaining_expenses - projected_remaining_spending
+    
+    # Calculate change from current
+    balance_change = projected_balance - starting_balance
+    
+    # ==== 6. Determine Health Status ====
+    # Calculate some thresholds for health assessment
+    monthly_income = sum(float(i.get('amount', 0)) for i in ctx.data['income_sources'])
+    monthly_expenses = ctx.total_expenses
+    buffer_threshold = monthly_expenses * 0.25  # 25% of monthly expenses
+    
+    if projected_balance < 0:
+        status = 'critical'
+        status_text = 'Overdraft Risk'
+        status_icon = '🚨'
+        status_color = '#ef4444'
+    elif projected_balance < buffer_threshold:
+        status = 'warning'
+        status_text = 'Low Balance'
+        status_icon = '⚠️'
+        status_color = '#f59e0b'
+    elif projected_balance < buffer_threshold * 2:
+        status = 'caution'
+        status_text = 'Tight Budget'
+        status_icon = '⚡'
+        status_color = '#eab308'
+    else:
+        status = 'healthy'
+        status_text = 'On Track'
+        status_icon = '✅'
+        status_color = '#22c55e'
+    
+    # ==== 7. Generate Insights & Recommendations ====
+    insights = []
+    recommendations = []
+    
+    # Insight: Spending velocity
+    if days_elapsed > 0:
+        percent_of_month = (days_elapsed / days_in_month) * 100
+        percent_of_budget_spent = (mtd_spending / (monthly_income - monthly_expenses)) * 100 if (monthly_income - monthly_expenses) > 0 else 0
+        
+        if percent_of_budget_spent > percent_of_month + 10:
+            insights.append(f"You're spending faster than the month is progressing ({percent_of_budget_spent:.0f}% spent vs {percent_of_month:.0f}% of month elapsed)")
+            recommendations.append("Consider reducing discretionary spending to stay on track")
+        elif percent_of_budget_spent < percent_of_month - 10:
+            insights.append(f"Great job! You're spending slower than expected ({percent_of_budget_spent:.0f}% spent vs {percent_of_month:.0f}% of month elapsed)")
+    
+    # Insight: Upcoming bills
+    if len(unpaid_bills) > 0:
+        total_unpaid = sum(b['amount'] for b in unpaid_bills)
+        insights.append(f"You have {len(unpaid_bills)} unpaid bill{' ' if len(unpaid_bills) == 1 else 's'} remaining (${total_unpaid:.2f})")
+    
+    # Insight: Expected income
+    if expected_income > 0:
+        insights.append(f"Expecting ${expected_income:.2f} in income before month end")
+    else:
+        insights.append("No more expected income this month")
+        if projected_balance < 0:
+            recommendations.append("Consider a spending freeze until next paycheck")
+    
+    # Recommendation: Low balance warning
+    if status in ['critical', 'warning']:
+        if remaining_expenses > 0:
+            recommendations.append(f"You have ${remaining_expenses:.2f} in upcoming bills - ensure funds are available")
+        recommendations.append("Review non-essential spending and consider cutting back")
+        
+        if savings_balance > 0 and projected_balance < 0:
+            transfer_needed = abs(projected_balance) + buffer_threshold
+            if transfer_needed <= savings_balance:
+                recommendations.append(f"Consider transferring ${transfer_needed:.2f} from savings to checking as a buffer")
+    
+    # Recommendation: Positive projection
+    if status == 'healthy' and balance_change > buffer_threshold:
+        surplus = balance_change - buffer_threshold
+        recommendations.append(f"You're on track to have ${surplus:.2f} extra - consider saving or allocating to goals")
+    
+    # ==== 8. Build Breakdown Details ====
+    breakdown = {
+        'starting_balance': round(starting_balance, 2),
+        'checking_balance': round(checking_balance, 2),
+        'savings_balance': round(savings_balance, 2),
+        'expected_income': round(expected_income, 2),
+        'upcoming_paychecks': upcoming_paychecks,
+        'remaining_expenses': round(remaining_expenses, 2),
+        'unpaid_bills': unpaid_bills,
+        'mtd_spending': round(mtd_spending, 2),
+        'daily_average': round(daily_average, 2),
+        'projected_remaining_spending': round(projected_remaining_spending, 2),
+        'days_remaining': days_remaining,
+        'days_elapsed': days_elapsed
+    }
+    
+    # ==== 9. Return Complete Response ====
+    return {
+        'success': True,
+        'projected_balance': round(projected_balance, 2),
+        'starting_balance': round(starting_balance, 2),
+        'balance_change': round(balance_change, 2),
+        'status': status,
+        'status_text': status_text,
+        'status_icon': status_icon,
+        'status_color': status_color,
+        'insights': insights,
+        'recommendations': recommendations,
+        'breakdown': breakdown,
+        'month_name': now.strftime('%B'),
+        'current_day': current_day,
+        'days_in_month': days_in_month,
+        'days_remaining': days_remaining,
+        'has_data': True
+    }
+
+@app.route('/api/dashboard/snapshot', methods=['GET'])
+def get_dashboard_snapshot():
+    """
+    Every dashboard overview card in one response. All cards share one
+    FinancialContext, so this month's transactions are scanned once per
+    dashboard load instead of once per card.
+    """
+    try:
+        ctx = dashboard_context()
+        return jsonify({
+            'accounts': ctx.data['accounts'],
+            'summary': _accounts_summary(ctx),
+            'availableSpending': _available_spending(ctx),
+            'mtdSpending': _mtd_spending(ctx),
+            'nextPaycheck': _next_paycheck(ctx),
+            'healthScore': _budget_health_score(ctx),
+            'totalIncome': _total_income(ctx),
+            'totalExpenses': _total_expenses(ctx),
+            'moneyPerDay': _money_per_day(ctx),
+            'overdraft': _overdraft_status(ctx),
+            'monthComparison': _month_comparison(ctx),
+            'projectedBalance': _projected_balance(ctx)
+        })
+    except Exception as e:
+        print(f"Error building dashboard snapshot: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# Forecast endpoints
+MAX_FORECAST_DAYS = 730
+
+@app.route('/api/forecast/cashflow', methods=['GET'])
+@memoized
+def get_cashflow_forecast():
+    """
+    Day-by-day projection of the liquid balance over the next ?days=N days
+    (default 90): paychecks, bills, retirement and savings contributions and
+    typical daily spending. Returns the daily points, the lowest projected
+    balance and the first date the balance goes negative, if any.
+    """
+    try:
+        days = int(request.args.get('days', 90))
+        if not 1 <= days <= MAX_FORECAST_DAYS:
+            raise ValueError
+    except ValueError:
+        return jsonify({'success': False, 'error': f'days must be a whole number from 1 to {MAX_FORECAST_DAYS}'}), 400
+    
+    try:
+        return jsonify({'success': True, **forecast.cashflow(dashboard_context(), days)})
+    except Exception as e:
+        print(f"Error forecasting cash flow: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+MAX_RISK_DAYS = 365
+MAX_RISK_PATHS = 20000
+
+@app.route('/api/forecast/overdraft-risk', methods=['GET'])
+def get_overdraft_risk():
+    """
+    Monte Carlo overdraft risk over the next ?days=N days (default 90, up to
+    365): ?paths=N random cash-flow paths (default 2000) with variable income
+    and daily spending drawn from history. Pass ?seed= to reproduce a run.
+    Returns the probability of having gone negative by each date and
+    percentile bands of the balance.
+    """
+    # Only a seeded run gives the same answer twice, so only those are cached
+    if 'seed' in request.args:
+        return _seeded_overdraft_risk()
+    return _overdraft_risk()
+
+def _overdraft_risk():
+    import random
+    
+    try:
+        days = int(request.args.get('days', 90))
+        paths = int(request.args.get('paths', 2000))
+        seed = int(request.args['seed']) if 'seed' in request.args else random.SystemRandom().randrange(2 ** 32)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'days, paths and seed must be whole numbers'}), 400
+    if not 1 <= days <= MAX_RISK_DAYS:
+        return jsonify({'success': False, 'error': f'days must be from 1 to {MAX_RISK_DAYS}'}), 400
+    if not 100 <= paths <= MAX_RISK_PATHS:
+        return jsonify({'success': False, 'error': f'paths must be from 100 to {MAX_RISK_PATHS}'}), 400
+    
+    try:
+        result = risk.overdraft_risk(dashboard_context(), get_transaction_columns(), days, paths, seed)
+        return jsonify({'success': True, **result})
+    except Exception as e:
+        print(f"Error simulating overdraft risk: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+_seeded_overdraft_risk = memoized(_overdraft_risk)
+
 # Update endpoints
 @app.route('/api/updates/check', methods=['GET'])
 def check_updates():
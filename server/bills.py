@@ -0,0 +1,80 @@
+"""
+Recurring bill occurrences
+A fixed expense falls due every month on its day of month (FixedExpense.due,
+which reads due_day or the older due_date). expand() turns the bills into
+dated occurrences over any window, lazily and in date order; due days past
+the end of a shorter month (29-31) fall on that month's last day.
+
+BillCalendar precomputes the occurrences of a fixed horizon once, sorted by
+day, so a window query is two bisects plus the bills inside it. The app keeps
+one calendar per data version and month (see bill_calendar() in app.py).
+"""
+from bisect import bisect_left
+from calendar import monthrange
+from collections import namedtuple
+from datetime import date, timedelta
+
+from models import FixedExpense
+
+
+class Occurrence(namedtuple('Occurrence', ['due', 'expense'])):
+    """One bill falling due on one day"""
+    
+    __slots__ = ()
+    
+    def is_paid(self, today):
+        """A bill's is_paid flag marks this month's payment; later months are still to pay"""
+        return bool(self.expense.get('is_paid', False)) and (self.due.year, self.due.month) == (today.year, today.month)
+
+
+def _month_start(year, month):
+    year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+    return date(year, month, 1)
+
+
+def expand(expenses, start, end=None):
+    """Occurrences with start <= due < end in date order, generated lazily (unbounded if end is None)"""
+    bills = sorted(
+        (expense for expense in map(FixedExpense.from_dict, expenses) if expense.due),
+        key=lambda expense: expense.due
+    )
+    if not bills:
+        return
+    month = start.replace(day=1)
+    while end is None or month < end:
+        last_day = monthrange(month.year, month.month)[1]
+        for expense in bills:
+            due = month.replace(day=min(expense.due, last_day))
+            if due < start:
+                continue
+            if end is not None and due >= end:
+                return
+            yield Occurrence(due, expense)
+        month = _month_start(month.year, month.month + 1)
+
+
+class BillCalendar:
+    """Bill occurrences over [start, start + days), indexed by day"""
+    
+    def __init__(self, expenses, start, days):
+        self.expenses = expenses
+        self.start = start
+        self.end = start + timedelta(days=days)
+        self.occurrences = list(expand(expenses, self.start, self.end))
+        self._ordinals = [occurrence.due.toordinal() for occurrence in self.occurrences]
+    
+    def between(self, start, end):
+        """Occurrences with start <= due < end (expanded on the fly outside the horizon)"""
+        if start < self.start or end > self.end:
+            return list(expand(self.expenses, start, end))
+        low = bisect_left(self._ordinals, start.toordinal())
+        high = bisect_left(self._ordinals, end.toordinal(), low)
+        return self.occurrences[low:high]
+    
+    def upcoming(self, today, days):
+        """Occurrences due from today through `days` days ahead, inclusive"""
+        return self.between(today, today + timedelta(days=days + 1))
+    
+    def on(self, day):
+        """Occurrences due on one day"""
+        return self.between(day, day + timedelta(days=1))
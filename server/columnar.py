@@ -0,0 +1,340 @@
+"""
+Columnar transaction store for analytics
+Keeps every dated transaction as parallel arrays sorted by date:
+    
+    days        array('i')  days since 1970-01-01
+    cents       array('q')  amount in integer cents
+    categories  array('H')  interned category id (0 = no category)
+    merchants   array('H')  interned merchant id (0 = no merchant)
+    ids         array('q')  transaction id (-1 if it isn't an integer)
+
+Month and week windows are found with bisect, so an aggregation over any
+date range is a loop over a slice of small integers instead of a walk over
+transaction records. A NumPy copy of the columns is used for the sums when
+NumPy is installed.
+"""
+import heapq
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from calendar import monthrange
+from datetime import date
+
+import metrics
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def epoch_day(value):
+    """date/datetime -> days since 1970-01-01"""
+    return value.toordinal() - EPOCH_ORDINAL
+
+
+def from_epoch_day(day):
+    return date.fromordinal(day + EPOCH_ORDINAL)
+
+
+def to_cents(amount):
+    return int(round(amount * 100))
+
+
+def month_days(year, month):
+    """First and last epoch day of a month"""
+    first = epoch_day(date(year, month, 1))
+    return first, first + monthrange(year, month)[1] - 1
+
+
+class Interner:
+    """Dictionary encoding for repeated strings; id 0 stands for a missing value"""
+    
+    def __init__(self):
+        self.values = [None]
+        self.ids = {}
+    
+    def id(self, value):
+        if value is None:
+            return 0
+        value_id = self.ids.get(value)
+        if value_id is None:
+            value_id = len(self.values)
+            if value_id > 0xFFFF:
+                raise OverflowError('Too many distinct values for array(\'H\')')
+            self.values.append(value)
+            self.ids[value] = value_id
+        return value_id
+    
+    def value(self, value_id, default=None):
+        value = self.values[value_id]
+        return default if value is None else value
+    
+    def __len__(self):
+        return len(self.values) - 1
+
+
+class TransactionColumns:
+    """
+    Date-sorted columns over budget_data['transactions'].
+    Registered as an observer of PartitionedTransactions: single adds and
+    deletes are applied in place, bulk changes mark the store stale and it is
+    rebuilt on next use. Records without a valid date or amount are left out
+    (the analytics endpoints skip them too).
+    """
+    
+    def __init__(self):
+        self.days = array('i')
+        self.cents = array('q')
+        self.categories = array('H')
+        self.merchants = array('H')
+        self.ids = array('q')
+        self.category_names = Interner()
+        self.merchant_names = Interner()
+        self.stale = True
+        self.rebuilds = 0
+        self.version = 0
+        self._numpy = None
+        self.lock = threading.RLock()
+    
+    # ----- maintenance -----
+    
+    def _row(self, transaction):
+        when = getattr(transaction, 'when', None)
+        value = getattr(transaction, 'value', None)
+        if when is None or value is None:
+            return None
+        transaction_id = transaction.get('id')
+        if not isinstance(transaction_id, int) or isinstance(transaction_id, bool):
+            transaction_id = -1
+        return (
+            epoch_day(when),
+            to_cents(value),
+            self.category_names.id(transaction.get('category')),
+            self.merchant_names.id(transaction.get('merchant')),
+            transaction_id
+        )
+    
+    def rebuild(self, transactions):
+        """Load every transaction (stable sort keeps insertion order within a day)"""
+        with self.lock:
+            self.category_names = Interner()
+            self.merchant_names = Interner()
+            rows = [row for row in map(self._row, transactions) if row is not None]
+            rows.sort(key=lambda row: row[0])
+            self.days = array('i', (row[0] for row in rows))
+            self.cents = array('q', (row[1] for row in rows))
+            self.categories = array('H', (row[2] for row in rows))
+            self.merchants = array('H', (row[3] for row in rows))
+            self.ids = array('q', (row[4] for row in rows))
+            self.stale = False
+            self.rebuilds += 1
+            self.version += 1
+    
+    def ensure(self, transactions):
+        """Rebuild from transactions if a bulk change made the columns stale"""
+        with self.lock:
+            if self.stale:
+                self.rebuild(transactions)
+            return self
+    
+    def added(self, transaction):
+        with self.lock:
+            if self.stale:
+                return
+            row = self._row(transaction)
+            if row is None:
+                return
+            index = bisect_right(self.days, row[0])
+            self.days.insert(index, row[0])
+            self.cents.insert(index, row[1])
+            self.categories.insert(index, row[2])
+            self.merchants.insert(index, row[3])
+            self.ids.insert(index, row[4])
+            self.version += 1
+    
+    def removed(self, transaction):
+        with self.lock:
+            if self.stale:
+                return
+            row = self._row(transaction)
+            if row is None:
+                return
+            lo = bisect_left(self.days, row[0])
+            hi = bisect_right(self.days, row[0])
+            for index in range(lo, hi):
+                if self.ids[index] == row[4] and self.cents[index] == row[1] and self.categories[index] == row[2]:
+                    for column in (self.days, self.cents, self.categories, self.merchants, self.ids):
+                        del column[index]
+                    self.version += 1
+                    return
+            # Not found (shouldn't happen): start over on next use
+            self.stale = True
+    
+    def invalidate(self):
+        with self.lock:
+            self.stale = True
+    
+    # ----- queries -----
+    
+    def __len__(self):
+        return len(self.days)
+    
+    def span(self, first_day, last_day):
+        """Row range [lo, hi) for epoch days first_day..last_day"""
+        return bisect_left(self.days, first_day), bisect_right(self.days, last_day)
+    
+    def month_span(self, year, month):
+        return self.span(*month_days(year, month))
+    
+    def months(self):
+        """(year, month, lo, hi) for every month from the oldest to the newest transaction"""
+        if not self.days:
+            return
+        first = from_epoch_day(self.days[0])
+        last = from_epoch_day(self.days[-1])
+        year, month = first.year, first.month
+        while (year, month) <= (last.year, last.month):
+            lo, hi = self.month_span(year, month)
+            if hi > lo:
+                yield year, month, lo, hi
+            month += 1
+            if month == 13:
+                year, month = year + 1, 1
+    
+    def week_span(self, year, month, week):
+        """Rows in week 1-5 of a month (days 1-7, 8-14, ... like the dashboard uses)"""
+        first, last = month_days(year, month)
+        start = first + (week - 1) * 7
+        return self.span(start, min(start + 6, last))
+    
+    def spending(self, lo, hi):
+        """(total cents, count) of positive amounts in rows lo..hi"""
+        metrics.scanned(hi - lo)
+        view = self.numpy_view()
+        if view is not None:
+            cents = view['cents'][lo:hi]
+            cents = cents[cents > 0]
+            return int(cents.sum()), len(cents)
+        total = 0
+        count = 0
+        for cents in self.cents[lo:hi]:
+            if cents > 0:
+                total += cents
+                count += 1
+        return total, count
+    
+    def spending_by_category(self, lo, hi, default=None):
+        """Category name -> total cents of positive amounts in rows lo..hi, in order of first appearance"""
+        metrics.scanned(hi - lo)
+        view = self.numpy_view()
+        if view is not None:
+            totals = self._numpy_category_totals(view, lo, hi)
+        else:
+            totals = self._category_totals(lo, hi)
+        names = self.category_names
+        result = {}
+        for category, cents in totals.items():
+            name = names.value(category, default)
+            result[name] = result.get(name, 0) + cents
+        return result
+    
+    def _category_totals(self, lo, hi):
+        totals = {}
+        cents_column = self.cents
+        categories = self.categories
+        for index in range(lo, hi):
+            cents = cents_column[index]
+            if cents > 0:
+                category = categories[index]
+                totals[category] = totals.get(category, 0) + cents
+        return totals
+    
+    def _numpy_category_totals(self, view, lo, hi):
+        cents = view['cents'][lo:hi]
+        mask = cents > 0
+        categories = view['categories'][lo:hi][mask]
+        sums = numpy.bincount(categories, weights=cents[mask])
+        present, first_seen = numpy.unique(categories, return_index=True)
+        order = present[numpy.argsort(first_seen)]
+        return {int(category): int(round(sums[category])) for category in order}
+    
+    def daily_spending(self, first_day, last_day):
+        """Cents of positive amounts on each epoch day first_day..last_day (zero for days without any)"""
+        lo, hi = self.span(first_day, last_day)
+        metrics.scanned(hi - lo)
+        view = self.numpy_view()
+        if view is not None:
+            cents = view['cents'][lo:hi]
+            mask = cents > 0
+            totals = numpy.bincount(view['days'][lo:hi][mask] - first_day, weights=cents[mask],
+                                    minlength=last_day - first_day + 1)
+            return [int(round(total)) for total in totals]
+        totals = [0] * (last_day - first_day + 1)
+        days = self.days
+        cents_column = self.cents
+        for index in range(lo, hi):
+            cents = cents_column[index]
+            if cents > 0:
+                totals[days[index] - first_day] += cents
+        return totals
+    
+    def largest(self, lo, hi, count=5):
+        """Rows in lo..hi with the largest positive amounts, largest first"""
+        metrics.scanned(hi - lo)
+        rows = [index for index in range(lo, hi) if self.cents[index] > 0]
+        rows.sort(key=lambda index: self.cents[index], reverse=True)
+        return rows[:count]
+    
+    def month_summary(self, year, month, top=5):
+        """
+        Everything the recommendations need about one month's expenses, in a
+        single pass over its rows: total cents and count, cents by category
+        (first appearance order, category ids), cents by week 1-5 (weeks with
+        expenses only) and the rows of the `top` largest amounts, largest first
+        """
+        lo, hi = self.month_span(year, month)
+        metrics.scanned(hi - lo)
+        first = month_days(year, month)[0]
+        days = self.days
+        cents_column = self.cents
+        categories = self.categories
+        total = 0
+        count = 0
+        by_category = {}
+        by_week = {}
+        expenses = []
+        for index in range(lo, hi):
+            cents = cents_column[index]
+            if cents <= 0:
+                continue
+            total += cents
+            count += 1
+            category = categories[index]
+            by_category[category] = by_category.get(category, 0) + cents
+            week = (days[index] - first) // 7 + 1
+            by_week[week] = by_week.get(week, 0) + cents
+            expenses.append(index)
+        largest = heapq.nlargest(top, expenses, key=cents_column.__getitem__)
+        return {'cents': total, 'count': count, 'by_category': by_category, 'by_week': by_week, 'largest': largest}
+    
+    def numpy_view(self):
+        """
+        NumPy arrays of the columns (None if NumPy isn't installed). They are
+        copies, because an array('q') can't grow while a buffer view of it is
+        alive; the copy is reused until the columns change.
+        """
+        if numpy is None:
+            return None
+        with self.lock:
+            if self._numpy is None or self._numpy[0] != self.version:
+                self._numpy = (self.version, {
+                    'days': numpy.array(self.days, dtype=numpy.int32),
+                    'cents': numpy.array(self.cents, dtype=numpy.int64),
+                    'categories': numpy.array(self.categories, dtype=numpy.uint16),
+                    'merchants': numpy.array(self.merchants, dtype=numpy.uint16),
+                    'ids': numpy.array(self.ids, dtype=numpy.int64)
+                })
+            return self._numpy[1]
@@ -0,0 +1,143 @@
+"""
+Shared financial context for the dashboard
+Most overview cards start from the same numbers: monthly income, fixed
+expenses, account balances and this month's spending. FinancialContext works
+each of them out once, on first use, so /api/dashboard/snapshot can build every
+card from one set of figures. This month's spending comes from the month x
+category aggregates, so no card scans transactions. The individual dashboard
+endpoints are views over a context of their own.
+"""
+from calendar import monthrange
+from datetime import datetime
+from functools import cached_property
+
+
+def monthly_amount(amount, frequency):
+    """Amount paid per period of `frequency` -> amount per month"""
+    if frequency == 'weekly':
+        return amount * 52 / 12
+    elif frequency == 'bi-weekly':
+        return amount * 26 / 12
+    elif frequency == 'monthly':
+        return amount
+    elif frequency == 'annual':
+        return amount / 12
+    return amount
+
+
+class MonthToDate:
+    """This month's spending totals, read from the month x category aggregates"""
+    
+    def __init__(self, buckets):
+        spent = count = net = 0
+        self.by_category = {}       # category -> every amount, refunds included
+        self.category_counts = {}
+        for category, bucket in buckets.items():
+            if category is None:
+                category = 'Uncategorized'
+            spent += bucket.spent
+            count += bucket.spent_count
+            net += bucket.total
+            self.by_category[category] = self.by_category.get(category, 0) + bucket.total / 100
+            self.category_counts[category] = self.category_counts.get(category, 0) + bucket.count
+        self.spent = spent / 100    # positive amounts (expenses)
+        self.count = count          # number of positive amounts
+        self.net = net / 100        # every amount
+        self.transaction_count = sum(self.category_counts.values())
+
+
+class FinancialContext:
+    """
+    Everything the dashboard derives from budget_data for one request.
+    Values are computed lazily and cached for the lifetime of the context.
+    `aggregates` returns the CategoryAggregates and `bills` the BillCalendar
+    (each called only when needed).
+    """
+    
+    def __init__(self, data, aggregates, bills, now=None):
+        self.data = data
+        self.aggregates = aggregates
+        self.bills = bills
+        self.now = now or datetime.now()
+        self.year = self.now.year
+        self.month = self.now.month
+        self.day = self.now.day
+        self.days_in_month = monthrange(self.year, self.month)[1]
+        self.month_key = f"{self.year}-{self.month:02d}"
+    
+    # ----- income and commitments -----
+    
+    @cached_property
+    def income(self):
+        """(income source, monthly amount) for every income source"""
+        return [
+            (income, monthly_amount(float(income.get('amount', 0)), income.get('frequency', 'monthly')))
+            for income in self.data.get('income_sources', [])
+        ]
+    
+    @cached_property
+    def total_income(self):
+        total = 0
+        for _, amount in self.income:
+            total += amount
+        return total
+    
+    @cached_property
+    def total_expenses(self):
+        """Monthly fixed expenses"""
+        total = 0
+        for expense in self.data.get('fixed_expenses', []):
+            total += expense.value
+        return total
+    
+    @cached_property
+    def total_retirement(self):
+        """Monthly retirement contributions, converted from the linked income's pay frequency"""
+        income_sources = self.data['income_sources']
+        total = 0
+        for account in self.data.get('retirement_accounts', []):
+            contribution = float(account.get('contribution_per_paycheck', 0))
+            linked_income = income_sources.by_id(account.get('linked_income_id'))
+            pay_frequency = linked_income.get('frequency', 'monthly') if linked_income else 'monthly'
+            total += monthly_amount(contribution, pay_frequency)
+        return total
+    
+    @cached_property
+    def total_savings_allocations(self):
+        """Automatic monthly contributions to savings goals"""
+        return sum(float(goal.get('monthly_contribution', 0)) for goal in self.data.get('savings_goals', []))
+    
+    @property
+    def available(self):
+        """Income left for discretionary spending after every monthly commitment"""
+        return self.total_income - self.total_expenses - self.total_retirement - self.total_savings_allocations
+    
+    @cached_property
+    def bills_due_this_week(self):
+        """Total of fixed expenses falling due within the next 7 days"""
+        return sum(occurrence.expense.value for occurrence in self.bills().upcoming(self.now.date(), 7))
+    
+    # ----- accounts -----
+    
+    @cached_property
+    def balances(self):
+        """Account balance totals by type, plus 'liquid' (checking + savings)"""
+        totals = {'checking': 0, 'savings': 0, 'credit': 0, 'investment': 0, 'liquid': 0}
+        for account in self.data.get('accounts', []):
+            kind = account.kind
+            balance = account.value
+            if kind in ('checking', 'savings'):
+                totals[kind] += balance
+                totals['liquid'] += balance
+            elif kind in ('credit', 'investment'):
+                totals[kind] += balance
+        return totals
+    
+    # ----- transactions -----
+    
+    @cached_property
+    def mtd(self):
+        """This month's spending"""
+        aggregates = self.aggregates()
+        with aggregates.lock:
+            return MonthToDate(aggregates.month(self.year, self.month))
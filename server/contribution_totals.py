@@ -0,0 +1,108 @@
+"""
+Per-year retirement contribution totals
+Every retirement account keeps a `contribution_totals` entry:
+
+    years               {'YYYY': {'employee': ..., 'employer_match': ..., 'total': ..., 'count': ...}}
+    contribution_count  number of contributions the totals were built from
+
+Adding or deleting a contribution moves one year's bucket, so the account
+endpoints read a year's totals in O(1) instead of parsing every contribution
+date. Contributions of any type other than employer_match count as employee
+contributions (and against the annual limit). The entry is stored on the
+account record and persisted with it; records from older versions are rebuilt
+from their contributions on first use.
+"""
+from models import RetirementContribution
+
+TOTALS_KEY = 'contribution_totals'
+EMPTY_YEAR = {'employee': 0, 'employer_match': 0, 'total': 0, 'count': 0}
+
+
+def _year_amount(contribution):
+    """('YYYY', kind, amount) of a contribution, or None if its date or amount is unusable"""
+    contribution = RetirementContribution.from_dict(contribution)
+    when = contribution.when
+    if when is None or contribution.value is None:
+        return None
+    kind = 'employer_match' if contribution.get('contribution_type') == 'employer_match' else 'employee'
+    return str(when.year), kind, contribution.value
+
+
+def _move(totals, entry, sign):
+    year, kind, amount = entry
+    bucket = totals['years'].get(year)
+    if bucket is None:
+        bucket = totals['years'][year] = dict(EMPTY_YEAR)
+    bucket[kind] += sign * amount
+    bucket['total'] += sign * amount
+    bucket['count'] += sign
+    if bucket['count'] <= 0:
+        del totals['years'][year]
+
+
+def build(contributions):
+    """contribution_totals computed from scratch"""
+    totals = {'years': {}, 'contribution_count': len(contributions)}
+    for contribution in contributions:
+        entry = _year_amount(contribution)
+        if entry is not None:
+            _move(totals, entry, 1)
+    return totals
+
+
+def _current(account, contribution_count):
+    """The account's contribution_totals if they describe contribution_count contributions, else None"""
+    totals = account.get(TOTALS_KEY)
+    if isinstance(totals, dict) and totals.get('contribution_count') == contribution_count:
+        return totals
+    return None
+
+
+def ensure(account):
+    """contribution_totals of an account, rebuilt from its contributions if missing or out of date"""
+    contributions = account.get('contributions') or []
+    totals = _current(account, len(contributions))
+    if totals is None:
+        totals = account[TOTALS_KEY] = build(contributions)
+    return totals
+
+
+def public(account):
+    """Copy of an account without contribution_totals, for API responses (the totals stay storage-only)"""
+    return {key: value for key, value in account.items() if key != TOTALS_KEY}
+
+
+def contribution_added(account, contribution):
+    """Call after appending contribution to account['contributions']"""
+    contributions = account.get('contributions') or []
+    totals = _current(account, len(contributions) - 1)
+    if totals is None:
+        account[TOTALS_KEY] = build(contributions)
+        return
+    totals['contribution_count'] += 1
+    entry = _year_amount(contribution)
+    if entry is not None:
+        _move(totals, entry, 1)
+
+
+def contribution_removed(account, contribution):
+    """Call after removing contribution from account['contributions']"""
+    contributions = account.get('contributions') or []
+    totals = _current(account, len(contributions) + 1)
+    if totals is None:
+        account[TOTALS_KEY] = build(contributions)
+        return
+    totals['contribution_count'] -= 1
+    entry = _year_amount(contribution)
+    if entry is not None:
+        _move(totals, entry, -1)
+
+
+def for_year(account, year):
+    """{'employee', 'employer_match', 'total', 'count'} contributed to an account in one year"""
+    return ensure(account)['years'].get(str(year), EMPTY_YEAR)
+
+
+def years(account):
+    """[(year, bucket)] of every year with contributions, oldest first"""
+    return sorted((int(year), bucket) for year, bucket in ensure(account)['years'].items())
@@ -0,0 +1,162 @@
+"""
+Day-by-day cash-flow forecast
+Starting from today's liquid balance (checking + savings), every future day
+gets the scheduled money in and out of the household:
+    
+    inflow    paychecks, from each income source's PaySchedule
+    outflow   bill occurrences from the BillCalendar, retirement contributions
+              on the linked income's pay dates (monthly on the 1st if the
+              account isn't linked) and savings goal contributions on the 1st
+    spending  a flat daily amount: the average of the last few complete months
+              of expenses, or this month's pace if there is no history yet
+
+Scheduled amounts are placed on their day (O(occurrences)); the daily net and
+the running balance are then array operations, with NumPy when it is
+installed and itertools.accumulate otherwise.
+"""
+from calendar import monthrange
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from schedule import PaySchedule
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+SPENDING_HISTORY_MONTHS = 3
+
+
+def daily_spending(ctx, months=SPENDING_HISTORY_MONTHS):
+    """Average expenses per day over the last `months` complete months (this month's pace if none)"""
+    aggregates = ctx.aggregates()
+    cents = days = 0
+    for back in range(1, months + 1):
+        year, month = divmod(ctx.year * 12 + ctx.month - 1 - back, 12)
+        month += 1
+        spent, count = aggregates.spending(year, month)
+        if count:
+            cents += spent
+            days += monthrange(year, month)[1]
+    if days:
+        return cents / 100 / days
+    return ctx.mtd.spent / ctx.day if ctx.day else 0
+
+
+def _first_of_months(start, end):
+    """1st of every month in [start, end)"""
+    year, month = start.year, start.month
+    if start.day != 1:
+        year, month = divmod(year * 12 + month, 12)
+        month += 1
+    while True:
+        first = start.replace(year=year, month=month, day=1)
+        if first >= end:
+            return
+        yield first
+        year, month = divmod(year * 12 + month, 12)
+        month += 1
+
+
+def paychecks(ctx, start, end):
+    """(income source, [pay dates in [start, end)]) for every source with a usable schedule"""
+    start = datetime.combine(start, datetime.min.time())
+    end = datetime.combine(end, datetime.min.time())
+    for income in ctx.data.get('income_sources', []):
+        schedule = PaySchedule.for_income(income)
+        if schedule is not None:
+            yield income, [when.date() for when in schedule.between(start, end)]
+
+
+def scheduled_flows(ctx, days):
+    """
+    Per-day inflow and outflow lists (index 0 is today, which is already in
+    the balance) plus totals by kind, for the next `days` days.
+    """
+    today = ctx.now.date()
+    start = today + timedelta(days=1)
+    end = today + timedelta(days=days + 1)
+    inflow = [0.0] * (days + 1)
+    outflow = [0.0] * (days + 1)
+    totals = {'income': 0.0, 'bills': 0.0, 'retirement': 0.0, 'savings': 0.0}
+    
+    def place(flows, kind, when, amount):
+        flows[(when - today).days] += amount
+        totals[kind] += amount
+    
+    # Paychecks (and the retirement contributions taken from them)
+    pay_dates = {}
+    for income, dates in paychecks(ctx, start, end):
+        pay_dates[income.get('id')] = dates
+        amount = float(income.get('amount', 0))
+        for when in dates:
+            place(inflow, 'income', when, amount)
+    
+    month_starts = list(_first_of_months(start, end))
+    for account in ctx.data.get('retirement_accounts', []):
+        contribution = float(account.get('contribution_per_paycheck', 0))
+        if contribution:
+            for when in pay_dates.get(account.get('linked_income_id'), month_starts):
+                place(outflow, 'retirement', when, contribution)
+    
+    # Bills
+    for occurrence in ctx.bills().between(start, end):
+        place(outflow, 'bills', occurrence.due, occurrence.expense.value)
+    
+    # Savings goals
+    savings = ctx.total_savings_allocations
+    if savings:
+        for when in month_starts:
+            place(outflow, 'savings', when, savings)
+    
+    return inflow, outflow, totals
+
+
+def running_balance(starting_balance, inflow, outflow, spending):
+    """Balance at the end of each day: starting_balance plus the cumulative net of every day after today"""
+    if numpy is not None:
+        net = numpy.asarray(inflow) - numpy.asarray(outflow)
+        net[1:] -= spending
+        return (starting_balance + numpy.cumsum(net)).tolist()
+    net = [i - o - spending for i, o in zip(inflow, outflow)]
+    net[0] = inflow[0] - outflow[0]
+    return list(accumulate(net, initial=starting_balance))[1:]
+
+
+def cashflow(ctx, days):
+    """Forecast of the liquid balance for today and the next `days` days"""
+    today = ctx.now.date()
+    starting_balance = ctx.balances['liquid']
+    spending = daily_spending(ctx)
+    inflow, outflow, totals = scheduled_flows(ctx, days)
+    balances = running_balance(starting_balance, inflow, outflow, spending)
+    
+    points = []
+    minimum_index = 0
+    first_negative = None
+    for i, balance in enumerate(balances):
+        if balance < balances[minimum_index]:
+            minimum_index = i
+        if first_negative is None and balance < 0:
+            first_negative = i
+        points.append({
+            'date': (today + timedelta(days=i)).isoformat(),
+            'balance': round(balance, 2),
+            'inflow': round(inflow[i], 2),
+            'outflow': round(outflow[i] + (spending if i else 0), 2)
+        })
+    
+    totals['spending'] = spending * days
+    return {
+        'days': days,
+        'starting_balance': round(starting_balance, 2),
+        'ending_balance': round(balances[-1], 2),
+        'daily_spending': round(spending, 2),
+        'minimum_balance': round(balances[minimum_index], 2),
+        'minimum_date': points[minimum_index]['date'],
+        'first_negative_date': points[first_negative]['date'] if first_negative is not None else None,
+        'totals': {kind: round(amount, 2) for kind, amount in totals.items()},
+        'engine': 'numpy' if numpy is not None else 'python',
+        'points': points
+    }
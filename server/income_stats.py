@@ -0,0 +1,151 @@
+"""
+Running statistics for income payments
+Every income source with recorded payments keeps a `payment_stats` entry:
+    
+    months        {'YYYY-MM': {'total': ..., 'count': ...}}  payments bucketed by month
+    welford       {'n': ..., 'mean': ..., 'm2': ...}          running mean/variance of the monthly totals
+    payment_count number of payments the buckets were built from
+
+Recording or deleting a payment moves one month's total, which is a remove +
+add on the Welford accumulator, so neither step needs the payment list again
+and the analysis endpoints work from O(months) data. The entry is stored on the
+income record and persisted with it; records from older versions, or whose
+payments were replaced wholesale, are rebuilt from their payments on first use.
+"""
+import math
+
+from models import IncomePayment
+
+STATS_KEY = 'payment_stats'
+
+
+class Welford:
+    """Mean and variance of a multiset of numbers, with O(1) add and remove"""
+    
+    __slots__ = ('n', 'mean', 'm2')
+    
+    def __init__(self, n=0, mean=0.0, m2=0.0):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+    
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+    
+    def remove(self, x):
+        if self.n <= 1:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        delta = x - self.mean
+        self.n -= 1
+        self.mean -= delta / self.n
+        self.m2 = max(self.m2 - delta * (x - self.mean), 0.0)
+    
+    @property
+    def stdev(self):
+        """Sample standard deviation (0 for fewer than two values)"""
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0
+    
+    def to_dict(self):
+        return {'n': self.n, 'mean': self.mean, 'm2': self.m2}
+
+
+def _month_amount(payment):
+    """('YYYY-MM', amount) of a payment, or None if its date or amount is unusable"""
+    payment = IncomePayment.from_dict(payment)
+    when = payment.when
+    if when is None or payment.value is None:
+        return None
+    return f"{when.year}-{when.month:02d}", payment.value
+
+
+def build(payments):
+    """payment_stats computed from scratch"""
+    months = {}
+    for payment in payments:
+        entry = _month_amount(payment)
+        if entry is None:
+            continue
+        bucket = months.setdefault(entry[0], {'total': 0, 'count': 0})
+        bucket['total'] += entry[1]
+        bucket['count'] += 1
+    accumulator = Welford()
+    for bucket in months.values():
+        accumulator.add(bucket['total'])
+    return {'months': months, 'welford': accumulator.to_dict(), 'payment_count': len(payments)}
+
+
+def _current(income, payment_count):
+    """The income's payment_stats if they describe payment_count payments, else None"""
+    stats = income.get(STATS_KEY)
+    if isinstance(stats, dict) and stats.get('payment_count') == payment_count:
+        return stats
+    return None
+
+
+def ensure(income):
+    """payment_stats of an income source, rebuilt from its payments if missing or out of date"""
+    payments = income.get('actual_payments') or []
+    stats = _current(income, len(payments))
+    if stats is None:
+        stats = income[STATS_KEY] = build(payments)
+    return stats
+
+
+def public(income):
+    """Copy of an income source without payment_stats, for API responses (the stats stay storage-only)"""
+    return {key: value for key, value in income.items() if key != STATS_KEY}
+
+
+def _move(stats, month, amount, count):
+    """Add amount/count (negative to take away) to one month's bucket"""
+    accumulator = Welford(**stats['welford'])
+    bucket = stats['months'].get(month)
+    if bucket is not None:
+        accumulator.remove(bucket['total'])
+    else:
+        bucket = stats['months'][month] = {'total': 0, 'count': 0}
+    bucket['total'] += amount
+    bucket['count'] += count
+    if bucket['count'] > 0:
+        accumulator.add(bucket['total'])
+    else:
+        del stats['months'][month]
+    stats['welford'] = accumulator.to_dict()
+
+
+def payment_added(income, payment):
+    """Call after appending payment to income['actual_payments']"""
+    payments = income.get('actual_payments') or []
+    stats = _current(income, len(payments) - 1)
+    if stats is None:
+        income[STATS_KEY] = build(payments)
+        return
+    stats['payment_count'] += 1
+    entry = _month_amount(payment)
+    if entry is not None:
+        _move(stats, entry[0], entry[1], 1)
+
+
+def payment_removed(income, payment):
+    """Call after removing payment from income['actual_payments']"""
+    payments = income.get('actual_payments') or []
+    stats = _current(income, len(payments) + 1)
+    if stats is None:
+        income[STATS_KEY] = build(payments)
+        return
+    stats['payment_count'] -= 1
+    entry = _month_amount(payment)
+    if entry is not None:
+        _move(stats, entry[0], -entry[1], -1)
+
+
+def monthly_totals(stats, since=None):
+    """[(month key, bucket)] oldest first, from month key `since` on if given"""
+    return sorted(
+        (month, bucket) for month, bucket in stats['months'].items()
+        if since is None or month >= since
+    )
@@ -0,0 +1,89 @@
+"""
+Memoisation for the expensive read-only endpoints
+Dashboard results only depend on budget_data and today's date. DataVersion is
+bumped by every write path, and ResponseCache keeps finished JSON bodies keyed
+on (endpoint, arguments, data version, date): a refresh with nothing changed
+in between is served from memory, while any mutation (or midnight) turns the
+old entries into misses that age out of the LRU.
+"""
+import threading
+from collections import OrderedDict
+
+
+class DataVersion:
+    """Monotonic counter of changes to budget_data"""
+    
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+    
+    def bump(self):
+        with self._lock:
+            self.value += 1
+            return self.value
+
+
+class ResponseCache:
+    """
+    LRU of serialized response bodies, bounded by entry count and total size.
+    Sizes are the byte length of each body, so `bytes` is what the cache holds.
+    """
+    
+    def __init__(self, max_entries=256, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Cached body for key (None on a miss)"""
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+    
+    def put(self, key, body):
+        size = len(body)
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old)
+            self._entries[key] = body
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+            return True
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0
+            }
@@ -0,0 +1,190 @@
+"""
+Request metrics
+Every request is timed between before_request and after_request and recorded
+against its route rule ('/api/income/<int:income_id>', not the concrete path):
+    
+    count / errors      requests and 5xx responses
+    duration            histogram over fixed buckets (100us x sqrt(2)^k), from
+                        which p50/p95/p99 are interpolated
+    response bytes      total body size
+    transactions        rows scanned, counted by the transaction partitions and
+                        the columnar store through scanned() (a whole partition
+                        counts once it is iterated)
+
+Recording is a bisect and a few additions under one lock, so it costs a
+couple of microseconds. Requests slower than the slow threshold are also kept
+in a bounded log with their arguments and sizes. `/api/metrics` serves all of
+it as JSON or in the Prometheus text format.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+BUCKETS = tuple(0.0001 * 2 ** (k / 2) for k in range(36))  # 100us .. ~26s
+QUANTILES = (50, 95, 99)
+
+_local = threading.local()
+
+
+# ----- per-request counters -----
+
+def start():
+    """Called at the start of a request on its thread"""
+    _local.scanned = 0
+    _local.started = time.perf_counter()
+
+
+def scanned(rows):
+    """Count transaction rows read by the current request"""
+    try:
+        _local.scanned += rows
+    except AttributeError:
+        pass  # outside a request (startup, background threads)
+
+
+def finish():
+    """(seconds since start(), rows scanned) of the current request, or None if it wasn't started"""
+    started = getattr(_local, 'started', None)
+    if started is None:
+        return None
+    _local.started = None
+    return time.perf_counter() - started, _local.scanned
+
+
+# ----- aggregation -----
+
+class RouteStats:
+    """Counters and a latency histogram for one method + route"""
+    
+    __slots__ = ('count', 'errors', 'seconds', 'max_seconds', 'response_bytes', 'transactions_scanned', 'buckets')
+    
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.response_bytes = 0
+        self.transactions_scanned = 0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # the last one is +Inf
+    
+    def quantile(self, q):
+        """Duration below which q percent of requests finished (interpolated within its bucket)"""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for index, in_bucket in enumerate(self.buckets):
+            if in_bucket and seen + in_bucket >= rank:
+                low = BUCKETS[index - 1] if index else 0.0
+                high = BUCKETS[index] if index < len(BUCKETS) else self.max_seconds
+                return min(low + (high - low) * (rank - seen) / in_bucket, self.max_seconds)
+            seen += in_bucket
+        return self.max_seconds
+    
+    def to_dict(self):
+        result = {
+            'count': self.count,
+            'errors': self.errors,
+            'mean_ms': round(self.seconds / self.count * 1000, 3) if self.count else 0,
+            'max_ms': round(self.max_seconds * 1000, 3),
+            'response_bytes': self.response_bytes,
+            'transactions_scanned': self.transactions_scanned
+        }
+        for q in QUANTILES:
+            result[f'p{q}_ms'] = round(self.quantile(q) * 1000, 3)
+        return result
+
+
+class Metrics:
+    """RouteStats per (method, route) plus the log of slow requests"""
+    
+    def __init__(self, slow_seconds=0.5, slow_log_size=100):
+        self.slow_seconds = slow_seconds
+        self.started_at = time.time()
+        self.routes = {}
+        self.slow = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+    
+    def record(self, method, route, status, seconds, response_bytes, transactions_scanned):
+        key = (method, route)
+        with self._lock:
+            stats = self.routes.get(key)
+            if stats is None:
+                stats = self.routes[key] = RouteStats()
+            stats.count += 1
+            if status >= 500:
+                stats.errors += 1
+            stats.seconds += seconds
+            if seconds > stats.max_seconds:
+                stats.max_seconds = seconds
+            stats.response_bytes += response_bytes
+            stats.transactions_scanned += transactions_scanned
+            stats.buckets[bisect_left(BUCKETS, seconds)] += 1
+    
+    def is_slow(self, seconds):
+        return seconds >= self.slow_seconds
+    
+    def log_slow(self, entry):
+        with self._lock:
+            self.slow.append(entry)
+    
+    def reset(self):
+        with self._lock:
+            self.routes.clear()
+            self.slow.clear()
+            self.started_at = time.time()
+    
+    def _snapshot(self):
+        with self._lock:
+            routes = sorted(self.routes.items(), key=lambda item: (item[0][1], item[0][0]))
+            return [(key, stats.to_dict(), list(stats.buckets), stats.seconds) for key, stats in routes], list(self.slow)
+    
+    def to_dict(self):
+        routes, slow = self._snapshot()
+        return {
+            'since': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started_at)),
+            'slow_threshold_ms': round(self.slow_seconds * 1000, 3),
+            'requests': sum(summary['count'] for _, summary, _, _ in routes),
+            'errors': sum(summary['errors'] for _, summary, _, _ in routes),
+            'routes': [{'method': method, 'route': route, **summary} for (method, route), summary, _, _ in routes],
+            'slow_requests': slow
+        }
+    
+    def to_prometheus(self, prefix='budget_app'):
+        """Prometheus text exposition format (version 0.0.4)"""
+        routes, _ = self._snapshot()
+        lines = []
+        
+        def family(name, kind, help_text):
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} {kind}')
+        
+        def labels(method, route, **extra):
+            pairs = {'method': method, 'route': route, **extra}
+            return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs.items()) + '}'
+        
+        for name, field, help_text in (
+            ('http_requests_total', 'count', 'Requests handled'),
+            ('http_request_errors_total', 'errors', 'Requests answered with a 5xx status'),
+            ('http_response_bytes_total', 'response_bytes', 'Response body bytes sent'),
+            ('transactions_scanned_total', 'transactions_scanned', 'Transaction rows read while handling requests')
+        ):
+            family(name, 'counter', help_text)
+            for (method, route), summary, _, _ in routes:
+                lines.append(f'{prefix}_{name}{labels(method, route)} {summary[field]}')
+        
+        family('http_request_duration_seconds', 'histogram', 'Time to handle a request')
+        for (method, route), summary, buckets, seconds in routes:
+            cumulative = 0
+            for bound, in_bucket in zip(BUCKETS, buckets):
+                cumulative += in_bucket
+                lines.append(f'{prefix}_http_request_duration_seconds_bucket{labels(method, route, le=f"{bound:.6g}")} {cumulative}')
+            lines.append(f'{prefix}_http_request_duration_seconds_bucket{labels(method, route, le="+Inf")} {summary["count"]}')
+            lines.append(f'{prefix}_http_request_duration_seconds_sum{labels(method, route)} {seconds:.6f}')
+            lines.append(f'{prefix}_http_request_duration_seconds_count{labels(method, route)} {summary["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,207 @@
+"""
+Typed in-memory records for budget data
+Each model keeps the original JSON values (so it converts back losslessly and
+still works with code that indexes it like a dict) plus typed values parsed
+once at load/ingest time:
+    
+    transaction.when   -> datetime (None if the date is missing/invalid)
+    transaction.value  -> float amount (None if it isn't a number)
+"""
+from collections.abc import MutableMapping, Sequence
+from datetime import datetime
+
+_MISSING = object()
+
+
+def parse_datetime(value):
+    """ISO date/datetime string -> datetime, or None"""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def parse_amount(value, default=0.0):
+    """JSON amount -> float (default when missing, None when not a number)"""
+    if value is _MISSING:
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_day(value):
+    """Day-of-month field -> int 1-31, or None"""
+    try:
+        day = int(value)
+    except (TypeError, ValueError):
+        return None
+    return day if 1 <= day <= 31 else None
+
+
+class Record(MutableMapping):
+    """
+    Base for slotted records. FIELDS are JSON keys stored in slots of the same
+    name; any other keys go to `extra`. Subclasses derive typed slots in
+    _parse(), which runs whenever a field changes.
+    """
+    
+    __slots__ = ('extra',)
+    FIELDS = ()
+    
+    def __init__(self, data=None):
+        for field in self.FIELDS:
+            object.__setattr__(self, field, _MISSING)
+        self.extra = None
+        for key, value in (data or {}).items():
+            self._set(key, value)
+        self._parse()
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Wrap a JSON dict (records that are already models are returned as is)"""
+        return data if isinstance(data, cls) else cls(data)
+    
+    def to_dict(self):
+        """The JSON shape this record was built from"""
+        return dict(self.items())
+    
+    def _set(self, key, value):
+        if key in self.FIELDS:
+            object.__setattr__(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+    
+    def _parse(self):
+        pass
+    
+    # ----- dict compatibility -----
+    
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if value is not _MISSING:
+                return value
+        elif self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+    
+    def __setitem__(self, key, value):
+        self._set(key, value)
+        if key in self.FIELDS:
+            self._parse()
+    
+    def __delitem__(self, key):
+        if key in self.FIELDS:
+            if getattr(self, key) is _MISSING:
+                raise KeyError(key)
+            object.__setattr__(self, key, _MISSING)
+            self._parse()
+        elif self.extra is not None and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+    
+    def __iter__(self):
+        for field in self.FIELDS:
+            if getattr(self, field) is not _MISSING:
+                yield field
+        if self.extra:
+            yield from self.extra
+    
+    def __len__(self):
+        return sum(1 for _ in self)
+    
+    def __contains__(self, key):
+        if key in self.FIELDS:
+            return getattr(self, key) is not _MISSING
+        return self.extra is not None and key in self.extra
+    
+    def get(self, key, default=None):
+        # Faster than the Mapping mixin, which goes through __getitem__ + KeyError
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            return default if value is _MISSING else value
+        if self.extra is not None:
+            return self.extra.get(key, default)
+        return default
+    
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Transaction(Record):
+    """A spending transaction (positive amount = expense)"""
+    
+    __slots__ = ('id', 'date', 'amount', 'category', 'description', 'created_at', 'when', 'value')
+    FIELDS = ('id', 'date', 'amount', 'category', 'description', 'created_at')
+    
+    def _parse(self):
+        self.when = parse_datetime(self.date)
+        self.value = parse_amount(self.amount)
+
+
+class IncomePayment(Record):
+    """An actual payment recorded against an income source"""
+    
+    __slots__ = ('id', 'date', 'amount', 'notes', 'recorded_at', 'when', 'value')
+    FIELDS = ('id', 'date', 'amount', 'notes', 'recorded_at')
+    
+    def _parse(self):
+        self.when = parse_datetime(self.date)
+        self.value = parse_amount(self.amount)
+
+
+class RetirementContribution(Record):
+    """A contribution to a retirement account"""
+    
+    __slots__ = ('id', 'date', 'amount', 'contribution_type', 'note', 'created_at', 'when', 'value')
+    FIELDS = ('id', 'date', 'amount', 'contribution_type', 'note', 'created_at')
+    
+    def _parse(self):
+        self.when = parse_datetime(self.date)
+        self.value = parse_amount(self.amount)
+
+
+class FixedExpense(Record):
+    """
+    A recurring bill. `due` is the day of month, taken from due_day or the
+    older due_date field.
+    """
+    
+    __slots__ = ('id', 'name', 'amount', 'due_day', 'due_date', 'category', 'is_paid', 'is_autopay',
+                 'created_at', 'updated_at', 'value', 'due')
+    FIELDS = ('id', 'name', 'amount', 'due_day', 'due_date', 'category', 'is_paid', 'is_autopay',
+              'created_at', 'updated_at')
+    
+    def _parse(self):
+        self.value = parse_amount(self.amount)
+        due = parse_day(self.due_day) if self.due_day is not _MISSING else None
+        if due is None and self.due_date is not _MISSING:
+            due = parse_day(self.due_date)
+        self.due = due
+
+
+class Account(Record):
+    """A checking/savings/credit/investment account. `kind` is the lowercased type."""
+    
+    __slots__ = ('id', 'name', 'type', 'balance', 'created_at', 'updated_at', 'value', 'kind')
+    FIELDS = ('id', 'name', 'type', 'balance', 'created_at', 'updated_at')
+    
+    def _parse(self):
+        self.value = parse_amount(self.balance)
+        self.kind = self.type.lower() if isinstance(self.type, str) else ''
+
+
+def to_json(obj):
+    """json.dumps default= hook for models and list-like collections"""
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    if isinstance(obj, Sequence):
+        return list(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
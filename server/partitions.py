@@ -0,0 +1,366 @@
+"""
+Month-partitioned transaction list
+Transactions are kept in one partition per YYYY-MM. Recent months are loaded
+at startup, older partitions are loaded the first time they are needed and
+evicted again (least recently used first) once too many are resident.
+"""
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Mapping, MutableSequence
+from datetime import datetime
+
+import metrics
+from columnar import epoch_day, from_epoch_day
+
+# Partition for transactions without a usable YYYY-MM date
+UNDATED = 'undated'
+
+# Sort-key bounds: ids are ints >= -1 (see date_key)
+_FIRST_ID = -2
+_LAST_ID = float('inf')
+
+
+def month_key(transaction):
+    """Partition key for a transaction: 'YYYY-MM' taken from its date string"""
+    date = transaction.get('date') if isinstance(transaction, Mapping) else None
+    if isinstance(date, str) and len(date) >= 7 and date[4] == '-' and date[:4].isdigit() and date[5:7].isdigit():
+        return date[:7]
+    return UNDATED
+
+
+def date_key(transaction):
+    """(epoch day, id) ordering key for a transaction, or None without a parsed date"""
+    when = getattr(transaction, 'when', None)
+    if when is None:
+        return None
+    transaction_id = transaction.get('id')
+    if not isinstance(transaction_id, int) or isinstance(transaction_id, bool):
+        transaction_id = -1
+    return (epoch_day(when), transaction_id)
+
+
+def encode_cursor(key):
+    return f"{key[0]}:{key[1]}"
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor (ValueError if malformed)"""
+    day, transaction_id = cursor.split(':')
+    return (int(day), int(transaction_id))
+
+
+def recent_months(count, today=None):
+    """The current month and the count-1 months before it, newest first"""
+    today = today or datetime.now()
+    year, month = today.year, today.month
+    months = []
+    for _ in range(count):
+        months.append(f"{year}-{month:02d}")
+        month -= 1
+        if month == 0:
+            month = 12
+            year -= 1
+    return months
+
+
+class PartitionedTransactions(MutableSequence):
+    """
+    List-like view over month partitions, used as budget_data['transactions'].
+    Iteration walks partitions in month order (insertion order within a month),
+    loading cold partitions on the way. Use months() / in_months() when only a
+    date range is needed so older history never has to be read.
+    `factory` converts records as they are loaded or added (Transaction.from_dict).
+    `index` maps transaction id -> month for every stored transaction, so a
+    delete by id only has to load the one partition holding it.
+    """
+    
+    def __init__(self, loader, manifest, eager_months=3, max_loaded=24, factory=None, index=None):
+        self._loader = loader
+        self._factory = factory or (lambda transaction: transaction)
+        self._counts = dict(manifest)
+        self._months_by_id = dict(index or {})
+        self._loaded = OrderedDict()
+        self._sorted = {}
+        self._dirty = set()
+        self._lock = threading.RLock()
+        self.max_loaded = max(max_loaded, eager_months)
+        self.loads = 0
+        self.evictions = 0
+        # Objects with added(t) / removed(t) / invalidate(), e.g. TransactionColumns
+        self.observers = []
+        
+        # Recent months stay resident for the whole session
+        self._pinned = set(recent_months(eager_months))
+        for month in self._pinned:
+            if month in self._counts:
+                self.partition(month)
+    
+    # ----- partitions -----
+    
+    def months(self):
+        """All partition keys in chronological order ('undated' last)"""
+        with self._lock:
+            return sorted(self._counts)
+    
+    def partition(self, month):
+        """The records of one month (loaded on demand); empty list if there are none"""
+        with self._lock:
+            records = self._loaded.get(month)
+            if records is not None:
+                self._loaded.move_to_end(month)
+                return records
+            if month not in self._counts:
+                return []
+            records = [self._factory(t) for t in self._loader(month)]
+            self._counts[month] = len(records)
+            for transaction in records:
+                self._months_by_id.setdefault(transaction.get('id'), month)
+            self._loaded[month] = records
+            self.loads += 1
+            self._evict()
+            return records
+    
+    def in_months(self, first, last=None):
+        """Iterate transactions in partitions first..last (inclusive, 'YYYY-MM')"""
+        last = last or first
+        for month in self.months():
+            if month != UNDATED and first <= month <= last:
+                records = self.partition(month)
+                metrics.scanned(len(records))
+                yield from records
+    
+    def _sorted_partition(self, month):
+        """(keys, records) of a month ordered by date_key; cached until the month changes"""
+        cached = self._sorted.get(month)
+        if cached is None:
+            keyed = sorted(
+                ((key, transaction) for transaction in self.partition(month)
+                 for key in (date_key(transaction),) if key is not None),
+                key=lambda item: item[0]
+            )
+            cached = ([key for key, _ in keyed], [transaction for _, transaction in keyed])
+            if month in self._loaded:
+                self._sorted[month] = cached
+        return cached
+    
+    def between(self, first_day=None, last_day=None, after=None, descending=False):
+        """
+        Iterate dated transactions with first_day <= epoch day <= last_day in
+        (day, id) order, newest first when descending. `after` is the key of the
+        last record already seen (keyset pagination). Only the partitions in the
+        range are touched and each is bisected, so a page costs O(log n + k).
+        """
+        low = (first_day, _FIRST_ID) if first_day is not None else None
+        high = (last_day, _LAST_ID) if last_day is not None else None
+        if after is not None:
+            if descending:
+                high = min(high, after) if high else after
+            else:
+                low = max(low, after) if low else after
+        first_month = from_epoch_day(low[0]).strftime('%Y-%m') if low else ''
+        last_month = from_epoch_day(high[0]).strftime('%Y-%m') if high else '9999-99'
+        
+        months = [m for m in self.months() if m != UNDATED and first_month <= m <= last_month]
+        for month in reversed(months) if descending else months:
+            with self._lock:
+                keys, records = self._sorted_partition(month)
+                # `after` itself is excluded, the day bounds are inclusive
+                lo = 0 if low is None else (bisect_right if low == after else bisect_left)(keys, low)
+                hi = len(keys) if high is None else (bisect_left if high == after else bisect_right)(keys, high)
+                page = records[lo:hi]
+            metrics.scanned(len(page))
+            yield from reversed(page) if descending else page
+    
+    def _evict(self):
+        while len(self._loaded) > self.max_loaded:
+            victim = next((m for m in self._loaded if m not in self._pinned and m not in self._dirty), None)
+            if victim is None:
+                break
+            del self._loaded[victim]
+            self._sorted.pop(victim, None)
+            self.evictions += 1
+    
+    def _writable(self, month):
+        records = self.partition(month)
+        self._sorted.pop(month, None)
+        if month not in self._loaded:
+            # A brand-new month, or one the LRU trim dropped straight after loading
+            # because every other resident month is pinned or dirty
+            self._counts.setdefault(month, 0)
+            self._loaded[month] = records
+        self._dirty.add(month)
+        return records
+    
+    def take_dirty(self):
+        """Months changed since the last call, with their current records (None = now empty)"""
+        with self._lock:
+            changed = {}
+            for month in self._dirty:
+                records = self._loaded.get(month)
+                changed[month] = list(records) if records else None
+                if not records:
+                    self._loaded.pop(month, None)
+                    self._sorted.pop(month, None)
+                    self._counts.pop(month, None)
+            self._dirty = set()
+            self._evict()
+            return changed
+    
+    def manifest(self):
+        """Partition key -> transaction count"""
+        with self._lock:
+            return dict(self._counts)
+    
+    def ids(self):
+        """Ids of every transaction, resident or not"""
+        with self._lock:
+            return [transaction_id for transaction_id in self._months_by_id if transaction_id is not None]
+    
+    def id_index(self):
+        """Partition key -> ids of its transactions (stored next to the manifest)"""
+        with self._lock:
+            grouped = {}
+            for transaction_id, month in self._months_by_id.items():
+                if transaction_id is not None:
+                    grouped.setdefault(month, []).append(transaction_id)
+            return grouped
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'partitions': len(self._counts),
+                'loaded': list(self._loaded),
+                'loads': self.loads,
+                'evictions': self.evictions
+            }
+    
+    # ----- mutations -----
+    
+    def append(self, transaction):
+        transaction = self._factory(transaction)
+        with self._lock:
+            month = month_key(transaction)
+            self._writable(month).append(transaction)
+            self._counts[month] += 1
+            self._months_by_id[transaction.get('id')] = month
+            for observer in self.observers:
+                observer.added(transaction)
+    
+    def insert(self, index, transaction):
+        # Position is determined by the transaction date
+        self.append(transaction)
+    
+    def remove_id(self, transaction_id):
+        """Remove transactions with this id from the partition the index points at"""
+        with self._lock:
+            indexed = self._months_by_id.pop(transaction_id, None)
+            # Resident partitions are cheap to check; ids reused across months can also live there
+            candidates = [indexed] if indexed in self._counts else []
+            candidates += [m for m in reversed(self.months()) if m in self._loaded and m != indexed]
+            for month in candidates:
+                records = self.partition(month)
+                remaining = [t for t in records if t.get('id') != transaction_id]
+                if len(remaining) != len(records):
+                    for transaction in records:
+                        if transaction.get('id') == transaction_id:
+                            for observer in self.observers:
+                                observer.removed(transaction)
+                    self._writable(month)[:] = remaining
+                    self._counts[month] = len(remaining)
+                    return len(records) - len(remaining)
+            return 0
+    
+    def replace(self, transactions):
+        """Replace every transaction (bulk import / POST /api/budget)"""
+        with self._lock:
+            self._dirty.update(self._counts)
+            for month in self._dirty:
+                self._loaded[month] = []
+                self._counts[month] = 0
+            self._sorted = {}
+            self._months_by_id = {}
+            for observer in self.observers:
+                observer.invalidate()
+            observers, self.observers = self.observers, []
+            try:
+                for transaction in transactions:
+                    self.append(transaction)
+            finally:
+                self.observers = observers
+    
+    def _forget(self, transaction, month):
+        """Drop a removed transaction from the id index (unless the id now points elsewhere)"""
+        transaction_id = transaction.get('id')
+        if self._months_by_id.get(transaction_id) == month:
+            del self._months_by_id[transaction_id]
+    
+    # ----- list protocol -----
+    
+    def _locate(self, index):
+        if index < 0:
+            index += len(self)
+        if index < 0:
+            raise IndexError('transaction index out of range')
+        for month in self.months():
+            count = self._counts[month]
+            if index < count:
+                return month, index
+            index -= count
+        raise IndexError('transaction index out of range')
+    
+    def __len__(self):
+        with self._lock:
+            return sum(self._counts.values())
+    
+    def __iter__(self):
+        for month in self.months():
+            records = self.partition(month)
+            metrics.scanned(len(records))
+            yield from records
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        with self._lock:
+            month, offset = self._locate(index)
+            return self.partition(month)[offset]
+    
+    def __setitem__(self, index, transaction):
+        if isinstance(index, slice):
+            records = list(self)
+            records[index] = transaction
+            self.replace(records)
+            return
+        with self._lock:
+            month, offset = self._locate(index)
+            transaction = self._factory(transaction)
+            if month_key(transaction) == month:
+                previous = self.partition(month)[offset]
+                for observer in self.observers:
+                    observer.removed(previous)
+                    observer.added(transaction)
+                self._writable(month)[offset] = transaction
+                self._forget(previous, month)
+                self._months_by_id[transaction.get('id')] = month
+            else:
+                del self[index]
+                self.append(transaction)
+    
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            records = list(self)
+            del records[index]
+            self.replace(records)
+            return
+        with self._lock:
+            month, offset = self._locate(index)
+            previous = self.partition(month)[offset]
+            for observer in self.observers:
+                observer.removed(previous)
+            del self._writable(month)[offset]
+            self._counts[month] -= 1
+            self._forget(previous, month)
+    
+    def __repr__(self):
+        return f"<PartitionedTransactions {len(self)} transactions in {len(self._counts)} months>"
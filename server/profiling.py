@@ -0,0 +1,122 @@
+"""
+On-demand request profiling
+With BUDGET_APP_PROFILE=1, an /api/ request carrying ?__profile=1 (or an
+X-Profile: 1 header) runs under cProfile. The profile is written to the
+profiles directory next to the data file as
+    
+    <YYYYmmdd-HHMMSS-ffffff>-<method>-<endpoint>.pstats
+
+(loadable with pstats or snakeviz) and the response carries its name in
+X-Profile and the top functions by cumulative time in X-Profile-Top. Only the
+newest `keep` profiles are kept, and one request is profiled at a time;
+others arriving meanwhile run normally.
+"""
+import cProfile
+import io
+import pstats
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+
+PROFILE_SUFFIX = '.pstats'
+_NAME = re.compile(r'^[\w.-]+\.pstats$')
+
+
+class Profiler:
+    """Profiles single requests into .pstats files under `directory`"""
+    
+    def __init__(self, directory, keep=50, top=15):
+        self.directory = Path(directory)
+        self.keep = keep
+        self.top = top
+        self._busy = threading.Lock()
+        self._local = threading.local()
+    
+    def start(self):
+        """Start profiling the current thread's request; False if another profile is running"""
+        if not self._busy.acquire(blocking=False):
+            return False
+        profile = cProfile.Profile()
+        self._local.profile = profile
+        profile.enable()
+        return True
+    
+    def stop(self, method, endpoint):
+        """Stop the current thread's profile and save it; (file name, top entries) or None"""
+        profile = getattr(self._local, 'profile', None)
+        if profile is None:
+            return None
+        self._local.profile = None
+        try:
+            profile.disable()
+            stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+            endpoint = re.sub(r'[^\w.-]', '_', endpoint or 'unknown')
+            name = f"{stamp}-{method}-{endpoint}{PROFILE_SUFFIX}"
+            self.directory.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(str(self.directory / name))
+            self._prune()
+            return name, top_functions(pstats.Stats(profile), self.top)
+        finally:
+            self._busy.release()
+    
+    def discard(self):
+        """Stop the current thread's profile, if one is still running, without saving it"""
+        profile = getattr(self._local, 'profile', None)
+        if profile is not None:
+            self._local.profile = None
+            profile.disable()
+            self._busy.release()
+    
+    def _prune(self):
+        for path in sorted(self.directory.glob(f'*{PROFILE_SUFFIX}'), reverse=True)[self.keep:]:
+            path.unlink(missing_ok=True)
+    
+    def path(self, name):
+        """Path of a saved profile, or None if the name isn't one"""
+        if not _NAME.match(name or ''):
+            return None
+        path = self.directory / name
+        return path if path.is_file() else None
+    
+    def list(self):
+        """Saved profiles, newest first"""
+        if not self.directory.is_dir():
+            return []
+        profiles = []
+        for path in sorted(self.directory.glob(f'*{PROFILE_SUFFIX}'), reverse=True):
+            stat = path.stat()
+            profiles.append({
+                'name': path.name,
+                'bytes': stat.st_size,
+                'created_at': datetime.fromtimestamp(stat.st_mtime).isoformat(timespec='seconds')
+            })
+        return profiles
+    
+    def summary(self, name, top=None):
+        """Top functions by cumulative time of a saved profile, or None if there is no such profile"""
+        path = self.path(name)
+        if path is None:
+            return None
+        return top_functions(pstats.Stats(str(path), stream=io.StringIO()), top or self.top)
+
+
+def _function_name(function):
+    filename, line, name = function
+    if filename == '~':
+        return name  # built-in
+    return f"{Path(filename).name}:{line}({name})"
+
+
+def top_functions(stats, top):
+    """[{function, calls, total_ms, cumulative_ms}] of the `top` functions by cumulative time"""
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:top]
+    return [
+        {
+            'function': _function_name(function),
+            'calls': calls,
+            'total_ms': round(total * 1000, 3),
+            'cumulative_ms': round(cumulative * 1000, 3)
+        }
+        for function, (_, calls, total, cumulative, _) in rows
+    ]
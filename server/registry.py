@@ -0,0 +1,208 @@
+"""
+Entity registry: id-indexed collections and the id allocator
+Every collection in budget_data (accounts, income sources, fixed expenses,
+retirement accounts and their payment/contribution lists) is an
+EntityCollection: a list-compatible sequence backed by an insertion-ordered
+dict of id -> record, so finding, replacing and deleting by id are O(1).
+
+Ids still look like the millisecond timestamps the app has always used, but
+come from IdAllocator, which never hands out the same id twice (even for
+several records created within one millisecond) and whose high-water mark is
+persisted as the 'id_sequence' setting.
+"""
+import threading
+import time
+from collections.abc import MutableSequence
+
+from models import Account, FixedExpense, IncomePayment, RetirementContribution
+
+# Setting key holding the last id handed out
+ID_SEQUENCE_KEY = 'id_sequence'
+
+# Collection -> record factory, and the child collections nested in their records
+COLLECTION_FACTORIES = {
+    'accounts': Account.from_dict,
+    'income_sources': None,  # plain dicts
+    'fixed_expenses': FixedExpense.from_dict,
+    'retirement_accounts': None
+}
+CHILD_FACTORIES = {
+    'income_sources': ('actual_payments', IncomePayment.from_dict),
+    'retirement_accounts': ('contributions', RetirementContribution.from_dict)
+}
+
+
+class IdAllocator:
+    """Monotonic id source: max(current time in ms, last id + 1)"""
+    
+    def __init__(self, last=0):
+        self.last = last
+        self.dirty = False
+        self._lock = threading.Lock()
+    
+    def next_id(self):
+        with self._lock:
+            self.last = max(int(time.time() * 1000), self.last + 1)
+            self.dirty = True
+            return self.last
+    
+    def observe(self, value):
+        """Make sure ids already in use are never handed out"""
+        if isinstance(value, int) and not isinstance(value, bool):
+            with self._lock:
+                if value > self.last:
+                    self.last = value
+    
+    def take_dirty(self):
+        """True if ids were allocated since the last call"""
+        with self._lock:
+            dirty, self.dirty = self.dirty, False
+            return dirty
+
+
+class EntityCollection(MutableSequence):
+    """
+    List of records indexed by id. Behaves like the plain list it replaces
+    (iteration, len, append, indexing) and adds by_id() / remove_id().
+    Records must have a unique hashable 'id'.
+    """
+    
+    def __init__(self, records=(), factory=None):
+        self._factory = factory or (lambda record: record)
+        self._records = {}
+        for record in records:
+            self.append(record)
+    
+    # ----- id access -----
+    
+    def by_id(self, record_id, default=None):
+        return self._records.get(record_id, default)
+    
+    def has_id(self, record_id):
+        return record_id in self._records
+    
+    def remove_id(self, record_id):
+        """Remove and return the record with this id (None if there isn't one)"""
+        return self._records.pop(record_id, None)
+    
+    def ids(self):
+        return self._records.keys()
+    
+    # ----- list protocol -----
+    
+    def append(self, record):
+        record = self._factory(record)
+        record_id = record.get('id')
+        if record_id in self._records:
+            raise ValueError(f'Duplicate id {record_id}')
+        self._records[record_id] = record
+    
+    def insert(self, index, record):
+        if index >= len(self._records):
+            self.append(record)
+            return
+        records = list(self._records.values())
+        records.insert(index, self._factory(record))
+        self._replace(records)
+    
+    def _replace(self, records):
+        self._records = {}
+        for record in records:
+            self.append(record)
+    
+    def __len__(self):
+        return len(self._records)
+    
+    def __iter__(self):
+        return iter(self._records.values())
+    
+    def __getitem__(self, index):
+        records = list(self._records.values())
+        return records[index]
+    
+    def __setitem__(self, index, record):
+        records = list(self._records.values())
+        records[index] = record
+        self._replace(records)
+    
+    def __delitem__(self, index):
+        records = list(self._records.values())
+        del records[index]
+        self._replace(records)
+    
+    def pop(self, index=-1):
+        record = self[index]
+        del self._records[record.get('id')]
+        return record
+    
+    def __eq__(self, other):
+        return list(self) == list(other) if isinstance(other, (list, EntityCollection)) else NotImplemented
+    
+    def __repr__(self):
+        return f"EntityCollection({list(self._records.values())!r})"
+
+
+class EntityRegistry:
+    """Wraps budget_data collections in EntityCollections and owns the id allocator"""
+    
+    def __init__(self):
+        self.allocator = IdAllocator()
+    
+    def next_id(self):
+        return self.allocator.next_id()
+    
+    def collection(self, factory, records):
+        """An EntityCollection of records; records with a missing or repeated id get a new one"""
+        collection = EntityCollection(factory=factory)
+        reassigned = 0
+        for record in records:
+            record = collection._factory(record)
+            if record.get('id') is None or collection.has_id(record.get('id')):
+                record['id'] = self.next_id()
+                reassigned += 1
+            collection.append(record)
+        return collection, reassigned
+    
+    def attach(self, data):
+        """
+        Index every collection in data (in place) and register transaction ids
+        with the allocator. Returns the number of records whose id had to be
+        replaced because it was missing or already taken.
+        """
+        # Every id in use has to be known before any new one is handed out
+        self.allocator.observe(data.get(ID_SEQUENCE_KEY))
+        for name in COLLECTION_FACTORIES:
+            child_name = CHILD_FACTORIES.get(name, (None,))[0]
+            for record in data.get(name, []):
+                self.allocator.observe(record.get('id'))
+                for child in record.get(child_name) or []:
+                    self.allocator.observe(child.get('id'))
+        # Transactions keep their ids; PartitionedTransactions knows them without loading every month
+        transactions = data.get('transactions') or []
+        for transaction_id in transactions.ids() if hasattr(transactions, 'ids') else (t.get('id') for t in transactions):
+            self.allocator.observe(transaction_id)
+        
+        reassigned = 0
+        for name, factory in COLLECTION_FACTORIES.items():
+            if name not in data:
+                continue
+            data[name], count = self.collection(factory, data[name])
+            reassigned += count
+            child_name, child_factory = CHILD_FACTORIES.get(name, (None, None))
+            for record in data[name] if child_name else []:
+                if child_name in record:
+                    record[child_name], count = self.collection(child_factory, record[child_name])
+                    reassigned += count
+        return reassigned
+    
+    def children(self, parent_name, records=()):
+        """An indexed child list (actual_payments / contributions) for a record of parent_name"""
+        child_name, factory = CHILD_FACTORIES[parent_name]
+        return self.collection(factory, records)[0]
+    
+    def adopt_children(self, parent_name, record):
+        """Index a child list that was replaced wholesale (e.g. by a PUT with the full record)"""
+        child_name, _ = CHILD_FACTORIES[parent_name]
+        children = record.get(child_name)
+        if children is not None and not isinstance(children, EntityCollection):
+            record[child_name] = self.children(parent_name, children)
@@ -0,0 +1,242 @@
+"""
+Monte Carlo overdraft risk
+The cash-flow forecast gives one deterministic path; this runs thousands of
+random ones over the same schedule to see how likely the balance is to drop
+below zero. Each simulated day:
+
+    bills, retirement and savings contributions   as scheduled (forecast.scheduled_flows)
+    steady paychecks                               as scheduled
+    variable paychecks (is_variable sources)       amount x a multiplier drawn from that source's
+                                                   own months (month total / average month), or
+                                                   from N(1, income_variance) with < 3 months
+    spending                                       a day drawn at random from the last 90 days
+                                                   of actual daily spending
+
+Paths are simulated in fixed-size batches, each with its own seed derived
+from the request's seed, so a seeded run gives the same answer however the
+batches are spread over the worker processes. Batches run in-process by
+default, vectorised with NumPy when it is installed. BUDGET_APP_SIM_WORKERS=N
+(N > 1) runs them on a shared pool of N spawned processes instead. They are
+spawned rather than forked because the server is threaded: a forked child
+inherits locks (persist_lock, the write-behind queue) that another thread may
+be holding. Spawned workers re-import the main module, so app.py skips its
+startup (storage, writer thread, sampler, loading the data) in them.
+"""
+import multiprocessing
+import os
+import random
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from itertools import repeat
+
+import forecast
+import income_stats
+from columnar import epoch_day
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BATCH_PATHS = 250
+HISTORY_DAYS = 90
+MIN_EMPIRICAL_MONTHS = 3
+PERCENTILES = (5, 25, 50, 75, 95)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def worker_count():
+    try:
+        return max(1, int(os.environ.get('BUDGET_APP_SIM_WORKERS', 1)))
+    except ValueError:
+        return 1
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=worker_count(),
+                                            mp_context=multiprocessing.get_context('spawn'))
+        return _executor
+
+
+def _reset_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+# ----- model -----
+
+def _multipliers(income):
+    """(empirical multipliers or None, coefficient of variation) of a variable income source"""
+    totals = [bucket['total'] for _, bucket in income_stats.monthly_totals(income_stats.ensure(income))]
+    average = sum(totals) / len(totals) if totals else 0
+    if len(totals) >= MIN_EMPIRICAL_MONTHS and average > 0:
+        return [total / average for total in totals], 0.0
+    return None, float(income.get('income_variance') or 0) / 100
+
+
+def build_model(ctx, columns, days):
+    """Everything a worker needs, as plain picklable data"""
+    today = ctx.now.date()
+    _, outflow, _ = forecast.scheduled_flows(ctx, days)
+    fixed = [-amount for amount in outflow]
+    variable = []
+    start, end = today + timedelta(days=1), today + timedelta(days=days + 1)
+    for income, dates in forecast.paychecks(ctx, start, end):
+        amount = float(income.get('amount', 0))
+        multipliers, cv = _multipliers(income) if income.get('is_variable') else (None, 0.0)
+        for when in dates:
+            offset = (when - today).days
+            if multipliers or cv:
+                variable.append((offset, amount, multipliers, cv))
+            else:
+                fixed[offset] += amount
+    
+    last_day = epoch_day(today) - 1
+    spending = [cents / 100 for cents in columns.daily_spending(last_day - HISTORY_DAYS + 1, last_day)]
+    if not any(spending):
+        spending = [forecast.daily_spending(ctx)]
+    fixed[0] = 0.0
+    return {
+        'starting_balance': ctx.balances['liquid'],
+        'days': days,
+        'fixed': fixed,
+        'variable': variable,
+        'spending': spending
+    }
+
+
+# ----- simulation (runs in the worker processes) -----
+
+def simulate(model, paths, seed):
+    """
+    Simulate `paths` paths. Returns (first_negative, balances): how many paths
+    first went negative on each day, and each day's balance on every path
+    (one sequence per day).
+    """
+    if numpy is not None:
+        return _simulate_numpy(model, paths, seed)
+    rng = random.Random(seed)
+    draw = rng.random
+    gauss = rng.gauss
+    days = model['days']
+    fixed = model['fixed']
+    spending = model['spending']
+    spending_count = len(spending)
+    paydays = [[] for _ in range(days + 1)]
+    for offset, amount, multipliers, cv in model['variable']:
+        paydays[offset].append((amount, multipliers, cv))
+    
+    balances = [array('d') for _ in range(days + 1)]
+    first_negative = [0] * (days + 1)
+    for _ in range(paths):
+        balance = model['starting_balance']
+        negative_on = 0 if balance < 0 else None
+        balances[0].append(balance)
+        for day in range(1, days + 1):
+            balance += fixed[day] - spending[int(draw() * spending_count)]
+            for amount, multipliers, cv in paydays[day]:
+                if multipliers:
+                    balance += amount * multipliers[int(draw() * len(multipliers))]
+                else:
+                    balance += amount * max(0.0, gauss(1.0, cv))
+            balances[day].append(balance)
+            if negative_on is None and balance < 0:
+                negative_on = day
+        if negative_on is not None:
+            first_negative[negative_on] += 1
+    return first_negative, balances
+
+
+def _simulate_numpy(model, paths, seed):
+    rng = numpy.random.default_rng(seed)
+    days = model['days']
+    spending = numpy.asarray(model['spending'], dtype=float)
+    net = numpy.asarray(model['fixed'][1:], dtype=float) - spending[rng.integers(0, len(spending), size=(paths, days))]
+    for offset, amount, multipliers, cv in model['variable']:
+        if multipliers:
+            factors = numpy.asarray(multipliers)[rng.integers(0, len(multipliers), size=paths)]
+        else:
+            factors = numpy.maximum(rng.normal(1.0, cv, size=paths), 0.0)
+        net[:, offset - 1] += amount * factors
+    balances = numpy.empty((paths, days + 1))
+    balances[:, 0] = model['starting_balance']
+    numpy.cumsum(net, axis=1, out=balances[:, 1:])
+    balances[:, 1:] += model['starting_balance']
+    negative = balances < 0
+    went_negative = negative.any(axis=1)
+    first_negative = numpy.bincount(negative.argmax(axis=1)[went_negative], minlength=days + 1)
+    return first_negative.tolist(), balances.T.copy()
+
+
+# ----- driver -----
+
+def _run_batches(model, sizes, seeds):
+    if worker_count() > 1 and len(sizes) > 1:
+        try:
+            return list(_get_executor().map(simulate, repeat(model), sizes, seeds)), worker_count()
+        except (BrokenProcessPool, OSError) as e:
+            print(f"⚠️ Simulation worker pool unavailable, running in-process: {e}")
+            _reset_executor()
+    return [simulate(model, size, batch_seed) for size, batch_seed in zip(sizes, seeds)], 1
+
+
+def _percentiles(values):
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return [ordered[round(p / 100 * last)] for p in PERCENTILES]
+
+
+def overdraft_risk(ctx, columns, days, paths, seed):
+    """Probability of the liquid balance going negative by each date, with percentile bands"""
+    today = ctx.now.date()
+    model = build_model(ctx, columns, days)
+    
+    sizes = [BATCH_PATHS] * (paths // BATCH_PATHS)
+    if paths % BATCH_PATHS:
+        sizes.append(paths % BATCH_PATHS)
+    seeder = random.Random(seed)
+    seeds = [seeder.getrandbits(63) for _ in sizes]
+    results, workers = _run_batches(model, sizes, seeds)
+    
+    first_negative = [sum(counts) for counts in zip(*(result[0] for result in results))]
+    if numpy is not None:
+        bands = numpy.percentile(numpy.hstack([result[1] for result in results]), PERCENTILES, axis=1).T.tolist()
+    else:
+        bands = [
+            _percentiles([balance for result in results for balance in result[1][day]])
+            for day in range(days + 1)
+        ]
+    
+    points = []
+    negative_so_far = 0
+    for day in range(days + 1):
+        negative_so_far += first_negative[day]
+        point = {
+            'date': (today + timedelta(days=day)).isoformat(),
+            'probability_negative': round(negative_so_far / paths, 4)
+        }
+        for p, value in zip(PERCENTILES, bands[day]):
+            point[f'p{p}'] = round(value, 2)
+        points.append(point)
+    
+    return {
+        'days': days,
+        'paths': paths,
+        'seed': seed,
+        'engine': 'numpy' if numpy is not None else 'python',
+        'workers': workers,
+        'starting_balance': round(model['starting_balance'], 2),
+        'probability_negative': points[-1]['probability_negative'],
+        'points': points
+    }
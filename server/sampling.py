@@ -0,0 +1,179 @@
+"""
+Continuous sampling profiler
+A daemon thread wakes `hz` times a second and, for every thread that is in
+the middle of a request (begin()/end() are called from the request hooks),
+reads its current stack from sys._current_frames(). Each sample is kept as a
+collapsed stack
+    
+    app.py:wsgi_app;app.py:get_dashboard_snapshot;context.py:mtd
+
+in a bounded ring buffer with its time, so the last few minutes of traffic can
+be turned into a flamegraph: collapsed() gives the text format used by
+flamegraph.pl and speedscope, svg() a self-contained SVG. While no request is
+running the thread sleeps, so an idle server pays nothing; a sample costs a
+stack walk of a few tens of microseconds.
+"""
+import html
+import sys
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+
+MAX_CACHED_STACKS = 10000
+
+
+def _frame_name(code):
+    return f"{Path(code.co_filename).name}:{code.co_name}".replace(';', ':')
+
+
+class SamplingProfiler:
+    """Samples the stacks of threads handling requests into a ring buffer"""
+    
+    def __init__(self, hz=100, capacity=100000):
+        self.interval = 1 / hz
+        self.samples = deque(maxlen=capacity)  # (time, collapsed stack)
+        self.sample_count = 0
+        self._active = set()
+        self._excluded = set()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._names = {}
+        self._thread = None
+    
+    # ----- request hooks -----
+    
+    def begin(self):
+        self._active.add(threading.get_ident())
+        self._wake.set()
+    
+    def end(self):
+        ident = threading.get_ident()
+        self._active.discard(ident)
+        self._excluded.discard(ident)
+    
+    def exclude(self):
+        """Stop sampling the calling thread until its request ends (e.g. the one rendering the flamegraph)"""
+        ident = threading.get_ident()
+        self._excluded.add(ident)
+        self._active.discard(ident)
+    
+    # ----- sampling thread -----
+    
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+            self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+    
+    @property
+    def running(self):
+        return self._thread is not None and not self._stop.is_set()
+    
+    def _run(self):
+        while not self._stop.is_set():
+            if not self._active:
+                self._wake.clear()
+                if not self._active:
+                    self._wake.wait()
+                continue
+            self.sample()
+            time.sleep(self.interval)
+    
+    def sample(self):
+        """Record the current stack of every active request thread (never the sampler's own)"""
+        now = time.monotonic()
+        frames = sys._current_frames()
+        skip = self._excluded | {threading.get_ident()}
+        for ident in list(self._active):
+            if ident in skip:
+                continue
+            frame = frames.get(ident)
+            if frame is not None:
+                self.samples.append((now, self._collapse(frame)))
+                self.sample_count += 1
+    
+    def _collapse(self, frame):
+        codes = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        codes = tuple(codes)
+        stack = self._names.get(codes)
+        if stack is None:
+            stack = ';'.join(_frame_name(code) for code in reversed(codes))
+            if len(self._names) < MAX_CACHED_STACKS:
+                self._names[codes] = stack
+        return stack
+    
+    # ----- output -----
+    
+    def counts(self, seconds=None):
+        """Counter of collapsed stacks sampled in the last `seconds` (everything buffered if None)"""
+        since = time.monotonic() - seconds if seconds is not None else float('-inf')
+        return Counter(stack for when, stack in list(self.samples) if when >= since)
+    
+    def collapsed(self, seconds=None):
+        """Folded stacks ('frame;frame;frame count' per line), most sampled first"""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.counts(seconds).most_common())
+    
+    def svg(self, seconds=None, width=1200, row_height=16, title='Request flamegraph'):
+        """Self-contained flamegraph SVG (icicle order: roots at the top)"""
+        counts = self.counts(seconds)
+        total = sum(counts.values())
+        
+        # Merge the stacks into a tree: name -> [count, children]
+        root = [total, {}]
+        for stack, count in counts.items():
+            node = root
+            for name in stack.split(';'):
+                node = node[1].setdefault(name, [0, {}])
+                node[0] += count
+        
+        rects = []
+        depth = 0
+        
+        def layout(children, x, level):
+            nonlocal depth
+            depth = max(depth, level + 1)
+            for name, (count, grandchildren) in sorted(children.items()):
+                span = count / total * width
+                if span >= 0.5:
+                    rects.append((x, level, span, name, count))
+                    layout(grandchildren, x, level + 1)
+                x += span
+        
+        if total:
+            layout(root[1], 0.0, 0)
+        top = 2 * row_height
+        height = top + depth * row_height + row_height
+        parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}" font-family="monospace" font-size="11">',
+            f'<text x="4" y="{row_height}" font-size="13">{html.escape(title)} - {total} samples</text>'
+        ]
+        for x, level, span, name, count in rects:
+            y = top + level * row_height
+            hue = sum(map(ord, name)) % 40
+            label = name if len(name) * 6.5 < span - 6 else name[:max(0, int((span - 6) / 6.5) - 2)] + '..'
+            parts.append(
+                f'<g><title>{html.escape(name)} ({count} samples, {count / total:.1%})</title>'
+                f'<rect x="{x:.1f}" y="{y}" width="{span:.1f}" height="{row_height - 1}" '
+                f'fill="hsl({10 + hue},90%,{55 + hue // 4}%)"/>'
+                + (f'<text x="{x + 3:.1f}" y="{y + row_height - 4}">{html.escape(label)}</text>' if span > 20 else '')
+                + '</g>'
+            )
+        parts.append('</svg>')
+        return '\n'.join(parts)
+    
+    def stats(self):
+        return {
+            'running': self.running,
+            'hz': round(1 / self.interval, 2),
+            'buffered': len(self.samples),
+            'capacity': self.samples.maxlen,
+            'sampled': self.sample_count
+        }
@@ -0,0 +1,131 @@
+"""
+Pay schedules
+A PaySchedule turns an income source's anchor date (its next_pay_date) and
+frequency into the sequence of pay dates that follows it. The k-th date is
+computed directly rather than by stepping one period at a time, so rolling a
+next_pay_date that was set years ago forward is O(1):
+
+    weekly / bi-weekly   anchor + 7k / 14k days
+    semi-monthly         the 15th and the last day of every month after the anchor
+    monthly              the anchor's day of month, clamped to the last day of shorter months
+    annual               the anchor's day and month each year (Feb 29 falls on Feb 28)
+
+Any other frequency has the anchor as its only pay date. Occurrences keep the
+anchor's time of day, and ranges are generated lazily.
+"""
+import calendar
+from datetime import datetime, timedelta
+
+STEP_DAYS = {'weekly': 7, 'bi-weekly': 14}
+STEP_MONTHS = {'monthly': 1, 'annual': 12}
+
+
+def parse_date(value):
+    """Naive datetime from an ISO date or datetime string (None if missing or invalid)"""
+    if not value:
+        return None
+    try:
+        when = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return when.replace(tzinfo=None)
+
+
+def _month_index(when):
+    return when.year * 12 + when.month - 1
+
+
+def _on_day(index, day, like):
+    """`like` moved to the given day of month number `index`, clamped to that month's length"""
+    year, month = divmod(index, 12)
+    month += 1
+    return like.replace(year=year, month=month, day=min(day, calendar.monthrange(year, month)[1]))
+
+
+class PaySchedule:
+    """Pay dates of one income source; occurrence 0 is the anchor"""
+    
+    __slots__ = ('anchor', 'frequency', 'first', '_slot0')
+    
+    def __init__(self, anchor, frequency, first=0):
+        self.anchor = anchor
+        self.frequency = frequency
+        self.first = first
+        if frequency == 'semi-monthly':
+            self._slot0 = self._first_slot(anchor, strict=True)
+    
+    @classmethod
+    def for_income(cls, income):
+        """
+        Schedule of an income source, anchored on next_pay_date (or on the
+        payment after last_payment_date). None if neither is a usable date.
+        """
+        frequency = income.get('frequency', 'monthly')
+        anchor = parse_date(income.get('next_pay_date'))
+        if anchor is not None:
+            return cls(anchor, frequency)
+        anchor = parse_date(income.get('last_payment_date'))
+        if anchor is not None:
+            return cls(anchor, frequency, first=1)
+        return None
+    
+    # ----- semi-monthly slots: 2 per month, the 15th then the last day -----
+    
+    def _slot(self, slot):
+        index, half = divmod(slot, 2)
+        return _on_day(index, 31 if half else 15, self.anchor)
+    
+    def _first_slot(self, when, strict=False):
+        """First slot on or after `when` (strictly after if strict)"""
+        slot = _month_index(when) * 2
+        while self._slot(slot) < when or (strict and self._slot(slot) == when):
+            slot += 1
+        return slot
+    
+    # ----- occurrences -----
+    
+    def occurrence(self, k):
+        """The k-th pay date (None past the end of a one-off schedule)"""
+        if k == 0:
+            return self.anchor
+        frequency = self.frequency
+        if frequency in STEP_DAYS:
+            return self.anchor + timedelta(days=STEP_DAYS[frequency] * k)
+        if frequency in STEP_MONTHS:
+            return _on_day(_month_index(self.anchor) + STEP_MONTHS[frequency] * k, self.anchor.day, self.anchor)
+        if frequency == 'semi-monthly':
+            return self._slot(self._slot0 + k - 1)
+        return None
+    
+    def index_on_or_after(self, when):
+        """Smallest k >= first whose pay date is on or after `when` (None if there is none)"""
+        frequency = self.frequency
+        if frequency in STEP_DAYS:
+            k = -(-(when - self.anchor) // timedelta(days=STEP_DAYS[frequency]))
+        elif frequency in STEP_MONTHS:
+            k = (_month_index(when) - _month_index(self.anchor)) // STEP_MONTHS[frequency]
+            k = max(k, self.first)
+            if self.occurrence(k) < when:
+                k += 1
+        elif frequency == 'semi-monthly':
+            if self.first == 0 and self.anchor >= when:
+                return 0
+            k = self._first_slot(when) - self._slot0 + 1
+        else:
+            return 0 if self.first == 0 and self.anchor >= when else None
+        return max(k, self.first, 1 if frequency == 'semi-monthly' else 0)
+    
+    def next_on_or_after(self, when):
+        """First pay date on or after `when` (None if there is none)"""
+        k = self.index_on_or_after(when)
+        return None if k is None else self.occurrence(k)
+    
+    def between(self, start, end=None):
+        """Pay dates in [start, end), lazily; unbounded if end is None"""
+        k = self.index_on_or_after(start)
+        while k is not None:
+            when = self.occurrence(k)
+            if when is None or (end is not None and when >= end):
+                return
+            yield when
+            k += 1
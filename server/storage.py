@@ -0,0 +1,894 @@
+"""
+Storage backends for budget data
+JSON keeps the original single-file layout, SQLite stores one row per entity
+so a mutation only touches the rows it changed
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+from models import to_json
+from partitions import UNDATED, month_key
+
+
+# A single change to one entity. `record` is the full entity dict for
+# insert/update, `record_id` identifies the row for delete, and `parent_id`
+# is set for child collections (actual_payments, contributions).
+Mutation = namedtuple('Mutation', ['op', 'collection', 'record', 'record_id', 'parent_id'],
+                      defaults=(None, None, None))
+
+# Top-level collections and the child lists nested inside their records
+COLLECTIONS = ['accounts', 'transactions', 'income_sources', 'fixed_expenses', 'retirement_accounts']
+CHILD_COLLECTIONS = {
+    'actual_payments': 'income_sources',
+    'contributions': 'retirement_accounts'
+}
+CHILDREN_OF = {parent: child for child, parent in CHILD_COLLECTIONS.items()}
+
+
+def inserted(collection, record, parent_id=None):
+    """Mutation for a newly added record"""
+    return Mutation('insert', collection, record, record.get('id'), parent_id)
+
+
+def updated(collection, record, parent_id=None):
+    """Mutation for a record changed in place"""
+    return Mutation('update', collection, record, record.get('id'), parent_id)
+
+
+def deleted(collection, record_id, parent_id=None):
+    """Mutation for a removed record"""
+    return Mutation('delete', collection, None, record_id, parent_id)
+
+
+def updated_setting(key):
+    """Mutation for a non-collection key such as categories or total_budget"""
+    return Mutation('update', key)
+
+
+def apply_mutation(data, mutation):
+    """Apply a journaled mutation to a data dict (used when replaying the journal)"""
+    op, collection, record, record_id, parent_id = mutation
+    
+    if op == 'snapshot':
+        data.clear()
+        data.update(record)
+        return
+    if collection not in COLLECTIONS and collection not in CHILD_COLLECTIONS:
+        # Settings-style key, the record is the whole value
+        data[collection] = record
+        return
+    
+    if collection in CHILD_COLLECTIONS:
+        parent = next((p for p in data.get(CHILD_COLLECTIONS[collection], []) if p.get('id') == parent_id), None)
+        if parent is None:
+            return
+        records = parent.setdefault(collection, [])
+    else:
+        records = data.setdefault(collection, [])
+    
+    if op == 'insert':
+        records.append(record)
+    elif op == 'update':
+        for i, existing in enumerate(records):
+            if existing.get('id') == record_id:
+                # Parent updates are journaled without their child list
+                child = CHILDREN_OF.get(collection)
+                if child and child not in record and child in existing:
+                    record = dict(record, **{child: existing[child]})
+                records[i] = record
+                break
+    elif op == 'delete':
+        records[:] = [r for r in records if r.get('id') != record_id]
+
+
+def _dumps(value, **kwargs):
+    """json.dumps that also accepts model records"""
+    return json.dumps(value, default=to_json, **kwargs)
+
+
+class JsonStorage:
+    """
+    JSON snapshot (the original budget_data.json format) plus an append-only journal.
+    Each mutation is appended to budget_data.journal and fsynced; a background
+    compactor folds the journal into a new snapshot once it grows past
+    max_bytes or gets older than max_age seconds.
+    Transactions are not part of the snapshot: they live in one file per month
+    under budget_data.transactions/ with a manifest of month -> count (and the
+    ids in each month, so a transaction can be found without opening every file).
+    """
+    
+    name = 'json'
+    
+    def __init__(self, path, max_bytes=1024 * 1024, max_age=300):
+        self.path = Path(path)
+        self.journal_path = self.path.with_suffix('.journal')
+        # Journal being folded in by the compactor, and a finished snapshot waiting to be swapped in
+        self.compacting_path = self.path.with_suffix('.journal.compacting')
+        self.pending_path = self.path.with_suffix('.json.new')
+        self.partitions_dir = self.path.with_suffix('.transactions')
+        self.manifest_path = self.partitions_dir / 'manifest.json'
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._journal = None
+        self._journal_bytes = 0
+        self._journal_started = None
+        self._wake = threading.Event()
+        self._closed = False
+        self._compactor = None
+    
+    def exists(self):
+        return self.path.exists() or self.journal_path.exists()
+    
+    def load(self):
+        """Return snapshot + replayed journal, or None if nothing is stored yet"""
+        with self._compact_lock:
+            self._recover()
+            if self.compacting_path.exists():
+                self._fold()
+            data = self._read_snapshot()
+            if data is None and not self.journal_path.exists():
+                return None
+            data = data or {}
+            if self.journal_path.exists():
+                for mutation in self._read_journal(self.journal_path, truncate=True):
+                    apply_mutation(data, mutation)
+            
+            if isinstance(data.get('transactions'), list):
+                # Written by an older version (or generate_test_data.py): move transactions into partitions
+                print(f"Moving transactions from {self.path} into {self.partitions_dir}")
+                self._rotate_journal()
+                self._fold()
+                del data['transactions']
+        
+        with self._lock:
+            if not self.journal_path.exists():
+                return data
+            self._journal_bytes = self.journal_path.stat().st_size
+            self._journal_started = time.time() if self._journal_bytes else None
+        if self._needs_compaction():
+            self._maybe_compact()
+        return data
+    
+    def transaction_manifest(self):
+        """Month -> transaction count for every stored partition"""
+        if not self.manifest_path.exists():
+            return {}
+        with open(self.manifest_path, 'r') as f:
+            return json.load(f).get('months', {})
+    
+    def transaction_index(self):
+        """Transaction id -> month for every stored partition"""
+        if not self.manifest_path.exists():
+            return {}
+        with open(self.manifest_path, 'r') as f:
+            manifest = json.load(f)
+        ids = manifest.get('ids')
+        if ids is None:
+            # Manifest written before ids were recorded: read every partition once and add them
+            months = manifest.get('months', {})
+            ids = {month: [t.get('id') for t in self.load_transaction_partition(month)] for month in months}
+            with self._lock:
+                self._write_manifest(months, ids)
+        return {transaction_id: month for month, month_ids in ids.items() for transaction_id in month_ids}
+    
+    def load_transaction_partition(self, month):
+        partition_path = self.partitions_dir / f'{month}.json'
+        if not partition_path.exists():
+            return []
+        with open(partition_path, 'r') as f:
+            return json.load(f)
+    
+    def prepare(self, data, mutations):
+        """Encode the mutations as journal records and changed transaction partitions"""
+        entries = []
+        partitions = None
+        for mutation in mutations:
+            if mutation.collection == 'transactions':
+                partitions = True
+                continue
+            record = mutation.record
+            if mutation.collection not in COLLECTIONS and mutation.collection not in CHILD_COLLECTIONS:
+                record = data.get(mutation.collection)
+            elif mutation.op == 'update' and mutation.collection in CHILDREN_OF:
+                record = {k: v for k, v in record.items() if k != CHILDREN_OF[mutation.collection]}
+            entries.append({
+                'op': mutation.op,
+                'collection': mutation.collection,
+                'record': record,
+                'record_id': mutation.record_id,
+                'parent_id': mutation.parent_id
+            })
+        if partitions:
+            partitions = self._prepare_partitions(data)
+        return (_encode_entries(entries), partitions)
+    
+    def prepare_save(self, data):
+        """A full snapshot record (used for bulk replacements like POST /api/budget)"""
+        snapshot = {key: value for key, value in data.items() if key != 'transactions'}
+        return (_encode_entries([{'op': 'snapshot', 'record': snapshot}]), self._prepare_partitions(data))
+    
+    def _prepare_partitions(self, data):
+        """Encode the months changed since the last write, plus the manifest"""
+        transactions = data.get('transactions')
+        if not hasattr(transactions, 'take_dirty'):
+            return None
+        changed = {
+            month: _dumps(records).encode('utf-8') if records else None
+            for month, records in transactions.take_dirty().items()
+        }
+        return {'months': changed, 'manifest': transactions.manifest(), 'ids': transactions.id_index()}
+    
+    def write(self, batches):
+        """Append prepared records to the journal with a single fsync, then write changed partitions"""
+        journal = b''.join(entries for entries, _ in batches)
+        if journal:
+            self._append(journal)
+        
+        # Later batches win when the same month was changed more than once
+        changed = {}
+        manifest = ids = None
+        for _, partitions in batches:
+            if partitions:
+                changed.update(partitions['months'])
+                manifest, ids = partitions['manifest'], partitions['ids']
+        if manifest is not None:
+            self.partitions_dir.mkdir(parents=True, exist_ok=True)
+            for month, payload in changed.items():
+                self._write_partition(month, payload)
+            self._write_manifest(manifest, ids)
+        self._maybe_compact()
+    
+    def save(self, data):
+        self.write([self.prepare_save(data)])
+    
+    def apply(self, data, mutations):
+        self.write([self.prepare(data, mutations)])
+    
+    def import_data(self, data, transaction_months):
+        """
+        Replace everything with `data` plus the transactions yielded by
+        transaction_months as (YYYY-MM, records). Each month's partition is
+        written as it arrives, so only one month is held in memory.
+        """
+        snapshot = {key: value for key, value in data.items() if key != 'transactions'}
+        with self._compact_lock, self._lock:
+            self.partitions_dir.mkdir(parents=True, exist_ok=True)
+            counts = {}
+            ids = {}
+            for month, records in transaction_months:
+                if records:
+                    self._write_partition(month, _dumps(records).encode('utf-8'))
+                    counts[month] = len(records)
+                    ids[month] = [t.get('id') for t in records]
+            for month in set(self.transaction_manifest()) - set(counts):
+                self._write_partition(month, None)
+            self._write_manifest(counts, ids)
+            
+            if self._journal:
+                self._journal.close()
+                self._journal = None
+            for path in (self.journal_path, self.compacting_path, self.pending_path):
+                if path.exists():
+                    os.remove(path)
+            self._journal_bytes = 0
+            self._journal_started = None
+            _write_atomic(self.path, _dumps(snapshot, indent=2).encode('utf-8'))
+        _fsync_dir(self.path.parent)
+    
+    def compact(self):
+        """Fold the journal into a new snapshot (temp file + atomic rename)"""
+        with self._compact_lock:
+            self._recover()
+            if self.compacting_path.exists():
+                self._fold()
+            if not self._rotate_journal():
+                return False
+            self._fold()
+            return True
+    
+    def _rotate_journal(self):
+        """Move the journal aside so new mutations go to a fresh one while it is folded in"""
+        with self._lock:
+            if not self.journal_path.exists():
+                return False
+            if self._journal:
+                self._journal.close()
+                self._journal = None
+            os.replace(self.journal_path, self.compacting_path)
+            self._journal_bytes = 0
+            self._journal_started = None
+        _fsync_dir(self.path.parent)
+        return True
+    
+    def _fold(self):
+        """Write snapshot + compacting journal as the new snapshot"""
+        data = self._read_snapshot() or {}
+        if self.compacting_path.exists():
+            for mutation in self._read_journal(self.compacting_path, truncate=True):
+                apply_mutation(data, mutation)
+        if isinstance(data.get('transactions'), list):
+            # Partitions are written before the commit below, so redoing this after a crash is harmless
+            self._write_all_partitions(data.pop('transactions'))
+        
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.pending_path)
+        # Removing the compacting journal is the commit point, see _recover()
+        if self.compacting_path.exists():
+            os.remove(self.compacting_path)
+        os.replace(self.pending_path, self.path)
+        _fsync_dir(self.path.parent)
+    
+    def close(self):
+        """Stop the compactor and fold any remaining journal into the snapshot"""
+        self._closed = True
+        self._wake.set()
+        if self._compactor:
+            self._compactor.join()
+        self.compact()
+    
+    def _recover(self):
+        """Finish or roll back a compaction that was interrupted by a crash"""
+        if self.compacting_path.exists():
+            # Not committed yet: the old snapshot + compacting journal are still authoritative
+            if self.pending_path.exists():
+                os.remove(self.pending_path)
+        elif self.pending_path.exists():
+            # Committed but not swapped in yet
+            os.replace(self.pending_path, self.path)
+    
+    def _write_partition(self, month, payload):
+        partition_path = self.partitions_dir / f'{month}.json'
+        if payload is None:
+            if partition_path.exists():
+                os.remove(partition_path)
+            return
+        _write_atomic(partition_path, payload)
+    
+    def _write_manifest(self, months, ids):
+        manifest = {
+            'version': 1,
+            'months': {month: count for month, count in sorted(months.items()) if count},
+            'ids': {month: ids.get(month, []) for month, count in sorted(months.items()) if count}
+        }
+        _write_atomic(self.manifest_path, _dumps(manifest, indent=2).encode('utf-8'))
+    
+    def _write_all_partitions(self, transactions):
+        """Replace every partition with the given transaction list"""
+        grouped = {}
+        for transaction in transactions:
+            grouped.setdefault(month_key(transaction), []).append(transaction)
+        self.partitions_dir.mkdir(parents=True, exist_ok=True)
+        for month in set(self.transaction_manifest()) - set(grouped):
+            self._write_partition(month, None)
+        for month, records in grouped.items():
+            self._write_partition(month, _dumps(records).encode('utf-8'))
+        self._write_manifest(
+            {month: len(records) for month, records in grouped.items()},
+            {month: [t.get('id') for t in records] for month, records in grouped.items()}
+        )
+    
+    def _read_snapshot(self):
+        if not self.path.exists():
+            return None
+        with open(self.path, 'r') as f:
+            return json.load(f)
+    
+    def _read_journal(self, journal_path, truncate=False):
+        """Parse journal records, dropping a torn record left by a crash mid-write"""
+        mutations = []
+        good_bytes = 0
+        with open(journal_path, 'rb') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError('incomplete record')
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                mutations.append(Mutation(entry['op'], entry.get('collection'), entry.get('record'),
+                                          entry.get('record_id'), entry.get('parent_id')))
+                good_bytes += len(line)
+        if truncate and good_bytes < journal_path.stat().st_size:
+            print(f"Discarding incomplete record at the end of {journal_path}")
+            with open(journal_path, 'r+b') as f:
+                f.truncate(good_bytes)
+        return mutations
+    
+    def _append(self, payload):
+        with self._lock:
+            if self._journal is None:
+                self._journal = open(self.journal_path, 'ab')
+            self._journal.write(payload)
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._journal_bytes += len(payload)
+            if self._journal_started is None:
+                self._journal_started = time.time()
+    
+    def _needs_compaction(self):
+        if not self._journal_bytes:
+            return False
+        return (self._journal_bytes >= self.max_bytes
+                or time.time() - self._journal_started >= self.max_age)
+    
+    def _maybe_compact(self):
+        if self._compactor is None and not self._closed:
+            self._compactor = threading.Thread(target=self._compact_loop, name='journal-compactor', daemon=True)
+            self._compactor.start()
+        if self._needs_compaction():
+            self._wake.set()
+    
+    def _compact_loop(self):
+        while not self._closed:
+            # Wake up on demand, or periodically to check the age threshold
+            self._wake.wait(timeout=min(self.max_age, 60))
+            self._wake.clear()
+            if self._closed:
+                break
+            if self._needs_compaction():
+                try:
+                    self.compact()
+                except Exception as e:
+                    print(f"Error compacting journal: {e}")
+
+
+def _write_atomic(path, payload):
+    """Write bytes to a temp file and rename it over path"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _encode_entries(entries):
+    return ''.join(_dumps(entry) + '\n' for entry in entries).encode('utf-8')
+
+
+def _fsync_dir(path):
+    """Make a rename durable (not supported on Windows)"""
+    if os.name == 'nt':
+        return
+    fd = os.open(str(path), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class SqliteStorage:
+    """SQLite storage with one table per entity"""
+    
+    name = 'sqlite'
+    
+    # Extra indexed columns per table besides id/parent_id/data
+    COLUMNS = {
+        'accounts': ['type'],
+        'transactions': ['date', 'amount', 'category'],
+        'income_sources': ['frequency'],
+        'actual_payments': ['date', 'amount'],
+        'fixed_expenses': ['due_day'],
+        'retirement_accounts': ['account_type'],
+        'contributions': ['date', 'amount']
+    }
+    
+    def __init__(self, db_path):
+        self.path = Path(db_path)
+        self.db_path = str(db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self.init_database()
+    
+    def init_database(self):
+        """Create tables if they don't exist"""
+        with self._lock, self._conn:
+            cursor = self._conn.cursor()
+            for table, columns in self.COLUMNS.items():
+                parent = 'parent_id INTEGER,' if table in CHILD_COLLECTIONS else ''
+                extra = ''.join(f'{col},' for col in columns)
+                # seq keeps the original list order; ids are not guaranteed unique
+                cursor.execute(f'''
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                        id INTEGER,
+                        {parent}
+                        {extra}
+                        data TEXT NOT NULL
+                    )
+                ''')
+                if table in CHILD_COLLECTIONS:
+                    cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_parent ON {table} (parent_id, id)')
+                else:
+                    cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_id ON {table} (id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date)')
+            
+            # Everything that isn't an entity collection (categories, total_budget, savings_goals...)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS settings (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            ''')
+    
+    def exists(self):
+        """True once data has been written (by save, migration or any incremental write)"""
+        if self.get_meta('initialized') is not None:
+            return True
+        # Stores written incrementally before writes set 'initialized'
+        with self._lock:
+            return any(
+                self._conn.execute(f'SELECT 1 FROM {table} LIMIT 1').fetchone()
+                for table in list(self.COLUMNS) + ['settings']
+            )
+    
+    def get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+    
+    def set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+    
+    def _row_values(self, table, record, parent_id=None):
+        """Column values for a record (children lists are stored in their own tables)"""
+        child = CHILDREN_OF.get(table)
+        if child and child in record:
+            record = dict(record)
+            record[child] = []
+        values = [record.get('id')]
+        if table in CHILD_COLLECTIONS:
+            values.append(parent_id)
+        for col in self.COLUMNS[table]:
+            value = record.get(col)
+            if col == 'amount':
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    value = None
+            elif isinstance(value, (dict, list)):
+                value = _dumps(value)
+            values.append(value)
+        values.append(_dumps(record))
+        return values
+    
+    def _columns(self, table):
+        parent = ['parent_id'] if table in CHILD_COLLECTIONS else []
+        return ['id'] + parent + self.COLUMNS[table] + ['data']
+    
+    def _insert(self, table, record, parent_id=None):
+        columns = self._columns(table)
+        placeholders = ', '.join('?' for _ in columns)
+        return [(f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({placeholders})',
+                 self._row_values(table, record, parent_id))]
+    
+    def _update(self, table, record, parent_id=None):
+        values = self._row_values(table, record, parent_id)
+        assignments = ', '.join(f'{col} = ?' for col in self._columns(table))
+        where, params = self._where(table, record.get('id'), parent_id)
+        return [(f'UPDATE {table} SET {assignments} WHERE {where}', values + params)]
+    
+    def _delete(self, table, record_id, parent_id=None):
+        where, params = self._where(table, record_id, parent_id)
+        statements = [(f'DELETE FROM {table} WHERE {where}', params)]
+        # Deleting a parent drops its children too
+        child = CHILDREN_OF.get(table)
+        if child:
+            statements.append((f'DELETE FROM {child} WHERE parent_id = ?', [record_id]))
+        return statements
+    
+    def _where(self, table, record_id, parent_id):
+        if table in CHILD_COLLECTIONS:
+            return 'parent_id = ? AND id = ?', [parent_id, record_id]
+        return 'id = ?', [record_id]
+    
+    def load(self):
+        """Rebuild the budget_data dict from the tables"""
+        if not self.exists():
+            return None
+        with self._lock:
+            cursor = self._conn.cursor()
+            data = {}
+            for key, value in cursor.execute('SELECT key, value FROM settings'):
+                data[key] = json.loads(value)
+            
+            children = {}
+            for child, parent in CHILD_COLLECTIONS.items():
+                grouped = children[parent] = {}
+                for parent_id, row in cursor.execute(f'SELECT parent_id, data FROM {child} ORDER BY seq'):
+                    grouped.setdefault(parent_id, []).append(json.loads(row))
+            
+            for table in COLLECTIONS:
+                if table == 'transactions':
+                    # Loaded lazily by month, see load_transaction_partition()
+                    continue
+                records = []
+                child = CHILDREN_OF.get(table)
+                for (row,) in cursor.execute(f'SELECT data FROM {table} ORDER BY seq'):
+                    record = json.loads(row)
+                    if child and child in record:
+                        record[child] = children[table].get(record.get('id'), [])
+                    records.append(record)
+                data[table] = records
+        return data
+    
+    def transaction_manifest(self):
+        """Month -> transaction count, grouped the same way as partitions.month_key()"""
+        with self._lock:
+            rows = self._conn.execute(f'''
+                SELECT CASE WHEN date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]*' THEN substr(date, 1, 7) ELSE '{UNDATED}' END AS month,
+                       COUNT(*)
+                FROM transactions GROUP BY month
+            ''').fetchall()
+        return dict(rows)
+    
+    def transaction_index(self):
+        """Transaction id -> month, read from the indexed columns only"""
+        with self._lock:
+            rows = self._conn.execute(f'''
+                SELECT id, CASE WHEN date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]*' THEN substr(date, 1, 7) ELSE '{UNDATED}' END
+                FROM transactions ORDER BY seq
+            ''').fetchall()
+        return dict(rows)
+    
+    def load_transaction_partition(self, month):
+        if month == UNDATED:
+            where = "date IS NULL OR NOT date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]*'"
+            params = []
+        else:
+            # Range on the indexed date column: '2025-03' <= date < '2025-03~'
+            where = 'date >= ? AND date < ?'
+            params = [month, month + '~']
+        with self._lock:
+            rows = self._conn.execute(f'SELECT data FROM transactions WHERE {where} ORDER BY seq', params).fetchall()
+        return [json.loads(row) for (row,) in rows]
+    
+    def prepare(self, data, mutations):
+        """Build the SQL statements for the rows touched by the mutations"""
+        statements = []
+        transactions = data.get('transactions')
+        if hasattr(transactions, 'take_dirty'):
+            # Rows are written individually, partitions only need to know they're clean
+            transactions.take_dirty()
+        for mutation in mutations:
+            table = mutation.collection
+            if table not in self.COLUMNS:
+                # Settings-style key (categories, total_budget, ...)
+                statements.append(('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)',
+                                   [table, _dumps(data.get(table))]))
+            elif mutation.op == 'insert':
+                statements += self._insert(table, mutation.record, mutation.parent_id)
+            elif mutation.op == 'update':
+                statements += self._update(table, mutation.record, mutation.parent_id)
+            elif mutation.op == 'delete':
+                statements += self._delete(table, mutation.record_id, mutation.parent_id)
+            else:
+                raise ValueError(f'Unknown mutation op: {mutation.op}')
+        return statements
+    
+    def prepare_save(self, data):
+        """Build the statements that replace everything with the given data dict"""
+        transactions = data.get('transactions')
+        if hasattr(transactions, 'take_dirty'):
+            transactions.take_dirty()
+        statements = [(f'DELETE FROM {table}', []) for table in self.COLUMNS]
+        statements.append(('DELETE FROM settings', []))
+        
+        for key, value in data.items():
+            if key not in COLLECTIONS:
+                statements.append(('INSERT INTO settings (key, value) VALUES (?, ?)', [key, _dumps(value)]))
+        
+        for table in COLLECTIONS:
+            child = CHILDREN_OF.get(table)
+            for record in data.get(table, []):
+                statements += self._insert(table, record)
+                if child:
+                    for child_record in record.get(child) or []:
+                        statements += self._insert(child, child_record, record.get('id'))
+        statements.append(("INSERT OR REPLACE INTO meta (key, value) VALUES ('initialized', '1')", []))
+        return statements
+    
+    def write(self, batches):
+        """Execute prepared batches in a single transaction"""
+        with self._lock, self._conn:
+            cursor = self._conn.cursor()
+            for statements in batches:
+                for sql, params in statements:
+                    cursor.execute(sql, params)
+            # Incremental writes count too: a store only ever written through prepare() must still load
+            cursor.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('initialized', '1')")
+    
+    def save(self, data):
+        """Replace everything with the given data dict"""
+        self.write([self.prepare_save(data)])
+    
+    def apply(self, data, mutations):
+        """Write only the rows touched by the mutations, in one transaction"""
+        self.write([self.prepare(data, mutations)])
+    
+    def import_data(self, data, transaction_months):
+        """
+        Replace everything with `data` plus the transactions yielded by
+        transaction_months as (YYYY-MM, records), in one transaction with
+        only one month held in memory
+        """
+        snapshot = {key: value for key, value in data.items() if key != 'transactions'}
+        columns = self._columns('transactions')
+        insert = f'INSERT INTO transactions ({", ".join(columns)}) VALUES ({", ".join("?" for _ in columns)})'
+        with self._lock, self._conn:
+            cursor = self._conn.cursor()
+            for sql, params in self.prepare_save(snapshot):
+                cursor.execute(sql, params)
+            for _, records in transaction_months:
+                cursor.executemany(insert, (self._row_values('transactions', record) for record in records))
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class WriteBehind:
+    """
+    Write-behind persister. Request handlers submit prepared batches and return
+    immediately; a background thread coalesces everything submitted within
+    max_delay seconds into one storage.write() (one fsync / one transaction).
+    """
+    
+    def __init__(self, storage, max_delay=0.25):
+        self.storage = storage
+        self.max_delay = max_delay
+        self._cond = threading.Condition()
+        self._pending = []
+        self._submitted = 0
+        self._written = 0
+        self._first_pending_at = None
+        self._closed = False
+        self.last_error = None
+        self.writes = 0
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+    
+    def submit(self, batch):
+        """Queue a prepared batch; returns its sequence number"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('Persister is closed')
+            self._pending.append(batch)
+            self._submitted += 1
+            if self._first_pending_at is None:
+                self._first_pending_at = time.time()
+            self._cond.notify_all()
+            return self._submitted
+    
+    def flush(self, timeout=None):
+        """Barrier: wait until everything submitted so far is on disk"""
+        with self._cond:
+            target = self._submitted
+            if self._pending:
+                self._first_pending_at = 0  # Don't wait for the coalescing window
+                self._cond.notify_all()
+            done = self._cond.wait_for(lambda: self._written >= target or self.last_error, timeout)
+            return bool(done) and self._written >= target
+    
+    def close(self, timeout=10):
+        """Flush pending writes and stop the thread"""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                # Coalesce: keep collecting until max_delay after the first pending batch
+                while not self._closed and self._first_pending_at:
+                    remaining = self._first_pending_at + self.max_delay - time.time()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batches = self._pending
+                self._pending = []
+                self._first_pending_at = None
+            
+            try:
+                self.storage.write(batches)
+                error = None
+            except Exception as e:
+                print(f"Error saving data: {e}")
+                error = e
+            
+            with self._cond:
+                if error is None:
+                    self._written += len(batches)
+                    self.writes += 1
+                    self.last_error = None
+                else:
+                    # Put them back in front and retry on the next round
+                    self._pending = batches + self._pending
+                    self._first_pending_at = time.time()
+                    self.last_error = error
+                self._cond.notify_all()
+            if error is not None:
+                time.sleep(1)
+
+
+def migrate_json_to_sqlite(json_path, sqlite_storage):
+    """One-time import of budget_data.json into SQLite (the JSON file is left as a backup)"""
+    json_path = Path(json_path)
+    if sqlite_storage.get_meta('migrated_from'):
+        return False
+    # Read through JsonStorage so an unfolded journal and transaction partitions are included
+    json_storage = JsonStorage(json_path)
+    data = json_storage.load()
+    if data is None:
+        return False
+    data['transactions'] = [
+        transaction
+        for month in sorted(json_storage.transaction_manifest())
+        for transaction in json_storage.load_transaction_partition(month)
+    ]
+    json_storage.close()
+    sqlite_storage.save(data)
+    sqlite_storage.set_meta('migrated_from', str(json_path))
+    return True
+
+
+def open_storage(data_file, backend=None):
+    """
+    Open the configured storage backend for a budget_data.json path.
+    Backend comes from BUDGET_APP_STORAGE ('json' or 'sqlite'), defaulting to json.
+    BUDGET_APP_JOURNAL_MAX_BYTES / BUDGET_APP_JOURNAL_MAX_AGE (seconds) tune when
+    the JSON journal is compacted.
+    """
+    data_file = Path(data_file)
+    backend = (backend or os.environ.get('BUDGET_APP_STORAGE', 'json')).lower()
+    
+    if backend == 'sqlite':
+        storage = SqliteStorage(data_file.with_suffix('.db'))
+        if not storage.exists() and migrate_json_to_sqlite(data_file, storage):
+            print(f"Migrated {data_file} into {storage.db_path}")
+        return storage
+    if backend == 'json':
+        return JsonStorage(
+            data_file,
+            max_bytes=int(os.environ.get('BUDGET_APP_JOURNAL_MAX_BYTES', 1024 * 1024)),
+            max_age=float(os.environ.get('BUDGET_APP_JOURNAL_MAX_AGE', 300))
+        )
+    raise ValueError(f'Unknown storage backend: {backend}')
+
+
+if __name__ == '__main__':
+    # Migrate an existing JSON file: python storage.py [budget_data.json]
+    import sys
+    json_file = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent / 'budget_data.json'
+    storage = SqliteStorage(json_file.with_suffix('.db'))
+    if migrate_json_to_sqlite(json_file, storage):
+        print(f"✅ Migrated {json_file} -> {storage.db_path}")
+    else:
+        print(f"Nothing to migrate (already migrated or {json_file} missing)")
+    storage.close()
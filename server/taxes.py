@@ -0,0 +1,163 @@
+"""
+Federal income tax tables
+Brackets and standard deductions per tax year and filing status, turned once
+(at import) into cumulative tables: for every bracket its lower bound, its
+rate and the tax owed on all income below it. Tax on any taxable income is
+then a bisect for the bracket plus one multiply-add.
+"""
+from bisect import bisect_left
+
+# (upper limit, rate) per bracket; the last bracket has no upper limit
+BRACKETS = {
+    # 2025 Federal Tax Brackets (Tax year 2025, filing in 2026)
+    # Updated for inflation adjustments
+    2025: {
+        'single': [
+            (11925, 0.10),    # 10% on income up to $11,925
+            (48475, 0.12),    # 12% on income $11,926 to $48,475
+            (103350, 0.22),   # 22% on income $48,476 to $103,350
+            (197300, 0.24),   # 24% on income $103,351 to $197,300
+            (250525, 0.32),   # 32% on income $197,301 to $250,525
+            (626350, 0.35),   # 35% on income $250,526 to $626,350
+            (float('inf'), 0.37)  # 37% on income over $626,350
+        ],
+        'married-joint': [
+            (23850, 0.10),    # 10% on income up to $23,850
+            (96950, 0.12),    # 12% on income $23,851 to $96,950
+            (206700, 0.22),   # 22% on income $96,951 to $206,700
+            (394600, 0.24),   # 24% on income $206,701 to $394,600
+            (501050, 0.32),   # 32% on income $394,601 to $501,050
+            (751600, 0.35),   # 35% on income $501,051 to $751,600
+            (float('inf'), 0.37)  # 37% on income over $751,600
+        ],
+        'married-separate': [
+            (11925, 0.10),    # 10% on income up to $11,925
+            (48475, 0.12),    # 12% on income $11,926 to $48,475
+            (103350, 0.22),   # 22% on income $48,476 to $103,350
+            (197300, 0.24),   # 24% on income $103,351 to $197,300
+            (250525, 0.32),   # 32% on income $197,301 to $250,525
+            (375800, 0.35),   # 35% on income $250,526 to $375,800
+            (float('inf'), 0.37)  # 37% on income over $375,800
+        ],
+        'head-of-household': [
+            (17000, 0.10),    # 10% on income up to $17,000
+            (64850, 0.12),    # 12% on income $17,001 to $64,850
+            (103350, 0.22),   # 22% on income $64,851 to $103,350
+            (197300, 0.24),   # 24% on income $103,351 to $197,300
+            (250500, 0.32),   # 32% on income $197,301 to $250,500
+            (626350, 0.35),   # 35% on income $250,501 to $626,350
+            (float('inf'), 0.37)  # 37% on income over $626,350
+        ]
+    }
+}
+
+STANDARD_DEDUCTIONS = {
+    # Standard deductions for 2025
+    2025: {
+        'single': 15000,
+        'married-joint': 30000,
+        'married-separate': 15000,
+        'head-of-household': 22500
+    }
+}
+
+DEFAULT_YEAR = 2025
+FILING_STATUSES = tuple(BRACKETS[DEFAULT_YEAR])
+
+
+class TaxTable:
+    """Cumulative bracket table for one tax year and filing status"""
+    
+    __slots__ = ('year', 'filing_status', 'standard_deduction', 'lows', 'highs', 'rates', 'base')
+    
+    def __init__(self, year, filing_status, brackets, standard_deduction):
+        self.year = year
+        self.filing_status = filing_status
+        self.standard_deduction = standard_deduction
+        self.lows = []
+        self.highs = []
+        self.rates = []
+        self.base = []      # tax on all income below each bracket
+        low = 0
+        tax = 0
+        for high, rate in brackets:
+            self.lows.append(low)
+            self.highs.append(high)
+            self.rates.append(rate)
+            self.base.append(tax)
+            if high != float('inf'):
+                tax += (high - low) * rate
+            low = high
+    
+    def _bracket(self, taxable_income):
+        """Index of the bracket taxable_income ends in (-1 for no taxable income)"""
+        return bisect_left(self.lows, taxable_income) - 1
+    
+    def taxable(self, gross_income):
+        return max(0, gross_income - self.standard_deduction)
+    
+    def tax(self, taxable_income):
+        index = self._bracket(taxable_income)
+        if index < 0:
+            return 0
+        return self.base[index] + (taxable_income - self.lows[index]) * self.rates[index]
+    
+    def marginal_rate(self, taxable_income):
+        index = self._bracket(taxable_income)
+        return self.rates[index] if index >= 0 else 0
+    
+    def by_bracket(self, taxable_income):
+        """Income and tax in every bracket the income reaches"""
+        breakdown = []
+        for index in range(self._bracket(taxable_income) + 1):
+            low, high, rate = self.lows[index], self.highs[index], self.rates[index]
+            income_in_bracket = min(taxable_income, high) - low
+            breakdown.append({
+                'rate': rate,
+                'rate_percent': round(rate * 100, 1),
+                'income_in_bracket': round(income_in_bracket, 2),
+                'tax_amount': round(income_in_bracket * rate, 2),
+                'bracket_min': round(low, 2),
+                'bracket_max': round(high, 2) if high != float('inf') else None
+            })
+        return breakdown
+    
+    def estimate(self, gross_income):
+        """Tax figures for one annual gross income"""
+        taxable_income = self.taxable(gross_income)
+        total_tax = self.tax(taxable_income)
+        return {
+            'gross_income': round(gross_income, 2),
+            'taxable_income': round(taxable_income, 2),
+            'total_tax': round(total_tax, 2),
+            'effective_rate': round(total_tax / gross_income, 4) if gross_income > 0 else 0,
+            'marginal_rate': self.marginal_rate(taxable_income),
+            'after_tax': round(gross_income - total_tax, 2)
+        }
+
+
+TABLES = {
+    (year, filing_status): TaxTable(year, filing_status, brackets, STANDARD_DEDUCTIONS[year][filing_status])
+    for year, by_status in BRACKETS.items()
+    for filing_status, brackets in by_status.items()
+}
+
+
+def table(filing_status, year=DEFAULT_YEAR):
+    """TaxTable for a filing status and year (None if there isn't one)"""
+    return TABLES.get((year, filing_status))
+
+
+def rate_curve(tax_table, low, high, points):
+    """Effective and marginal rates at `points` evenly spaced gross incomes from low to high"""
+    step = (high - low) / (points - 1) if points > 1 else 0
+    curve = []
+    for i in range(points):
+        gross_income = low + step * i
+        taxable_income = tax_table.taxable(gross_income)
+        curve.append({
+            'gross_income': round(gross_income, 2),
+            'effective_rate': round(tax_table.tax(taxable_income) / gross_income, 4) if gross_income > 0 else 0,
+            'marginal_rate': tax_table.marginal_rate(taxable_income)
+        })
+    return curve
@@ -0,0 +1,101 @@
+"""
+Check the month x category aggregates against a full recompute
+Runs the app on a throwaway data directory, then bulk-imports, adds and
+deletes transactions through the API and compares the incrementally
+maintained table with one rebuilt from scratch after every step.
+"""
+import os
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+
+os.environ['BUDGET_APP_DATA_DIR'] = tempfile.mkdtemp()
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from app import app, budget_data, get_category_aggregates
+from aggregates import CategoryAggregates
+
+random.seed(11)
+CATEGORIES = ['Groceries', 'Gas', 'Dining Out', 'Shopping', 'Utilities', None]
+failures = 0
+
+
+def random_transaction(today):
+    transaction = {
+        'date': (today - timedelta(days=random.randint(0, 400))).isoformat(),
+        'amount': round(random.choice([1, 1, 1, -1]) * random.uniform(1, 300), 2),
+        'description': 'Test purchase'
+    }
+    category = random.choice(CATEGORIES)
+    if category:
+        transaction['category'] = category
+    return transaction
+
+
+def check(step):
+    global failures
+    table = get_category_aggregates()
+    expected = CategoryAggregates.recompute(list(budget_data['transactions']))
+    actual = table.snapshot()
+    if actual == expected:
+        print(f"✅ {step}: {len(actual)} buckets match")
+    else:
+        failures += 1
+        print(f"❌ {step}: aggregates differ from a full recompute")
+        for key in sorted(set(actual) | set(expected), key=str):
+            if actual.get(key) != expected.get(key):
+                print(f"   {key}: {actual.get(key)} != {expected.get(key)}")
+
+
+with app.test_client() as client:
+    today = date.today()
+    
+    # Bulk import
+    data = client.get('/api/budget').get_json()
+    data['transactions'] = [dict(random_transaction(today), id=i + 1) for i in range(2000)]
+    client.post('/api/budget', json=data)
+    check('bulk import')
+    
+    # Single adds
+    for _ in range(200):
+        client.post('/api/transactions', json=random_transaction(today))
+    check('200 adds')
+    
+    # Deletes, including the smallest and largest amount of a bucket
+    ids = [t['id'] for t in budget_data['transactions']]
+    for transaction_id in random.sample(ids, 300):
+        client.delete(f'/api/transactions/{transaction_id}')
+    check('300 deletes')
+    
+    groceries = [t for t in budget_data['transactions']
+                 if t.get('category') == 'Groceries' and t.when and (t.when.year, t.when.month) == (today.year, today.month)]
+    for transaction in (min(groceries, key=lambda t: t.value), max(groceries, key=lambda t: t.value)) if groceries else ():
+        client.delete(f"/api/transactions/{transaction['id']}")
+    check('delete bucket min and max')
+    
+    # Everything in a month removed
+    first = next(t for t in budget_data['transactions'] if t.when)
+    month = [t['id'] for t in budget_data['transactions'] if t.when and (t.when.year, t.when.month) == (first.when.year, first.when.month)]
+    for transaction_id in month:
+        client.delete(f'/api/transactions/{transaction_id}')
+    check('empty a month')
+    
+    # Spending-pattern averages come from the cent totals: $36.57 and $36.60 average to $36.585, shown as $36.59
+    data = client.get('/api/budget').get_json()
+    for months_ago, amount in ((2, 36.57), (3, 36.60)):
+        when = (today.replace(day=1) - timedelta(days=31 * months_ago - 15)).isoformat()
+        data['transactions'].append({'date': when, 'amount': amount, 'category': 'Half Cent', 'description': 'Tie'})
+    client.post('/api/budget', json=data)
+    patterns = client.get('/api/dashboard/spending-patterns').get_json()['patterns']
+    average = next((p['historical_avg'] for p in patterns if p['category'] == 'Half Cent'), None)
+    if average == 36.59:
+        print(f"✅ spending-pattern average: {average}")
+    else:
+        failures += 1
+        print(f"❌ spending-pattern average: {average}, expected 36.59")
+    
+    print(f"\nRebuilds: {get_category_aggregates().rebuilds}")
+
+print("\nAll checks passed" if not failures else f"\n{failures} check(s) failed")
+sys.exit(1 if failures else 0)
@@ -0,0 +1,99 @@
+"""
+Check that API writes survive a restart on every storage backend
+For each backend, one process makes changes through the API on a throwaway
+data directory and exits; a second process starts the app on the same
+directory and checks that everything came back.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKENDS = ['json', 'sqlite']
+
+# Imported history: ids newer than anything the allocator has handed out, in months that stay cold
+IMPORTED_ID = 10 ** 14
+IMPORTED = [{'id': IMPORTED_ID + i, 'date': f'2019-0{i + 1}-10', 'amount': 10, 'category': 'Other'} for i in range(3)]
+
+
+def write_phase(client):
+    """Changes made before the restart; returns what the reload should see"""
+    client.post('/api/budget', json={'transactions': IMPORTED})
+    account = client.post('/api/accounts', json={'name': 'Checking', 'type': 'checking', 'balance': 250}).get_json()
+    income = client.post('/api/income', json={
+        'name': 'Salary', 'type': 'salary', 'frequency': 'monthly', 'amount': 1000
+    }).get_json()['data']
+    for _ in range(2):
+        client.post(f"/api/income/{income['id']}/record-payment", json={'amount': 1000, 'date': '2025-01-15'})
+    # A PUT that replaces the whole payment list
+    client.put(f"/api/income/{income['id']}", json={
+        'actual_payments': [{'id': 1, 'date': '2025-02-01', 'amount': 5, 'notes': ''}]
+    })
+    client.post('/api/expenses', json={'name': 'Rent', 'amount': 900, 'due_day': 1, 'category': 'Housing'})
+    client.post('/api/transactions', json={'date': '2025-01-20', 'amount': 42.5, 'description': 'Groceries'})
+    return account
+
+
+def check_phase(client, transactions):
+    """[(check, expected, actual)] after the restart"""
+    loads = transactions.stats()['loads']
+    client.delete(f'/api/transactions/{IMPORTED_ID + 1}')
+    partitions_loaded = transactions.stats()['loads'] - loads
+    new_id = client.post('/api/transactions', json={'amount': 1, 'description': 'Coffee'}).get_json()['data']['id']
+    client.delete(f'/api/transactions/{new_id}')
+
+    income = client.get('/api/income').get_json()
+    return [
+        ('partitions loaded to delete an old transaction', 1, partitions_loaded),
+        ('new id above imported ids', True, new_id > IMPORTED_ID + len(IMPORTED)),
+        ('accounts', 1, len(client.get('/api/accounts').get_json())),
+        ('income sources', 1, len(income)),
+        ('payments after PUT', [5], [p['amount'] for p in income[0]['actual_payments']] if income else None),
+        ('fixed expenses', 1, len(client.get('/api/expenses').get_json())),
+        ('transactions', len(IMPORTED), len(client.get('/api/budget').get_json()['transactions']))
+    ]
+
+
+def run_phase(phase):
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server'))
+    import app as budget_app
+
+    with budget_app.app.test_client() as client:
+        if phase == 'write':
+            write_phase(client)
+            budget_app.persister.flush(timeout=30)
+            return 0
+        failures = 0
+        for name, expected, actual in check_phase(client, budget_app.budget_data['transactions']):
+            if expected == actual:
+                print(f"✅ {os.environ['BUDGET_APP_STORAGE']}: {name} = {actual}")
+            else:
+                failures += 1
+                print(f"❌ {os.environ['BUDGET_APP_STORAGE']}: {name} = {actual}, expected {expected}")
+        return failures
+
+
+def main():
+    if len(sys.argv) > 1:
+        return run_phase(sys.argv[1])
+
+    failures = 0
+    for backend in BACKENDS:
+        env = dict(os.environ, BUDGET_APP_DATA_DIR=tempfile.mkdtemp(), BUDGET_APP_STORAGE=backend,
+                   BUDGET_APP_SAMPLE_HZ='0')
+        for phase in ('write', 'check'):
+            completed = subprocess.run([sys.executable, os.path.abspath(__file__), phase], env=env,
+                                       capture_output=True, text=True)
+            if phase == 'check':
+                print(''.join(line + '\n' for line in completed.stdout.splitlines() if line[:1] in '✅❌'), end='')
+            if completed.returncode != 0:
+                failures += 1
+                if phase == 'write':
+                    print(f"❌ {backend}: write phase failed\n{completed.stdout}{completed.stderr}")
+
+    print(f"\n{'All checks passed' if failures == 0 else f'{failures} phase(s) failed'}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())